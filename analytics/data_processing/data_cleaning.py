@@ -10,19 +10,36 @@ This script:
 4. Merges everything into one unified dataset
 5. Saves clean data for ML model training
 
+With --source database the raw tables are read from the analytics database
+(scripts/csv_to_sql.py) instead: deduplication and the enrollment,
+attendance and LMS aggregations run as one SQL query over the indexes
+(STUDENT_AGGREGATES_SQL) and only the per-student rows come back into
+pandas.
+
 Usage:
     python analytics/data_processing/data_cleaning.py
+    python analytics/data_processing/data_cleaning.py --source database --db strathmore_analytics.db
 
 Output:
     data/processed/strathmore_clean_data.csv
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import logging
+import sys
 from datetime import datetime
 
+if __package__ in (None, ''):
+    # Run as a script (python analytics/data_processing/data_cleaning.py)
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import text
+
+from backend.database.connection import DEFAULT_DATABASE, read_connection
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -34,14 +51,96 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Attendance status -> attended (anything else is unknown and not counted)
+ATTENDANCE_STATUS = {
+    'present': True,
+    'absent': False,
+    'late': True,
+    'excused': False,
+    'p': True,
+    'a': False,
+    'l': True
+}
+
+SOURCES = ('csv', 'database')
+
+
+def _attended_case(column):
+    """SQL CASE expression mapping a status column like ATTENDANCE_STATUS"""
+    whens = ' '.join(f"WHEN '{status}' THEN {int(attended)}" for status, attended in ATTENDANCE_STATUS.items())
+    return f'CASE lower({column}) {whens} END'
+
+
+# The CSV pipeline (clean_* -> aggregate_* -> merge_all_data) as one query.
+# Enrollments keep the last row per (student, course) like drop_duplicates,
+# GPA is clipped to [0, 4] and LMS durations to [0, 480]. The attendance and
+# LMS aggregates are answered from the covering indexes
+# ix_attendance_student_course and ix_lms_student_course.
+STUDENT_AGGREGATES_SQL = f"""
+WITH enrollment AS (
+    SELECT student_id,
+           AVG(grade) AS avg_grade,
+           AVG(MIN(MAX(gpa, 0), 4.0)) AS cumulative_gpa,
+           COUNT(course_id) AS courses_enrolled
+    FROM sis_enrollments
+    WHERE id IN (SELECT MAX(id) FROM sis_enrollments GROUP BY student_id, course_id)
+    GROUP BY student_id
+),
+attendance_course AS (
+    SELECT student_id,
+           COALESCE(SUM(attended), 0) AS sessions_attended,
+           COUNT(attended) AS sessions_total
+    FROM (SELECT student_id, course_id, {_attended_case('status')} AS attended
+          FROM attendance_records)
+    GROUP BY student_id, course_id
+),
+attendance AS (
+    SELECT student_id,
+           AVG(CAST(sessions_attended AS REAL) / sessions_total) AS physical_attendance_rate,
+           SUM(sessions_attended) AS sessions_attended,
+           SUM(sessions_total) AS sessions_total
+    FROM attendance_course
+    GROUP BY student_id
+),
+lms AS (
+    SELECT student_id,
+           COUNT(*) AS lms_activity_count,
+           COALESCE(SUM(MIN(MAX(duration_minutes, 0), 480)), 0) AS lms_total_minutes,
+           AVG(MIN(MAX(duration_minutes, 0), 480)) AS lms_avg_session_minutes,
+           COUNT(*) / 4.0 AS lms_logins_monthly
+    FROM lms_activities
+    GROUP BY student_id
+)
+SELECT s.student_id, s.name,
+       COALESCE(s.email, s.student_id || '@student.strathmore.edu') AS email,
+       s.gender, s.age, s.program_id, s.program_code, s.school_id, s.year_of_study,
+       s.semester, s.class_level, s.enrollment_date, s.status,
+       e.avg_grade, e.cumulative_gpa, e.courses_enrolled,
+       a.physical_attendance_rate, a.sessions_attended, a.sessions_total,
+       l.lms_activity_count, l.lms_total_minutes, l.lms_avg_session_minutes, l.lms_logins_monthly,
+       sc.name AS school_name, p.name AS program_name
+FROM students s
+LEFT JOIN enrollment e ON e.student_id = s.student_id
+LEFT JOIN attendance a ON a.student_id = s.student_id
+LEFT JOIN lms l ON l.student_id = s.student_id
+LEFT JOIN schools sc ON sc.school_id = s.school_id
+LEFT JOIN programs p ON p.program_id = s.program_id
+ORDER BY s.student_id
+"""
+
 
 class StrathmoreDataCleaner:
     """Cleans and merges Strathmore University data"""
     
-    def __init__(self, raw_data_path='data/raw', processed_path='data/processed'):
+    def __init__(self, raw_data_path='data/raw', processed_path='data/processed',
+                 source='csv', db_path=DEFAULT_DATABASE):
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source {source!r}, expected one of {SOURCES}")
         self.raw_path = Path(raw_data_path)
         self.processed_path = Path(processed_path)
         self.processed_path.mkdir(parents=True, exist_ok=True)
+        self.source = source
+        self.db_path = db_path
         
         logger.info("=" * 70)
         logger.info("🧹 STRATHMORE DATA CLEANING & MERGING")
@@ -161,16 +260,7 @@ class StrathmoreDataCleaner:
         # Standardize status column
         if 'status' in df_clean.columns:
             # Map various attendance statuses to boolean
-            status_map = {
-                'present': True,
-                'absent': False,
-                'late': True,
-                'excused': False,
-                'p': True,
-                'a': False,
-                'l': True
-            }
-            df_clean['attended'] = df_clean['status'].str.lower().map(status_map)
+            df_clean['attended'] = df_clean['status'].str.lower().map(ATTENDANCE_STATUS)
             df_clean['attended'] = df_clean['attended'].fillna(
                 df_clean['status'].map({1: True, 0: False})
             )
@@ -320,6 +410,23 @@ class StrathmoreDataCleaner:
         
         return merged_df
     
+    def load_student_aggregates(self):
+        """
+        Database source: cleaned, aggregated and merged per-student data
+        computed in SQL (same columns as merge_all_data)
+        """
+        logger.info(f"\n🗄️  Aggregating in the database: {self.db_path}")
+        
+        with read_connection(self.db_path) as conn:
+            merged_df = pd.read_sql_query(text(STUDENT_AGGREGATES_SQL), conn)
+        
+        # Same key type as the CSV path (clean_students)
+        merged_df['student_id'] = merged_df['student_id'].astype(str)
+        
+        logger.info(f"   ✅ Final merged dataset: {merged_df.shape}")
+        
+        return merged_df
+    
     def final_cleaning(self, df):
         """Final cleaning steps"""
         logger.info("\n🎯 Final cleaning...")
@@ -390,30 +497,37 @@ class StrathmoreDataCleaner:
         
         logger.info("\n" + "=" * 70)
     
+    def clean_and_merge_csv(self):
+        """CSV source: load, clean, aggregate and merge in pandas"""
+        # Load raw data
+        data = self.load_raw_data()
+        
+        # Clean each dataset
+        logger.info("\n" + "=" * 70)
+        logger.info("🧹 CLEANING DATASETS")
+        logger.info("=" * 70)
+        
+        data['students'] = self.clean_students(data['students'])
+        data['enrollments'] = self.clean_enrollments(data['enrollments'])
+        data['attendance'] = self.clean_attendance(data['attendance'])
+        data['lms'] = self.clean_lms(data['lms'])
+        
+        # Aggregate attendance and LMS
+        data['attendance_agg'] = self.aggregate_attendance_by_student_course(data['attendance'])
+        data['lms_agg'] = self.aggregate_lms_by_student(data['lms'])
+        
+        # Merge all datasets
+        return self.merge_all_data(data)
+    
     def clean_and_merge_all(self):
         """
         MAIN FUNCTION: Complete cleaning and merging pipeline
         """
         try:
-            # Load raw data
-            data = self.load_raw_data()
-            
-            # Clean each dataset
-            logger.info("\n" + "=" * 70)
-            logger.info("🧹 CLEANING DATASETS")
-            logger.info("=" * 70)
-            
-            data['students'] = self.clean_students(data['students'])
-            data['enrollments'] = self.clean_enrollments(data['enrollments'])
-            data['attendance'] = self.clean_attendance(data['attendance'])
-            data['lms'] = self.clean_lms(data['lms'])
-            
-            # Aggregate attendance and LMS
-            data['attendance_agg'] = self.aggregate_attendance_by_student_course(data['attendance'])
-            data['lms_agg'] = self.aggregate_lms_by_student(data['lms'])
-            
-            # Merge all datasets
-            merged_df = self.merge_all_data(data)
+            if self.source == 'database':
+                merged_df = self.load_student_aggregates()
+            else:
+                merged_df = self.clean_and_merge_csv()
             
             # Final cleaning
             merged_df = self.final_cleaning(merged_df)
@@ -444,10 +558,16 @@ class StrathmoreDataCleaner:
 
 def main():
     """Run data cleaning and merging"""
+    parser = argparse.ArgumentParser(description='Clean and merge Strathmore data')
+    parser.add_argument('--source', choices=SOURCES, default='csv',
+                        help='Read data/raw CSVs, or aggregate in the analytics database')
+    parser.add_argument('--db', type=str, default=DEFAULT_DATABASE, help='Database for --source database')
+    args = parser.parse_args()
+    
     # Create logs directory
     Path('logs').mkdir(exist_ok=True)
     
-    cleaner = StrathmoreDataCleaner()
+    cleaner = StrathmoreDataCleaner(source=args.source, db_path=args.db)
     
     try:
         # Run cleaning and merging
@@ -4,6 +4,13 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import logging
+import sys
+
+if __package__ in (None, ''):
+    # Run as a script (python analytics/data_processing/freature_engineering.py)
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from analytics.feature_engineering.online_store import OnlineFeatureStore
 
 logging.basicConfig(
     level=logging.INFO,
@@ -324,6 +331,11 @@ class FeatureEngineer:
             logger.info(f"\n💾 Saved to: {output_path}")
             logger.info(f"   Size: {output_path.stat().st_size / 1024**2:.2f} MB")
             
+            # Online store: indexed per-student lookups without re-reading the CSV
+            store = OnlineFeatureStore(self.processed_path / 'feature_store.sqlite')
+            store.write(df, source=output_path)
+            logger.info(f"💾 Online feature store: {store.path} ({len(store):,} students)")
+            
             return df
             
         except Exception as e:
@@ -0,0 +1,235 @@
+"""
+Online Feature Store
+====================
+Engineered features materialized into an embedded SQLite table keyed by
+student_id, so one student (or a handful) is an indexed lookup instead of a
+re-parse of features_engineered.csv.
+
+The table is a WITHOUT ROWID table: rows are stored in the student_id
+B-tree itself, so a point lookup is a single O(log n) descent. Writes are
+upserts, which lets one student be refreshed in place, and the database
+runs in WAL mode so readers (the prediction daemon, dashboards) keep
+working while feature engineering rewrites it.
+
+Only the standard library is imported; reads never touch pandas.
+
+Usage:
+    store = OnlineFeatureStore()
+    store.write(df)                          # materialize (feature engineering)
+    store.upsert([{'student_id': 100001, ...}])
+    record = store.get('100001')             # dict, or None
+    records = store.get_many(['100001', '100002'])
+"""
+
+import json
+import math
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_STORE_PATH = 'data/processed/feature_store.sqlite'
+KEY_COLUMN = 'student_id'
+TABLE = 'student_features'
+
+# Bound parameters per IN (...) query, well under SQLite's variable limit
+LOOKUP_BATCH = 500
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _sql_type(dtype):
+    kind = getattr(dtype, 'kind', 'O')
+    if kind in 'biu':
+        return 'INTEGER'
+    if kind == 'f':
+        return 'REAL'
+    return 'TEXT'
+
+
+def _value(value):
+    """Python value for sqlite3 (NaN/NA -> NULL, NumPy scalars -> Python)"""
+    if value is None:
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if not isinstance(value, (int, float, str, bytes)):
+        # pd.NA, timestamps and other pandas scalars
+        return None if str(value) in ('<NA>', 'NaT', 'nan') else str(value)
+    return value
+
+
+class OnlineFeatureStore:
+    """Per-student feature rows in SQLite, keyed by student_id"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def exists(self):
+        return self.path.exists()
+
+    def _connection(self):
+        """One connection per thread (sqlite3 connections are not shareable)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------------------------------------------------------------
+    # Schema
+    # ------------------------------------------------------------------
+
+    def columns(self):
+        """Stored columns in order, [] before the first write"""
+        conn = self._connection()
+        return [row[1] for row in conn.execute(f'PRAGMA table_info({_quote(TABLE)})')]
+
+    def _create(self, conn, columns):
+        definitions = [f'{_quote(KEY_COLUMN)} TEXT PRIMARY KEY'] + [
+            f'{_quote(name)} {sql_type}' for name, sql_type in columns if name != KEY_COLUMN
+        ]
+        conn.execute(f'DROP TABLE IF EXISTS {_quote(TABLE)}')
+        conn.execute(f'CREATE TABLE {_quote(TABLE)} ({", ".join(definitions)}) WITHOUT ROWID')
+        conn.execute('CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)')
+
+    def _set_meta(self, conn, **values):
+        conn.executemany(
+            'INSERT INTO store_meta (key, value) VALUES (?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+            [(key, json.dumps(value)) for key, value in values.items()],
+        )
+
+    def metadata(self):
+        conn = self._connection()
+        try:
+            return {key: json.loads(value) for key, value in conn.execute('SELECT key, value FROM store_meta')}
+        except sqlite3.OperationalError:
+            return {}
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _upsert_rows(self, conn, columns, rows):
+        names = ', '.join(_quote(c) for c in columns)
+        placeholders = ', '.join('?' for _ in columns)
+        updates = ', '.join(f'{_quote(c)} = excluded.{_quote(c)}' for c in columns if c != KEY_COLUMN)
+        sql = (f'INSERT INTO {_quote(TABLE)} ({names}) VALUES ({placeholders}) '
+               f'ON CONFLICT({_quote(KEY_COLUMN)}) DO UPDATE SET {updates}')
+        key = columns.index(KEY_COLUMN)
+
+        def prepared():
+            for row in rows:
+                row = [_value(v) for v in row]
+                row[key] = str(row[key])
+                yield row
+
+        conn.executemany(sql, prepared())
+
+    def write(self, df, source=None):
+        """
+        Materialize a feature DataFrame
+
+        Existing students are updated in place, new ones inserted and students
+        missing from `df` removed. A change of columns rebuilds the table.
+        """
+        if KEY_COLUMN not in df.columns:
+            raise ValueError(f"Feature frame has no {KEY_COLUMN} column")
+
+        columns = [KEY_COLUMN] + [c for c in df.columns if c != KEY_COLUMN]
+        frame = df[columns]
+        conn = self._connection()
+
+        with conn:
+            if self.columns() != columns:
+                self._create(conn, [(c, _sql_type(frame[c].dtype)) for c in columns])
+            self._upsert_rows(conn, columns, frame.itertuples(index=False, name=None))
+
+            # Drop students that are no longer in the feature set
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS current_ids (student_id TEXT PRIMARY KEY)')
+            conn.execute('DELETE FROM current_ids')
+            conn.executemany('INSERT OR IGNORE INTO current_ids VALUES (?)',
+                             ((str(_value(v)),) for v in frame[KEY_COLUMN]))
+            conn.execute(f'DELETE FROM {_quote(TABLE)} WHERE {_quote(KEY_COLUMN)} '
+                         f'NOT IN (SELECT student_id FROM current_ids)')
+
+            self._set_meta(conn, rows=len(frame), source=str(source) if source else None,
+                           updated_at=datetime.now().isoformat(timespec='seconds'))
+        return len(frame)
+
+    def upsert(self, records):
+        """Insert or update individual students (dicts with the stored columns)"""
+        columns = self.columns()
+        if not columns:
+            raise RuntimeError(f"Feature store {self.path} is empty; run feature engineering first")
+
+        unknown = {key for record in records for key in record} - set(columns)
+        if unknown:
+            raise ValueError(f"Unknown feature columns: {sorted(unknown)}")
+
+        # Only the columns present in the records are overwritten
+        present = [c for c in columns if any(c in record for record in records)]
+        if KEY_COLUMN not in present:
+            raise ValueError(f"Records need a {KEY_COLUMN}")
+
+        conn = self._connection()
+        with conn:
+            self._upsert_rows(conn, present, ([record.get(c) for c in present] for record in records))
+            self._set_meta(conn, updated_at=datetime.now().isoformat(timespec='seconds'))
+        return len(records)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _records(self, cursor):
+        names = [d[0] for d in cursor.description]
+        # NULL reads back as NaN, like pd.read_csv(...).to_dict('records')
+        return [
+            {name: math.nan if value is None else value for name, value in zip(names, row)}
+            for row in cursor
+        ]
+
+    def get(self, student_id):
+        """Feature record for one student, or None"""
+        cursor = self._connection().execute(
+            f'SELECT * FROM {_quote(TABLE)} WHERE {_quote(KEY_COLUMN)} = ?', (str(student_id),)
+        )
+        records = self._records(cursor)
+        return records[0] if records else None
+
+    def get_many(self, student_ids):
+        """{student_id: record} for the students that exist"""
+        ids = list(dict.fromkeys(str(s) for s in student_ids))
+        conn = self._connection()
+        found = {}
+        for start in range(0, len(ids), LOOKUP_BATCH):
+            batch = ids[start:start + LOOKUP_BATCH]
+            cursor = conn.execute(
+                f'SELECT * FROM {_quote(TABLE)} WHERE {_quote(KEY_COLUMN)} '
+                f'IN ({", ".join("?" for _ in batch)})', batch
+            )
+            for record in self._records(cursor):
+                found[record[KEY_COLUMN]] = record
+        return found
+
+    def __len__(self):
+        try:
+            return self._connection().execute(f'SELECT COUNT(*) FROM {_quote(TABLE)}').fetchone()[0]
+        except sqlite3.OperationalError:
+            return 0
@@ -0,0 +1,103 @@
+"""
+Request Micro-Batching
+======================
+Coalesces concurrent single-record requests into one model call.
+
+The first queued record opens a batch; the batch is scored as soon as it
+holds max_batch_size records or max_wait_ms has passed, whichever comes
+first. Scoring runs on a dedicated thread so the event loop keeps accepting
+requests while the model works.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+class MicroBatcher:
+    """Queues records and scores them in batches with score_batch(records) -> results"""
+
+    def __init__(self, score_batch, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, metrics=None):
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.metrics = metrics
+        self._queue = None
+        self._task = None
+        # One scoring thread: batches run back to back, never concurrently
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scoring')
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+
+    async def submit(self, record):
+        """Score one record; resolves when its batch has been scored"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future, time.perf_counter()))
+        return await future
+
+    async def run(self, fn, *args):
+        """Run fn on the scoring thread (for requests that are already batches)"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _collect(self):
+        """Wait for a first record, then fill the batch until full or the window closes"""
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            records = [record for record, _, _ in batch]
+
+            start = time.perf_counter()
+            if self.metrics is not None:
+                self.metrics.observe('batch_size', len(batch))
+                self.metrics.increment('batches')
+                for _, _, queued in batch:
+                    self.metrics.observe('queue_wait_ms', (start - queued) * 1000)
+
+            try:
+                results = await loop.run_in_executor(self._executor, self.score_batch, records)
+            except Exception as error:
+                if self.metrics is not None:
+                    self.metrics.increment('errors')
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+
+            if self.metrics is not None:
+                self.metrics.observe('model_latency_ms', (time.perf_counter() - start) * 1000)
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,92 @@
+"""
+Scoring Service
+===============
+Async HTTP service that keeps every risk model resident and coalesces
+concurrent single-student requests into micro-batches.
+
+Usage:
+    python -m backend.api.main
+    python -m backend.api.main --port 8080 --max-batch-size 64 --max-wait-ms 2
+
+    curl -X POST localhost:8000/score -d '{"student_id": 100001,
+        "physical_attendance_rate": 0.62, "cumulative_gpa": 1.9, "avg_grade": 38,
+        "lms_activity_count": 20, "courses_enrolled": 6, "exam_eligible": 0,
+        "low_lms_engagement": 1}'
+    curl localhost:8000/metrics
+    curl 'localhost:8000/rollups?target=dropout&by=school_id,class_level'
+    curl localhost:8000/students/100001/history
+"""
+
+import argparse
+import asyncio
+
+from aiohttp import web
+
+from backend.api.batching import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, MicroBatcher
+from backend.api.metrics import ServiceMetrics
+from backend.api.routes.history import routes as history_routes
+from backend.api.routes.rollups import routes as rollup_routes
+from backend.api.routes.scoring import routes
+from backend.api.scoring import ResidentScorer
+from backend.database.connection import DEFAULT_DATABASE
+from models.loader import HISTORICAL_REF
+from models.prediction_history import DEFAULT_HISTORY_PATH, PredictionHistory
+
+
+def create_app(max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+               ref=HISTORICAL_REF, db_path=DEFAULT_DATABASE, history_path=DEFAULT_HISTORY_PATH):
+    app = web.Application()
+    app['metrics'] = ServiceMetrics()
+    app['db_path'] = db_path
+    app['history'] = PredictionHistory(history_path)
+    app['scorer'] = ResidentScorer(ref=ref)
+    app['batcher'] = MicroBatcher(
+        app['scorer'].score,
+        max_batch_size=max_batch_size,
+        max_wait_ms=max_wait_ms,
+        metrics=app['metrics'],
+    )
+    app.add_routes(routes)
+    app.add_routes(rollup_routes)
+    app.add_routes(history_routes)
+
+    async def on_startup(app):
+        # Load every model before the first request arrives
+        await asyncio.get_running_loop().run_in_executor(None, app['scorer'].bundles)
+        await app['batcher'].start()
+        print(f"✅ Models loaded: {app['scorer'].versions()}")
+
+    async def on_cleanup(app):
+        await app['batcher'].stop()
+
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Student risk scoring service')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help='Records scored together at most')
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help='How long a batch waits for more records')
+    parser.add_argument('--ref', type=str, default=HISTORICAL_REF,
+                        help='Registry ref to serve')
+    parser.add_argument('--db', type=str, default=DEFAULT_DATABASE,
+                        help='Analytics database for /rollups')
+    parser.add_argument('--history', type=str, default=DEFAULT_HISTORY_PATH,
+                        help='Prediction history for /students/{id}/history')
+    args = parser.parse_args()
+
+    print("\n🚀 STUDENT RISK SCORING SERVICE")
+    print(f"   Batching: up to {args.max_batch_size} records / {args.max_wait_ms} ms\n")
+    web.run_app(
+        create_app(args.max_batch_size, args.max_wait_ms, args.ref, args.db, args.history),
+        host=args.host, port=args.port, print=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Service Metrics
+===============
+Fixed-bucket latency histograms and counters for the scoring service,
+exposed as JSON on GET /metrics.
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+
+# Upper bounds (milliseconds) of the latency buckets
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Upper bounds of the batch size buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+# Recent observations kept for percentiles
+RECENT_SAMPLES = 2048
+
+
+class Histogram:
+    """Cumulative bucket counts plus percentiles over recent observations"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = np.zeros(len(self.buckets) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value):
+        self.counts[np.searchsorted(self.buckets, value, side='left')] += 1
+        self.count += 1
+        self.total += value
+        self.recent.append(value)
+
+    def snapshot(self):
+        cumulative = np.cumsum(self.counts).tolist()
+        labels = [f'le_{b}' for b in self.buckets] + ['le_inf']
+        snapshot = {
+            'count': self.count,
+            'sum': round(self.total, 3),
+            'mean': round(self.total / self.count, 3) if self.count else None,
+            'buckets': dict(zip(labels, cumulative)),
+        }
+        if self.recent:
+            p50, p95, p99 = np.percentile(np.fromiter(self.recent, dtype=np.float64), [50, 95, 99])
+            snapshot.update({'p50': round(p50, 3), 'p95': round(p95, 3), 'p99': round(p99, 3)})
+        return snapshot
+
+
+class ServiceMetrics:
+    """Every histogram and counter the service reports"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.histograms = {
+            'request_latency_ms': Histogram(LATENCY_BUCKETS_MS),
+            'queue_wait_ms': Histogram(LATENCY_BUCKETS_MS),
+            'model_latency_ms': Histogram(LATENCY_BUCKETS_MS),
+            'batch_size': Histogram(BATCH_SIZE_BUCKETS),
+        }
+        self.counters = {'requests': 0, 'records': 0, 'batches': 0, 'errors': 0}
+
+    def observe(self, name, value):
+        self.histograms[name].observe(value)
+
+    def increment(self, name, amount=1):
+        self.counters[name] += amount
+
+    def snapshot(self):
+        return {
+            'uptime_seconds': round(time.time() - self.started, 1),
+            'counters': dict(self.counters),
+            'histograms': {name: h.snapshot() for name, h in self.histograms.items()},
+        }
@@ -0,0 +1,29 @@
+"""
+History Routes
+==============
+    GET /students/{student_id}/history
+        every stored run of one student (probability and risk level per
+        target), read from the prediction history (models/prediction_history.py)
+"""
+
+import asyncio
+
+from aiohttp import web
+
+routes = web.RouteTableDef()
+
+
+@routes.get('/students/{student_id}/history')
+async def student_history(request):
+    try:
+        student_id = int(request.match_info['student_id'])
+    except ValueError:
+        return web.json_response({'error': 'student_id must be an integer'}, status=400)
+
+    history = request.app['history']
+    loop = asyncio.get_running_loop()
+    frame = await loop.run_in_executor(None, history.trajectory, student_id)
+    if frame.empty:
+        return web.json_response({'error': f'No stored predictions for student {student_id}'}, status=404)
+
+    return web.json_response({'student_id': student_id, 'runs': frame.to_dict(orient='records')})
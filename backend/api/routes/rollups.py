@@ -0,0 +1,31 @@
+"""
+Rollup Routes
+=============
+    GET /rollups?target=dropout&by=school_id,class_level
+        students and mean probability per group, read from the materialized
+        risk rollups (backend/database/rollups.py)
+"""
+
+import asyncio
+
+from aiohttp import web
+
+from backend.database.rollups import read_rollups
+
+routes = web.RouteTableDef()
+
+
+@routes.get('/rollups')
+async def rollups(request):
+    target = request.query.get('target', 'dropout')
+    by = [c for c in request.query.get('by', 'school_id').split(',') if c]
+
+    loop = asyncio.get_running_loop()
+    try:
+        frame = await loop.run_in_executor(None, read_rollups, target, by, request.app['db_path'])
+    except ValueError as error:
+        return web.json_response({'error': str(error)}, status=400)
+    except FileNotFoundError:
+        return web.json_response({'error': 'Analytics database not found'}, status=503)
+
+    return web.json_response({'target': target, 'by': by, 'groups': frame.to_dict(orient='records')})
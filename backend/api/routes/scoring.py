@@ -0,0 +1,94 @@
+"""
+Scoring Routes
+==============
+    POST /score         one student record  -> risk for every target
+    POST /score/batch   {"students": [...]} -> list of results
+    GET  /metrics       latency histograms and counters
+    GET  /health        model versions currently served
+"""
+
+import time
+
+from aiohttp import web
+
+from backend.api.scoring import invalid_fields
+
+routes = web.RouteTableDef()
+
+
+def _error(status, message):
+    return web.json_response({'error': message}, status=status)
+
+
+async def _read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+@routes.post('/score')
+async def score(request):
+    start = time.perf_counter()
+    metrics = request.app['metrics']
+    metrics.increment('requests')
+
+    record = await _read_json(request)
+    if not isinstance(record, dict):
+        return _error(400, 'Body must be a JSON object with the student fields')
+    invalid = invalid_fields(record)
+    if invalid:
+        return _error(400, f"Fields must be numbers or null: {', '.join(invalid)}")
+
+    try:
+        result = await request.app['batcher'].submit(record)
+    except Exception as error:
+        return _error(500, f'Scoring failed: {error}')
+
+    metrics.increment('records')
+    metrics.observe('request_latency_ms', (time.perf_counter() - start) * 1000)
+    return web.json_response(result)
+
+
+@routes.post('/score/batch')
+async def score_batch(request):
+    start = time.perf_counter()
+    metrics = request.app['metrics']
+    metrics.increment('requests')
+
+    body = await _read_json(request)
+    students = body.get('students') if isinstance(body, dict) else None
+    if not isinstance(students, list) or not all(isinstance(s, dict) for s in students):
+        return _error(400, 'Body must be {"students": [{...}, ...]}')
+    for i, student in enumerate(students):
+        invalid = invalid_fields(student)
+        if invalid:
+            return _error(400, f"students[{i}]: fields must be numbers or null: {', '.join(invalid)}")
+    if not students:
+        return web.json_response({'results': []})
+
+    # Already a batch: score directly on the scoring thread, skipping the queue
+    try:
+        results = await request.app['batcher'].run(request.app['scorer'].score, students)
+    except Exception as error:
+        return _error(500, f'Scoring failed: {error}')
+
+    metrics.increment('records', len(students))
+    metrics.observe('request_latency_ms', (time.perf_counter() - start) * 1000)
+    return web.json_response({'results': results})
+
+
+@routes.get('/metrics')
+async def get_metrics(request):
+    snapshot = request.app['metrics'].snapshot()
+    batcher = request.app['batcher']
+    snapshot['batching'] = {
+        'max_batch_size': batcher.max_batch_size,
+        'max_wait_ms': batcher.max_wait * 1000,
+    }
+    return web.json_response(snapshot)
+
+
+@routes.get('/health')
+async def health(request):
+    return web.json_response({'status': 'ok', 'versions': request.app['scorer'].versions()})
@@ -0,0 +1,84 @@
+"""
+Resident Scorer
+===============
+Scores batches of student records with every risk model kept in memory.
+
+Records use the current-data field names (physical_attendance_rate,
+cumulative_gpa, ...); missing fields are scored as missing values.
+"""
+
+import pandas as pd
+
+from models.features import INPUT_FIELDS, TARGETS, prepare_features_from_current_data
+from models.loader import HISTORICAL_REF, load_model, resolve_version
+
+
+def invalid_fields(record):
+    """Input fields of a record whose value is neither a number nor null"""
+    invalid = []
+    for field in INPUT_FIELDS:
+        value = record.get(field)
+        if value is None or (isinstance(value, (int, float)) and not isinstance(value, bool)):
+            continue
+        try:
+            float(value)
+        except (TypeError, ValueError):
+            invalid.append(field)
+    return invalid
+
+
+class ResidentScorer:
+    """Every target's model bundle, loaded once and reused for every batch"""
+
+    def __init__(self, ref=HISTORICAL_REF, targets=TARGETS):
+        self.ref = ref
+        self.targets = targets
+
+    def bundles(self):
+        """
+        Current bundle per target
+
+        load_model re-reads the ref each call, so a newly promoted version is
+        picked up without a restart; loaded versions stay cached.
+        """
+        bundles = {name: load_model(target, self.ref) for name, target in self.targets.items()}
+        for bundle in bundles.values():
+            # Batches are small; joblib thread dispatch would dominate
+            if getattr(bundle.model, 'n_jobs', None) not in (None, 1):
+                bundle.model.n_jobs = 1
+        return bundles
+
+    def versions(self):
+        """
+        Version each target is scored with, read from the ref
+
+        Nothing is loaded, so /health stays cheap on the event loop right
+        after a new version is promoted.
+        """
+        version = resolve_version(self.ref)
+        return {name: version for name in self.targets}
+
+    def score(self, records):
+        """One result dict per record, in order (a record may be empty: all missing)"""
+        if not records:
+            return []
+        # Explicit index: records without any field still get their own row
+        df = pd.DataFrame.from_records(records, index=range(len(records))).reindex(
+            columns=list(dict.fromkeys(INPUT_FIELDS + ['student_id']))
+        )
+        for field in INPUT_FIELDS:
+            df[field] = pd.to_numeric(df[field], errors='coerce')
+        features = prepare_features_from_current_data(df)
+
+        # NaN is not valid JSON: a missing student_id is returned as null
+        results = [{'student_id': None if pd.isna(sid) else sid} for sid in df['student_id'].astype(object)]
+        for name, bundle in self.bundles().items():
+            probabilities = bundle.risk_probability(features)
+            levels = bundle.risk_levels(probabilities)
+            for result, probability, level in zip(results, probabilities, levels):
+                result[name] = {
+                    'probability': float(probability),
+                    'risk_level': str(level),
+                    'version': bundle.version,
+                }
+        return results
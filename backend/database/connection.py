@@ -0,0 +1,165 @@
+"""
+Database Connection
+===================
+One pooled SQLAlchemy engine per process for the analytics database, with
+the SQLite pragmas set on every new connection:
+
+    journal_mode=WAL        readers never block the writer (and vice versa)
+    synchronous=NORMAL      fsync at checkpoints only; safe with WAL
+    mmap_size               reads served from the page cache without copies
+    cache_size              per-connection page cache
+    busy_timeout            wait for a competing writer instead of failing
+
+Sessions for the API are thread-local (`get_session()` / `session_scope()`).
+Analytics queries use a separate read-only engine that opens the file with
+mode=ro and query_only, so a report can never take the write lock.
+
+Usage:
+    from backend.database.connection import get_engine, session_scope, read_connection
+
+    with session_scope() as session:
+        session.execute(...)
+
+    with read_connection() as conn:
+        pd.read_sql('SELECT ...', conn)
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+DEFAULT_DATABASE = os.environ.get('STRATHMORE_DB', 'strathmore_analytics.db')
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 ** 2,      # bytes
+    'cache_size': -64 * 1024,          # negative = KiB (64 MB)
+    'busy_timeout': 30000,             # ms
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+# journal_mode is a property of the file; a read-only connection cannot set it
+READ_ONLY_PRAGMAS = {key: value for key, value in PRAGMAS.items() if key != 'journal_mode'}
+READ_ONLY_PRAGMAS['query_only'] = 'ON'
+
+POOL_SIZE = 5
+MAX_OVERFLOW = 10
+
+_engines = {}
+_sessions = {}
+_lock = threading.RLock()
+
+
+def _apply_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for key, value in pragmas.items():
+            cursor.execute(f'PRAGMA {key}={value}')
+        cursor.close()
+    return on_connect
+
+
+def _build_engine(path, read_only):
+    path = Path(path).resolve()
+    if read_only:
+        url = f'sqlite:///file:{path}?mode=ro&uri=true'
+        pragmas = READ_ONLY_PRAGMAS
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        url = f'sqlite:///{path}'
+        pragmas = PRAGMAS
+
+    engine = create_engine(
+        url,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        # Pooled connections move between threads; SQLite allows it in
+        # serialized mode as long as one thread uses a connection at a time
+        connect_args={'check_same_thread': False, 'timeout': PRAGMAS['busy_timeout'] / 1000},
+    )
+    event.listen(engine, 'connect', _apply_pragmas(pragmas))
+    return engine
+
+
+def _key(path, *extra):
+    # Keyed by pid: a forked worker must not reuse its parent's connections
+    return (os.getpid(), str(Path(path).resolve())) + extra
+
+
+def _engine(path, read_only):
+    key = _key(path, read_only)
+    engine = _engines.get(key)
+    if engine is None:
+        with _lock:
+            engine = _engines.get(key)
+            if engine is None:
+                engine = _engines[key] = _build_engine(path, read_only)
+    return engine
+
+
+def get_engine(path=DEFAULT_DATABASE):
+    """Shared read-write engine for this process"""
+    return _engine(path, read_only=False)
+
+
+def get_read_engine(path=DEFAULT_DATABASE):
+    """Shared read-only engine for this process (the database must exist)"""
+    if _key(path, True) not in _engines:
+        if not Path(path).exists():
+            raise FileNotFoundError(f"Database not found: {path}")
+        # mode=ro cannot create the WAL index; let the writer set it up first
+        with get_engine(path).connect():
+            pass
+    return _engine(path, read_only=True)
+
+
+def get_session(path=DEFAULT_DATABASE):
+    """Thread-local session registry: each thread gets its own Session"""
+    key = _key(path)
+    registry = _sessions.get(key)
+    if registry is None:
+        with _lock:
+            registry = _sessions.get(key)
+            if registry is None:
+                registry = _sessions[key] = scoped_session(sessionmaker(bind=get_engine(path)))
+    return registry
+
+
+@contextmanager
+def session_scope(path=DEFAULT_DATABASE):
+    """Session that commits on success and rolls back on error"""
+    session = get_session(path)()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+@contextmanager
+def read_connection(path=DEFAULT_DATABASE):
+    """Read-only connection for analytics queries"""
+    with get_read_engine(path).connect() as conn:
+        yield conn
+
+
+def dispose_engines():
+    """Close every pooled connection of this process (e.g. before exit or fork)"""
+    with _lock:
+        for key, registry in list(_sessions.items()):
+            if key[0] == os.getpid():
+                registry.remove()
+                del _sessions[key]
+        for key, engine in list(_engines.items()):
+            if key[0] == os.getpid():
+                engine.dispose()
+                del _engines[key]
@@ -0,0 +1,343 @@
+"""
+ORM Models
+==========
+SQLAlchemy models mirroring backend/database/schema.sql, which stays the
+source of truth for the DDL (scripts/setup_database.py checks that the two
+agree).
+
+Usage:
+    from backend.database.connection import session_scope
+    from backend.database.models import AttendanceRecord
+
+    with session_scope() as session:
+        rows = session.query(AttendanceRecord).filter_by(student_id=100001).all()
+"""
+
+from pathlib import Path
+
+from sqlalchemy import (CheckConstraint, Column, Float, ForeignKey, Index, Integer,
+                        PrimaryKeyConstraint, Text)
+from sqlalchemy.orm import declarative_base, relationship
+
+SCHEMA_PATH = Path(__file__).with_name('schema.sql')
+
+Base = declarative_base()
+
+SQLITE_TYPES = {Integer: 'INTEGER', Text: 'TEXT', Float: 'REAL'}
+
+
+def schema_statements(path=SCHEMA_PATH):
+    """DDL statements of schema.sql, comments stripped"""
+    lines = [line.split('--', 1)[0] for line in Path(path).read_text().splitlines()]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+
+def declared_columns(table):
+    """[(name, SQLite type, primary-key position)] of a model's table"""
+    columns = Base.metadata.tables[table].columns
+    primary_key = [c.name for c in Base.metadata.tables[table].primary_key.columns]
+    return [
+        (c.name, SQLITE_TYPES[type(c.type)], primary_key.index(c.name) + 1 if c.name in primary_key else 0)
+        for c in columns
+    ]
+
+
+def database_columns(cursor, table):
+    """Same shape as declared_columns, read from the database ([] if missing)"""
+    return [(row[1], row[2].upper(), row[5]) for row in cursor.execute(f'PRAGMA table_info("{table}")')]
+
+
+def declared_indexes(table):
+    """{index name: [columns]} of a model's table"""
+    return {index.name: [c.name for c in index.columns] for index in Base.metadata.tables[table].indexes}
+
+
+def index_columns(cursor, index):
+    """Columns of an index in the database ([] if missing)"""
+    return [row[2] for row in cursor.execute(f'PRAGMA index_info("{index}")')]
+
+
+# Loaded from data/raw by scripts/csv_to_sql.py: a drifted table can be
+# dropped and recreated, the next load fills it again. Every other table
+# (predictions, runs, rollups) holds data nothing regenerates.
+SOURCE_TABLES = (
+    'schools', 'programs', 'courses', 'students',
+    'sis_enrollments', 'attendance_records', 'lms_activities',
+)
+
+# Row hashes of csv_to_sql.py --sync, keyed by (table_name, source_key)
+SYNC_HASH_TABLE = 'sync_row_hashes'
+
+
+class SchemaDriftError(RuntimeError):
+    """A persisted table differs from its model in a way that cannot be migrated in place"""
+
+
+def _migrate_persisted(cursor, table, existing):
+    """
+    Bring a persisted table up to its model without losing rows
+
+    Declared columns missing from the table are added (ALTER TABLE ... ADD
+    COLUMN, nullable only); anything else (changed type or key, dropped or
+    NOT NULL column) raises SchemaDriftError. Returns the added columns.
+    """
+    declared = {name: (kind, key) for name, kind, key in declared_columns(table)}
+    current = {name: (kind, key) for name, kind, key in existing}
+    changed = [name for name in current if current[name] != declared.get(name)]
+    if changed:
+        raise SchemaDriftError(f"{table}: columns {', '.join(changed)} differ from models.py; "
+                               "migrate the table by hand (its rows are not regenerated)")
+
+    added = []
+    for column in Base.metadata.tables[table].columns:
+        if column.name in current:
+            continue
+        if column.primary_key or not column.nullable:
+            raise SchemaDriftError(f"{table}: cannot add NOT NULL or key column {column.name} in place")
+        cursor.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column.name}" {SQLITE_TYPES[type(column.type)]}')
+        added.append(f'{table}.{column.name}')
+    return added
+
+
+def apply_schema(cursor, path=SCHEMA_PATH):
+    """
+    Create missing tables and indexes on a DB-API cursor
+
+    A source table (SOURCE_TABLES) whose columns, types or keys differ from
+    its model (e.g. one created by an older pandas-inferred load) is dropped
+    and recreated empty, and its --sync row hashes are cleared so the next
+    sync writes every row again. Any other table is migrated in place: new
+    nullable columns are added, other drift raises SchemaDriftError. An
+    index whose columns changed is dropped and rebuilt. Statements run one
+    by one (not executescript) so this can happen inside the caller's
+    transaction; a dropped parent table leaves its children's foreign keys
+    dangling until it is reloaded, so callers run it with foreign_keys=OFF.
+    Returns the recreated tables, added columns and rebuilt indexes.
+    """
+    rebuilt = []
+    has_hashes = bool(database_columns(cursor, SYNC_HASH_TABLE))
+    for table in Base.metadata.tables:
+        existing = database_columns(cursor, table)
+        if existing and sorted(existing) != sorted(declared_columns(table)):
+            if table not in SOURCE_TABLES:
+                rebuilt += _migrate_persisted(cursor, table, existing)
+            else:
+                cursor.execute(f'DROP TABLE "{table}"')
+                if has_hashes:
+                    # The hashes describe rows that are gone
+                    cursor.execute(f'DELETE FROM {SYNC_HASH_TABLE} WHERE table_name = ?', (table,))
+                rebuilt.append(table)
+                continue
+        for index, columns in declared_indexes(table).items():
+            current = index_columns(cursor, index)
+            if current and current != columns:
+                cursor.execute(f'DROP INDEX "{index}"')
+                rebuilt.append(index)
+    for statement in schema_statements(path):
+        cursor.execute(statement)
+    return rebuilt
+
+
+class School(Base):
+    __tablename__ = 'schools'
+
+    school_id = Column(Text, primary_key=True)
+    name = Column(Text, nullable=False)
+    dean = Column(Text)
+    building = Column(Text)
+
+
+class Program(Base):
+    __tablename__ = 'programs'
+    __table_args__ = (Index('ix_programs_school', 'school_id'),)
+
+    program_id = Column(Text, primary_key=True)
+    program_code = Column(Text, nullable=False)
+    name = Column(Text, nullable=False)
+    school_id = Column(Text, ForeignKey('schools.school_id'), nullable=False)
+    degree_type = Column(Text)
+    duration_years = Column(Integer)
+    credits_required = Column(Integer)
+
+
+class Course(Base):
+    __tablename__ = 'courses'
+    __table_args__ = (Index('ix_courses_school', 'school_id'),)
+
+    course_id = Column(Text, primary_key=True)
+    unit_code = Column(Text, nullable=False)
+    course_name = Column(Text, nullable=False)
+    year_level = Column(Integer)
+    semester = Column(Integer)
+    school_id = Column(Text, ForeignKey('schools.school_id'))
+    credit_hours = Column(Integer)
+    physical_hours_per_week = Column(Integer)
+    online_hours_per_week = Column(Integer)
+    total_weeks = Column(Integer)
+    physical_sessions_total = Column(Integer)
+    online_sessions_total = Column(Integer)
+    physical_percentage = Column(Float)
+    online_percentage = Column(Float)
+
+
+class Student(Base):
+    __tablename__ = 'students'
+    __table_args__ = (
+        Index('ix_students_school_class', 'school_id', 'class_level'),
+        Index('ix_students_program', 'program_id'),
+    )
+
+    student_id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(Text, nullable=False)
+    email = Column(Text)
+    gender = Column(Text)
+    age = Column(Integer)
+    program_id = Column(Text, ForeignKey('programs.program_id'))
+    program_code = Column(Text)
+    school_id = Column(Text, ForeignKey('schools.school_id'))
+    year_of_study = Column(Integer)
+    semester = Column(Integer)
+    class_level = Column(Text)
+    enrollment_date = Column(Text)
+    status = Column(Text)
+
+    enrollments = relationship('Enrollment', back_populates='student', lazy='selectin')
+
+
+class Enrollment(Base):
+    __tablename__ = 'sis_enrollments'
+    __table_args__ = (
+        Index('ux_sis_enrollments_enrollment_id', 'enrollment_id', unique=True),
+        Index('ix_sis_enrollments_student_course', 'student_id', 'course_id'),
+        Index('ix_sis_enrollments_course', 'course_id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    enrollment_id = Column(Text, nullable=False)
+    student_id = Column(Integer, ForeignKey('students.student_id'), nullable=False)
+    course_id = Column(Text, ForeignKey('courses.course_id'), nullable=False)
+    unit_code = Column(Text)
+    semester = Column(Text)
+    year_level = Column(Integer)
+    class_level = Column(Text)
+    grade = Column(Float)
+    gpa = Column(Float)
+    credits = Column(Integer)
+    status = Column(Text)
+
+    student = relationship('Student', back_populates='enrollments')
+    course = relationship('Course')
+
+
+class AttendanceRecord(Base):
+    __tablename__ = 'attendance_records'
+    __table_args__ = (
+        Index('ux_attendance_records_attendance_id', 'attendance_id', unique=True),
+        Index('ix_attendance_student_course', 'student_id', 'course_id', 'status'),
+        Index('ix_attendance_student_date', 'student_id', 'session_date'),
+        Index('ix_attendance_course_date', 'course_id', 'session_date'),
+        CheckConstraint('late IN (0, 1)'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    attendance_id = Column(Text, nullable=False)
+    student_id = Column(Integer, ForeignKey('students.student_id'), nullable=False)
+    course_id = Column(Text, ForeignKey('courses.course_id'), nullable=False)
+    unit_code = Column(Text)
+    session_date = Column(Text, nullable=False)
+    session_type = Column(Text)
+    status = Column(Text, nullable=False)
+    late = Column(Integer, nullable=False, default=0)
+
+
+class LmsActivity(Base):
+    __tablename__ = 'lms_activities'
+    __table_args__ = (
+        Index('ux_lms_activities_activity_id', 'activity_id', unique=True),
+        Index('ix_lms_student_course', 'student_id', 'course_id', 'duration_minutes'),
+        Index('ix_lms_student_date', 'student_id', 'activity_date'),
+        CheckConstraint('completed IN (0, 1)'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    activity_id = Column(Text, nullable=False)
+    student_id = Column(Integer, ForeignKey('students.student_id'), nullable=False)
+    course_id = Column(Text, ForeignKey('courses.course_id'), nullable=False)
+    unit_code = Column(Text)
+    activity_type = Column(Text)
+    activity_date = Column(Text, nullable=False)
+    timestamp = Column(Text)
+    duration_minutes = Column(Integer)
+    completed = Column(Integer, nullable=False, default=0)
+
+
+class PredictionRun(Base):
+    __tablename__ = 'prediction_runs'
+
+    run_id = Column(Text, primary_key=True)
+    model_version = Column(Text, nullable=False)
+    started_at = Column(Text, nullable=False)
+    finished_at = Column(Text)
+    students = Column(Integer)
+    status = Column(Text, nullable=False, default='running')
+    source = Column(Text)
+    rescored = Column(Integer)
+    duration_seconds = Column(Float)
+    rows_per_sec = Column(Float)
+
+
+class Prediction(Base):
+    __tablename__ = 'predictions'
+    __table_args__ = (
+        PrimaryKeyConstraint('run_id', 'student_id'),
+        Index('ix_predictions_student_run', 'student_id', 'run_id'),
+        {'sqlite_with_rowid': False},
+    )
+
+    run_id = Column(Text, ForeignKey('prediction_runs.run_id'), nullable=False)
+    student_id = Column(Integer, nullable=False, autoincrement=False)
+    dropout_probability = Column(Float, nullable=False)
+    dropout_risk_level = Column(Text, nullable=False)
+    failure_probability = Column(Float)
+    failure_risk_level = Column(Text)
+    delay_probability = Column(Float)
+    delay_risk_level = Column(Text)
+
+
+class RiskRollup(Base):
+    __tablename__ = 'risk_rollups'
+    __table_args__ = (
+        PrimaryKeyConstraint('target', 'school_id', 'program_id', 'class_level', 'risk_level'),
+        {'sqlite_with_rowid': False},
+    )
+
+    target = Column(Text, nullable=False)
+    school_id = Column(Text, nullable=False)
+    program_id = Column(Text, nullable=False)
+    class_level = Column(Text, nullable=False)
+    risk_level = Column(Text, nullable=False)
+    students = Column(Integer, nullable=False)
+    probability_sum = Column(Float, nullable=False)
+
+
+class RiskRollupMember(Base):
+    __tablename__ = 'risk_rollup_members'
+    __table_args__ = (
+        PrimaryKeyConstraint('student_id', 'target'),
+        {'sqlite_with_rowid': False},
+    )
+
+    target = Column(Text, nullable=False)
+    student_id = Column(Integer, nullable=False, autoincrement=False)
+    school_id = Column(Text, nullable=False)
+    program_id = Column(Text, nullable=False)
+    class_level = Column(Text, nullable=False)
+    risk_level = Column(Text, nullable=False)
+    probability = Column(Float, nullable=False)
+
+
+class RiskRollupStudent(Base):
+    __tablename__ = 'risk_rollup_students'
+
+    student_id = Column(Integer, primary_key=True, autoincrement=False)
+    row_hash = Column(Integer, nullable=False)
@@ -0,0 +1,283 @@
+"""
+Risk Rollups
+============
+Materialized risk counts per target x school x program x class level x
+risk level (risk_rollups), kept current by the scoring run.
+
+refresh_rollups() hashes each student's rolled-up row and stages it in a
+temporary table; one SQL join against the hash stored at the last refresh
+(risk_rollup_students) finds the students that changed. Only their previous
+contribution (risk_rollup_members) is subtracted from its group and the new
+one added, in one transaction, so a student who moved class is moved
+exactly. Scored chunks can be staged as they are produced (RollupStaging),
+so memory does not grow with the population.
+Dashboards and the API read the rollup table, whose size depends on the
+number of groups, not students.
+
+Usage:
+    from backend.database.rollups import RollupStaging, read_rollups, refresh_rollups
+
+    refresh_rollups(scored_df, complete=True)          # after a scoring run
+    staging = RollupStaging()                          # ... or chunk by chunk
+    staging.add(chunk)
+    staging.finish(complete=True)
+    read_rollups('dropout', by=['school_id'])          # students, mean probability per school
+
+    python -m backend.database.rollups --target failure --by school_id class_level
+    python -m backend.database.rollups --rebuild       # recompute the groups from the members
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from backend.database.connection import DEFAULT_DATABASE, PRAGMAS, get_engine, read_connection
+from backend.database.models import apply_schema
+
+GROUP_COLUMNS = ['school_id', 'program_id', 'class_level']
+
+# Columns of risk_rollup_members (and of the staging table)
+MEMBER_COLUMNS = ['target', 'student_id'] + GROUP_COLUMNS + ['risk_level', 'probability']
+
+_GROUP_KEY = ', '.join(['target'] + GROUP_COLUMNS + ['risk_level'])
+
+
+def _rollup_frame(scored):
+    """student_id, normalized group columns and the scored targets' columns"""
+    columns = {'student_id': scored['student_id'].astype(np.int64)}
+    for column in GROUP_COLUMNS:
+        if column in scored.columns:
+            values = scored[column].astype(object)
+            columns[column] = values.where(values.notna(), '').astype(str)
+        else:
+            columns[column] = pd.Series('', index=scored.index)
+
+    targets = [c[:-len('_probability')] for c in scored.columns
+               if c.endswith('_probability') and f"{c[:-len('_probability')]}_risk_level" in scored.columns]
+    if not targets:
+        raise ValueError("No <target>_probability / <target>_risk_level columns to roll up")
+    for target in targets:
+        columns[f'{target}_probability'] = scored[f'{target}_probability'].astype(float)
+        columns[f'{target}_risk_level'] = scored[f'{target}_risk_level'].astype(str)
+    return pd.DataFrame(columns), targets
+
+
+def contributions(frame, targets):
+    """Long-form rows (MEMBER_COLUMNS) of a _rollup_frame"""
+    return pd.concat([
+        pd.DataFrame({
+            'target': target,
+            **{c: frame[c] for c in ['student_id'] + GROUP_COLUMNS},
+            'risk_level': frame[f'{target}_risk_level'],
+            'probability': frame[f'{target}_probability'],
+        })
+        for target in targets
+    ], ignore_index=True)[MEMBER_COLUMNS]
+
+
+def _apply_delta(cursor, source, sign):
+    """Add (sign '+') or subtract (sign '-') the changed students of `source`"""
+    cursor.execute(
+        f'INSERT INTO risk_rollups ({_GROUP_KEY}, students, probability_sum) '
+        f'SELECT {_GROUP_KEY}, {sign}COUNT(*), {sign}SUM(probability) '
+        f'FROM {source} JOIN temp.rollup_changed USING (student_id) '
+        f'WHERE true GROUP BY {_GROUP_KEY} '
+        f'ON CONFLICT ({_GROUP_KEY}) DO UPDATE SET '
+        'students = students + excluded.students, '
+        'probability_sum = probability_sum + excluded.probability_sum'
+    )
+
+
+class RollupStaging:
+    """
+    Scored rows staged for one rollup refresh
+
+    add() copies a chunk's rolled-up rows and hashes into temporary tables of
+    this connection (no lock on the database file, nothing kept in Python),
+    so a streaming scorer can stage the whole population with flat memory.
+    finish() compares and applies them in one transaction.
+    """
+
+    def __init__(self, db_path=DEFAULT_DATABASE):
+        self.conn = get_engine(db_path).raw_connection()
+        self.cursor = self.conn.cursor()
+        self.students = 0
+        try:
+            # Staged rows go to a temporary file, not RAM (restored in close())
+            self.cursor.execute('PRAGMA temp_store=FILE')
+            self.cursor.execute(
+                'CREATE TEMP TABLE IF NOT EXISTS rollup_input (target TEXT, student_id INTEGER, '
+                'school_id TEXT, program_id TEXT, class_level TEXT, risk_level TEXT, probability REAL)'
+            )
+            self.cursor.execute('CREATE TEMP TABLE IF NOT EXISTS rollup_input_hashes '
+                                '(student_id INTEGER PRIMARY KEY, row_hash INTEGER NOT NULL)')
+            self.cursor.execute('CREATE TEMP TABLE IF NOT EXISTS rollup_changed (student_id INTEGER PRIMARY KEY)')
+            for table in ('rollup_input', 'rollup_input_hashes', 'rollup_changed'):
+                self.cursor.execute(f'DELETE FROM temp.{table}')
+            self.conn.commit()
+        except BaseException:
+            self.close()
+            raise
+
+    def add(self, scored):
+        """Stage one scored chunk (same columns as refresh_rollups' frame)"""
+        frame, targets = _rollup_frame(scored)
+        hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy().view('int64')
+        rows = contributions(frame, targets)
+        self.cursor.executemany('INSERT INTO temp.rollup_input_hashes VALUES (?, ?)',
+                                zip(frame['student_id'].tolist(), hashes.tolist()))
+        self.cursor.executemany(
+            f'INSERT INTO temp.rollup_input ({", ".join(MEMBER_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            zip(*[rows[c].tolist() for c in MEMBER_COLUMNS]),
+        )
+        self.conn.commit()
+        self.students += len(frame)
+
+    def finish(self, complete=False):
+        """Apply the staged rows (see refresh_rollups) and close; returns {'students', 'changed'}"""
+        columns = ', '.join(MEMBER_COLUMNS)
+        cursor = self.cursor
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            apply_schema(cursor)
+
+            cursor.execute('INSERT INTO temp.rollup_changed SELECT i.student_id FROM temp.rollup_input_hashes i '
+                           'LEFT JOIN risk_rollup_students s ON s.student_id = i.student_id '
+                           'WHERE s.row_hash IS NULL OR s.row_hash != i.row_hash')
+            changed = cursor.rowcount
+            if complete:
+                cursor.execute('INSERT INTO temp.rollup_changed SELECT student_id FROM risk_rollup_students '
+                               'WHERE student_id NOT IN (SELECT student_id FROM temp.rollup_input_hashes)')
+                changed += cursor.rowcount
+
+            if changed:
+                # Old contributions out, new ones in
+                _apply_delta(cursor, 'risk_rollup_members', '-')
+                cursor.execute('DELETE FROM risk_rollup_members WHERE student_id IN '
+                               '(SELECT student_id FROM temp.rollup_changed)')
+                cursor.execute(f'INSERT INTO risk_rollup_members ({columns}) SELECT {columns} '
+                               'FROM temp.rollup_input JOIN temp.rollup_changed USING (student_id)')
+                _apply_delta(cursor, 'temp.rollup_input', '+')
+                cursor.execute('DELETE FROM risk_rollups WHERE students <= 0')
+
+                cursor.execute('INSERT OR REPLACE INTO risk_rollup_students (student_id, row_hash) '
+                               'SELECT student_id, row_hash FROM temp.rollup_input_hashes '
+                               'JOIN temp.rollup_changed USING (student_id)')
+                cursor.execute('DELETE FROM risk_rollup_students WHERE student_id IN '
+                               '(SELECT student_id FROM temp.rollup_changed) AND student_id NOT IN '
+                               '(SELECT student_id FROM temp.rollup_input_hashes)')
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self.close()
+        return {'students': self.students, 'changed': changed}
+
+    def close(self):
+        """Drop the staged rows and release the connection"""
+        try:
+            for table in ('rollup_input', 'rollup_input_hashes', 'rollup_changed'):
+                self.cursor.execute(f'DROP TABLE IF EXISTS temp.{table}')
+            self.cursor.execute(f"PRAGMA temp_store={PRAGMAS['temp_store']}")
+        finally:
+            self.cursor.close()
+            self.conn.close()
+
+
+def refresh_rollups(scored, db_path=DEFAULT_DATABASE, complete=False):
+    """
+    Bring risk_rollups up to date with a scored frame
+
+    scored:   student_id, school_id, program_id, class_level and the
+              <target>_probability / <target>_risk_level columns
+    complete: the frame holds every current student, so students missing
+              from it are removed from the rollups
+
+    Students are compared by a hash of their rolled-up row; only new,
+    changed or removed students are written, and a changed student's
+    contributions are replaced for every target. Streaming callers stage
+    chunks with RollupStaging instead. Returns {'students', 'changed'}.
+    """
+    staging = RollupStaging(db_path)
+    try:
+        staging.add(scored)
+    except BaseException:
+        staging.close()
+        raise
+    return staging.finish(complete=complete)
+
+
+def rebuild_rollups(db_path=DEFAULT_DATABASE):
+    """
+    Recompute risk_rollups from the members
+
+    Clears accumulated float error and any group drifted by an interrupted
+    refresh. Returns the number of groups.
+    """
+    with get_engine(db_path).begin() as conn:
+        conn.exec_driver_sql('DELETE FROM risk_rollups')
+        conn.exec_driver_sql(
+            f'INSERT INTO risk_rollups ({_GROUP_KEY}, students, probability_sum) '
+            f'SELECT {_GROUP_KEY}, COUNT(*), SUM(probability) FROM risk_rollup_members GROUP BY {_GROUP_KEY}'
+        )
+        return conn.exec_driver_sql('SELECT COUNT(*) FROM risk_rollups').scalar()
+
+
+def read_rollups(target='dropout', by=('school_id',), db_path=DEFAULT_DATABASE):
+    """
+    Students and mean probability of one target, grouped by `by`
+
+    by: any of GROUP_COLUMNS and 'risk_level'. Empty if the rollups were
+    never materialized.
+    """
+    by = list(by)
+    unknown = [c for c in by if c not in GROUP_COLUMNS + ['risk_level']]
+    if unknown:
+        raise ValueError(f"Cannot group rollups by: {', '.join(unknown)}")
+    keys = ', '.join(by)
+    select = f'{keys}, ' if by else ''
+
+    with read_connection(db_path) as conn:
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'risk_rollups'").fetchone()
+        if not exists:
+            return pd.DataFrame(columns=by + ['students', 'mean_probability'])
+        return pd.read_sql_query(text(
+            f'SELECT {select}SUM(students) AS students, '
+            'SUM(probability_sum) / SUM(students) AS mean_probability '
+            f'FROM risk_rollups WHERE target = :target '
+            + (f'GROUP BY {keys} ORDER BY {keys}' if by else '')
+        ), conn, params={'target': target})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show or rebuild the materialized risk rollups')
+    parser.add_argument('--db', type=str, default=DEFAULT_DATABASE)
+    parser.add_argument('--target', type=str, default='dropout')
+    parser.add_argument('--by', nargs='*', default=['school_id'], help=f"Any of {', '.join(GROUP_COLUMNS)}, risk_level")
+    parser.add_argument('--rebuild', action='store_true', help='Recompute every group from risk_rollup_members')
+    args = parser.parse_args()
+
+    if not Path(args.db).exists():
+        print(f"\n❌ Analytics database not found: {args.db}\n")
+        return 1
+    if args.rebuild:
+        print(f"\n♻️  Rebuilt risk rollups: {rebuild_rollups(args.db):,} groups")
+
+    try:
+        frame = read_rollups(args.target, args.by, args.db)
+    except ValueError as error:
+        print(f"\n❌ {error}\n")
+        return 1
+    print(f"\n📦 RISK ROLLUPS: {args.target} by {', '.join(args.by) or 'everything'}\n")
+    print(frame.to_string(index=False) if len(frame) else "   (no rollups materialized yet)")
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,207 @@
+-- Strathmore Analytics Schema (SQLite)
+-- ====================================
+-- Typed tables for the raw SIS/LMS data and model predictions.
+--
+-- Reference tables keep their natural codes as keys; students use the
+-- integer student_id as the rowid key. High-volume fact tables (enrollments,
+-- attendance, LMS activity) get an integer surrogate key, with the source id
+-- enforced by a separate unique index so bulk loads can drop and rebuild it.
+--
+-- Applied by scripts/setup_database.py (and by scripts/csv_to_sql.py before
+-- loading). Every statement is idempotent. backend/database/models.py
+-- mirrors these tables as ORM models.
+
+-- ----------------------------------------------------------------------
+-- Reference data
+-- ----------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS schools (
+    school_id       TEXT PRIMARY KEY,
+    name            TEXT NOT NULL,
+    dean            TEXT,
+    building        TEXT
+);
+
+CREATE TABLE IF NOT EXISTS programs (
+    program_id          TEXT PRIMARY KEY,
+    program_code        TEXT NOT NULL,
+    name                TEXT NOT NULL,
+    school_id           TEXT NOT NULL REFERENCES schools (school_id),
+    degree_type         TEXT,
+    duration_years      INTEGER,
+    credits_required    INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS ix_programs_school ON programs (school_id);
+
+CREATE TABLE IF NOT EXISTS courses (
+    course_id                   TEXT PRIMARY KEY,
+    unit_code                   TEXT NOT NULL,
+    course_name                 TEXT NOT NULL,
+    year_level                  INTEGER,
+    semester                    INTEGER,
+    school_id                   TEXT REFERENCES schools (school_id),
+    credit_hours                INTEGER,
+    physical_hours_per_week     INTEGER,
+    online_hours_per_week       INTEGER,
+    total_weeks                 INTEGER,
+    physical_sessions_total     INTEGER,
+    online_sessions_total       INTEGER,
+    physical_percentage         REAL,
+    online_percentage           REAL
+);
+
+CREATE INDEX IF NOT EXISTS ix_courses_school ON courses (school_id);
+
+CREATE TABLE IF NOT EXISTS students (
+    student_id          INTEGER PRIMARY KEY,
+    name                TEXT NOT NULL,
+    email               TEXT,
+    gender              TEXT,
+    age                 INTEGER,
+    program_id          TEXT REFERENCES programs (program_id),
+    program_code        TEXT,
+    school_id           TEXT REFERENCES schools (school_id),
+    year_of_study       INTEGER,
+    semester            INTEGER,
+    class_level         TEXT,
+    enrollment_date     TEXT,           -- ISO date
+    status              TEXT
+);
+
+CREATE INDEX IF NOT EXISTS ix_students_school_class ON students (school_id, class_level);
+CREATE INDEX IF NOT EXISTS ix_students_program ON students (program_id);
+
+-- ----------------------------------------------------------------------
+-- Activity (high volume)
+-- ----------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS sis_enrollments (
+    id                  INTEGER PRIMARY KEY,
+    enrollment_id       TEXT NOT NULL,
+    student_id          INTEGER NOT NULL REFERENCES students (student_id),
+    course_id           TEXT NOT NULL REFERENCES courses (course_id),
+    unit_code           TEXT,
+    semester            TEXT,
+    year_level          INTEGER,
+    class_level         TEXT,
+    grade               REAL,
+    gpa                 REAL,
+    credits             INTEGER,
+    status              TEXT
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_sis_enrollments_enrollment_id ON sis_enrollments (enrollment_id);
+CREATE INDEX IF NOT EXISTS ix_sis_enrollments_student_course ON sis_enrollments (student_id, course_id);
+CREATE INDEX IF NOT EXISTS ix_sis_enrollments_course ON sis_enrollments (course_id);
+
+CREATE TABLE IF NOT EXISTS attendance_records (
+    id                  INTEGER PRIMARY KEY,
+    attendance_id       TEXT NOT NULL,
+    student_id          INTEGER NOT NULL REFERENCES students (student_id),
+    course_id           TEXT NOT NULL REFERENCES courses (course_id),
+    unit_code           TEXT,
+    session_date        TEXT NOT NULL,  -- ISO date
+    session_type        TEXT,
+    status              TEXT NOT NULL,  -- Present / Absent
+    late                INTEGER NOT NULL DEFAULT 0 CHECK (late IN (0, 1))
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_attendance_records_attendance_id ON attendance_records (attendance_id);
+-- status rides along so the per-student-course attendance rate is computed
+-- from the index alone (covering), without touching the table
+CREATE INDEX IF NOT EXISTS ix_attendance_student_course ON attendance_records (student_id, course_id, status);
+CREATE INDEX IF NOT EXISTS ix_attendance_student_date ON attendance_records (student_id, session_date);
+CREATE INDEX IF NOT EXISTS ix_attendance_course_date ON attendance_records (course_id, session_date);
+
+CREATE TABLE IF NOT EXISTS lms_activities (
+    id                  INTEGER PRIMARY KEY,
+    activity_id         TEXT NOT NULL,
+    student_id          INTEGER NOT NULL REFERENCES students (student_id),
+    course_id           TEXT NOT NULL REFERENCES courses (course_id),
+    unit_code           TEXT,
+    activity_type       TEXT,
+    activity_date       TEXT NOT NULL,  -- ISO date
+    timestamp           TEXT,           -- ISO datetime
+    duration_minutes    INTEGER,
+    completed           INTEGER NOT NULL DEFAULT 0 CHECK (completed IN (0, 1))
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_lms_activities_activity_id ON lms_activities (activity_id);
+-- Covering for the per-student LMS aggregates (counts and minutes)
+CREATE INDEX IF NOT EXISTS ix_lms_student_course ON lms_activities (student_id, course_id, duration_minutes);
+CREATE INDEX IF NOT EXISTS ix_lms_student_date ON lms_activities (student_id, activity_date);
+
+-- ----------------------------------------------------------------------
+-- Predictions
+-- ----------------------------------------------------------------------
+
+-- One row per scoring run (scripts/run_predictions.py), written in the same
+-- transaction as the run's predictions: a 'complete' run is always whole.
+-- Failed runs are recorded with no predictions.
+CREATE TABLE IF NOT EXISTS prediction_runs (
+    run_id              TEXT PRIMARY KEY,
+    model_version       TEXT NOT NULL,  -- JSON {target: registry version}
+    started_at          TEXT NOT NULL,  -- ISO datetime
+    finished_at         TEXT,
+    students            INTEGER,
+    status              TEXT NOT NULL DEFAULT 'running',  -- running / complete / failed
+    source              TEXT,           -- scored input file
+    rescored            INTEGER,        -- students actually run through the models
+    duration_seconds    REAL,
+    rows_per_sec        REAL
+);
+
+CREATE TABLE IF NOT EXISTS predictions (
+    run_id                  TEXT NOT NULL REFERENCES prediction_runs (run_id),
+    student_id              INTEGER NOT NULL,   -- no FK: scoring must not depend on the SIS load
+    dropout_probability     REAL NOT NULL,
+    dropout_risk_level      TEXT NOT NULL,
+    failure_probability     REAL,
+    failure_risk_level      TEXT,
+    delay_probability       REAL,
+    delay_risk_level        TEXT,
+    PRIMARY KEY (run_id, student_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS ix_predictions_student_run ON predictions (student_id, run_id);
+
+-- ----------------------------------------------------------------------
+-- Risk rollups (maintained by backend/database/rollups.py)
+-- ----------------------------------------------------------------------
+
+-- Students per target x school x program x class level x risk level, with
+-- the summed probability (mean = probability_sum / students). Sums rather
+-- than means, so a changed prediction is applied as a delta. Unknown group
+-- values are stored as ''.
+CREATE TABLE IF NOT EXISTS risk_rollups (
+    target              TEXT NOT NULL,      -- dropout / failure / delay
+    school_id           TEXT NOT NULL,
+    program_id          TEXT NOT NULL,
+    class_level         TEXT NOT NULL,
+    risk_level          TEXT NOT NULL,
+    students            INTEGER NOT NULL,
+    probability_sum     REAL NOT NULL,
+    PRIMARY KEY (target, school_id, program_id, class_level, risk_level)
+) WITHOUT ROWID;
+
+-- What each student currently contributes to risk_rollups, so a change is
+-- subtracted from the right group even after the student moved class
+-- (keyed by student first: changes are looked up per student)
+CREATE TABLE IF NOT EXISTS risk_rollup_members (
+    target              TEXT NOT NULL,
+    student_id          INTEGER NOT NULL,
+    school_id           TEXT NOT NULL,
+    program_id          TEXT NOT NULL,
+    class_level         TEXT NOT NULL,
+    risk_level          TEXT NOT NULL,
+    probability         REAL NOT NULL,
+    PRIMARY KEY (student_id, target)
+) WITHOUT ROWID;
+
+-- Hash of each student's rolled-up row (groups, probabilities and levels),
+-- compared in bulk to find the few students that changed since last refresh
+CREATE TABLE IF NOT EXISTS risk_rollup_students (
+    student_id          INTEGER PRIMARY KEY,
+    row_hash            INTEGER NOT NULL
+);
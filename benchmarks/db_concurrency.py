@@ -0,0 +1,155 @@
+"""
+Benchmark: Database Concurrency
+===============================
+Point-read latency while a bulk write is running, for a plain SQLAlchemy
+engine (rollback journal, default settings) against the pooled engines of
+backend.database.connection (WAL, synchronous=NORMAL, mmap, cache).
+
+A writer thread appends rows in batched transactions; reader threads run
+indexed point lookups until the writer finishes. Under the rollback
+journal a reader waits whenever the writer holds the lock; under WAL
+readers see the last committed snapshot and keep going.
+
+Usage:
+    python -m benchmarks.db_concurrency
+    python -m benchmarks.db_concurrency --rows 500000 --readers 8
+
+Output:
+    benchmarks/results/db_concurrency.json
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import create_engine, text
+
+from backend.database.connection import dispose_engines, get_engine, get_read_engine
+
+STUDENTS = 50000
+
+
+def _setup(engine, base_rows):
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            'CREATE TABLE attendance (id INTEGER PRIMARY KEY, student_id INTEGER, '
+            'week INTEGER, rate REAL)'
+        )
+        conn.exec_driver_sql('CREATE INDEX idx_attendance_student ON attendance (student_id)')
+        conn.exec_driver_sql(
+            'INSERT INTO attendance (student_id, week, rate) VALUES (?, ?, ?)',
+            [(i % STUDENTS, i // STUDENTS, 0.8) for i in range(base_rows)],
+        )
+
+
+def _writer(engine, rows, batch_size, stats):
+    start = time.perf_counter()
+    rng = random.Random(1)
+    for offset in range(0, rows, batch_size):
+        batch = [(rng.randrange(STUDENTS), 99, rng.random())
+                 for _ in range(min(batch_size, rows - offset))]
+        with engine.begin() as conn:
+            conn.exec_driver_sql('INSERT INTO attendance (student_id, week, rate) VALUES (?, ?, ?)', batch)
+    stats['write_seconds'] = time.perf_counter() - start
+
+
+def _reader(engine, done, latencies, errors, seed):
+    rng = random.Random(seed)
+    query = text('SELECT COUNT(*), AVG(rate) FROM attendance WHERE student_id = :s')
+    while not done.is_set():
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(query, {'s': rng.randrange(STUDENTS)}).fetchone()
+        except Exception:
+            errors.append(1)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def run_mode(mode, directory, rows, base_rows, batch_size, readers):
+    path = Path(directory) / f'{mode}.db'
+    if mode == 'default':
+        write_engine = read_engine = create_engine(f'sqlite:///{path}')
+    else:
+        write_engine = get_engine(path)
+
+    _setup(write_engine, base_rows)
+    if mode == 'pooled':
+        read_engine = get_read_engine(path)
+
+    done = threading.Event()
+    latencies, errors, stats = [], [], {}
+    threads = [threading.Thread(target=_reader, args=(read_engine, done, latencies, errors, i))
+               for i in range(readers)]
+    for t in threads:
+        t.start()
+    _writer(write_engine, rows, batch_size, stats)
+    done.set()
+    for t in threads:
+        t.join()
+
+    timings = np.asarray(latencies) if latencies else np.zeros(1)
+    p50, p99 = np.percentile(timings, [50, 99])
+    result = {
+        'mode': mode,
+        'write_rows_per_sec': rows / stats['write_seconds'],
+        'write_seconds': stats['write_seconds'],
+        'reads': len(latencies),
+        'reads_per_sec': len(latencies) / stats['write_seconds'],
+        'read_errors': len(errors),
+        'read_p50_ms': float(p50),
+        'read_p99_ms': float(p99),
+        'read_max_ms': float(timings.max()),
+    }
+    print(f"   {mode:8s} write {result['write_rows_per_sec']:10,.0f} rows/s   "
+          f"reads {result['reads_per_sec']:8,.0f}/s   p50 {p50:7.2f} ms   p99 {p99:7.2f} ms   "
+          f"max {result['read_max_ms']:8.1f} ms   errors {len(errors)}")
+
+    if mode == 'default':
+        write_engine.dispose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reads during a bulk write')
+    parser.add_argument('--rows', type=int, default=300000, help='Rows written by the bulk writer')
+    parser.add_argument('--base-rows', type=int, default=200000, help='Rows present before the write')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Rows per write transaction')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--output', type=str, default='benchmarks/results/db_concurrency.json')
+    args = parser.parse_args()
+
+    print("\n⏱️  DATABASE CONCURRENCY\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [run_mode(mode, tmp, args.rows, args.base_rows, args.batch_size, args.readers)
+                   for mode in ('default', 'pooled')]
+        dispose_engines()
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'rows': args.rows,
+                'base_rows': args.base_rows,
+                'batch_size': args.batch_size,
+                'readers': args.readers,
+                'cpu_count': os.cpu_count(),
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f"\n💾 Saved: {output}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
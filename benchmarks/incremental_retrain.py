@@ -0,0 +1,133 @@
+"""
+Benchmark: Incremental vs Full Retraining
+=========================================
+Simulates a new semester arriving: a base forest is trained on the older
+slices, then the newest slice is added either by a full retrain on all data
+or by warm-starting extra trees (models/training/incremental.py).
+
+Reports fit time and validation ROC-AUC on the test cohort for both. With
+the raw 4,000-row cohort the new slice is only ~1,000 students, which is too
+few for the rare delayed-graduation target to keep its AUC; use --rows 0 to
+see that case.
+
+Usage:
+    python -m benchmarks.incremental_retrain
+    python -m benchmarks.incremental_retrain --rows 500000 --semesters 8
+
+Output:
+    benchmarks/results/incremental_retrain.json
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import roc_auc_score
+from sklearn.preprocessing import StandardScaler
+
+from models.training.incremental import warm_start_update
+from train_model import TEST_FILE, TRAIN_FILE, build_forest, feature_columns, targets
+
+
+def enlarge(df, rows, seed=42):
+    """Bootstrap the cohort up to `rows` students, jittering the continuous features"""
+    if rows <= len(df):
+        return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+    rng = np.random.default_rng(seed)
+    out = df.iloc[rng.integers(0, len(df), size=rows)].reset_index(drop=True)
+    for col, sd in [('y1s1_attendance_rate', 0.01), ('y1s1_gpa', 0.05), ('y1s1_avg_grade', 1.0)]:
+        out[col] = out[col] + rng.normal(0, sd, size=rows)
+    return out
+
+
+def run(rows, semesters, new_trees, max_trees):
+    train_df = enlarge(pd.read_csv(TRAIN_FILE), rows)
+    test_df = pd.read_csv(TEST_FILE)
+
+    slices = np.array_split(np.arange(len(train_df)), semesters)
+    history = train_df.iloc[np.concatenate(slices[:-1])]
+    new = train_df.iloc[slices[-1]]
+
+    # Scaler is fitted once on the history and kept (as in train_model.py --incremental)
+    scaler = StandardScaler().fit(history[feature_columns].fillna(0))
+    X_hist = scaler.transform(history[feature_columns].fillna(0))
+    X_new = scaler.transform(new[feature_columns].fillna(0))
+    X_all = np.vstack([X_hist, X_new])
+    X_test = scaler.transform(test_df[feature_columns].fillna(0))
+
+    results = []
+    for target_name, target_col in targets:
+        y_hist = history[target_col].fillna(0).values
+        y_new = new[target_col].fillna(0).values
+        y_all = np.concatenate([y_hist, y_new])
+        y_test = test_df[target_col].fillna(0).values
+
+        base = build_forest().fit(X_hist, y_hist)
+
+        start = time.perf_counter()
+        full = clone(base).fit(X_all, y_all)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        incremental = warm_start_update(base, X_new, y_new, n_new_trees=new_trees, max_trees=max_trees)
+        incremental_time = time.perf_counter() - start
+
+        full_auc = roc_auc_score(y_test, full.predict_proba(X_test)[:, 1])
+        incremental_auc = roc_auc_score(y_test, incremental.predict_proba(X_test)[:, 1])
+
+        results.append({
+            'target': target_col,
+            'history_rows': len(history),
+            'new_rows': len(new),
+            'full_fit_seconds': full_time,
+            'incremental_fit_seconds': incremental_time,
+            'speedup': full_time / incremental_time,
+            'full_auc': full_auc,
+            'incremental_auc': incremental_auc,
+            'auc_delta': incremental_auc - full_auc,
+        })
+
+        print(f"   {target_name:26s} full {full_time:7.2f}s  AUC {full_auc:.4f} | "
+              f"incremental {incremental_time:7.2f}s  AUC {incremental_auc:.4f} | "
+              f"{full_time / incremental_time:5.1f}x faster")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Incremental vs full retraining benchmark')
+    parser.add_argument('--rows', type=int, default=100000,
+                        help='Enlarge the training cohort to this many rows (0 = as-is)')
+    parser.add_argument('--semesters', type=int, default=4,
+                        help='Number of semester slices; the last one is the new data')
+    parser.add_argument('--new-trees', type=int, default=25)
+    parser.add_argument('--max-trees', type=int, default=100)
+    parser.add_argument('--auc-tolerance', type=float, default=0.01,
+                        help='Largest acceptable AUC drop for the incremental model')
+    parser.add_argument('--output', type=str, default='benchmarks/results/incremental_retrain.json')
+    args = parser.parse_args()
+
+    print("\n⏱️  INCREMENTAL vs FULL RETRAIN\n")
+    results = run(args.rows, args.semesters, args.new_trees, args.max_trees)
+
+    worst = min(r['auc_delta'] for r in results)
+    within = worst >= -args.auc_tolerance
+    print(f"\n   Worst AUC change: {worst:+.4f} "
+          f"({'✅ within' if within else '❌ outside'} ±{args.auc_tolerance})")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    print(f"\n💾 Saved: {output}\n")
+
+    return 0 if within else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
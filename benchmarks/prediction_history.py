@@ -0,0 +1,144 @@
+"""
+Benchmark: Prediction History
+=============================
+Simulates a year of nightly scoring runs into the columnar prediction
+history (models/prediction_history.py): every run scores the whole student
+body, a small share of students leaves and new ones enroll.
+
+Reports the append time per run, bytes stored per student per run, and the
+latency of reading one student's full risk trajectory across every run. A
+sample of students is checked against the values that were appended.
+
+Usage:
+    python -m benchmarks.prediction_history
+    python -m benchmarks.prediction_history --students 1000000 --runs 365
+
+Output:
+    benchmarks/results/prediction_history.json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from models.prediction_history import PredictionHistory
+from models.risk_levels import risk_levels
+
+TARGETS = ['dropout', 'failure', 'delay']
+
+
+def simulate_year(history, students, runs, churn, sample, seed=42):
+    """Append `runs` nightly runs; returns (append seconds per run, expected sample values)"""
+    rng = np.random.default_rng(seed)
+    active = np.arange(100001, 100001 + students, dtype=np.int64)
+    next_id = active[-1] + 1
+    tracked = rng.choice(active, size=sample, replace=False)
+    expected = {int(student_id): [] for student_id in tracked}
+    first_day = date(2026, 1, 1)
+
+    append_seconds = []
+    for day in range(runs):
+        leaving = rng.random(len(active)) < churn
+        joining = np.arange(next_id, next_id + int(leaving.sum()), dtype=np.int64)
+        next_id += len(joining)
+        active = np.concatenate([active[~leaving], joining])
+
+        run_date = (first_day + timedelta(days=day)).isoformat()
+        run_id = run_date.replace('-', '') + '_020000'
+        probabilities = {target: rng.random(len(active), dtype=np.float32) for target in TARGETS}
+        levels = {target: risk_levels(probabilities[target]) for target in TARGETS}
+
+        start = time.perf_counter()
+        history.append(run_id, active, probabilities, levels, run_date=run_date)
+        append_seconds.append(time.perf_counter() - start)
+
+        positions = np.flatnonzero(np.isin(active, tracked))
+        for position in positions:
+            expected[int(active[position])].append(
+                (run_id, [float(probabilities[target][position]) for target in TARGETS]))
+        if (day + 1) % 30 == 0:
+            print(f"   {day + 1:4d} runs, {len(active):,} students, "
+                  f"last append {append_seconds[-1] * 1000:.0f} ms")
+    return append_seconds, expected
+
+
+def check_trajectories(history, expected):
+    """Query every sampled student; returns (latencies in seconds, mismatches)"""
+    latencies = []
+    mismatches = 0
+    for student_id, runs in expected.items():
+        start = time.perf_counter()
+        frame = history.trajectory(student_id)
+        latencies.append(time.perf_counter() - start)
+
+        stored = list(zip(frame['run_id'], frame[[f'{t}_probability' for t in TARGETS]].to_numpy().tolist())) \
+            if len(frame) else []
+        if stored != runs:
+            mismatches += 1
+    return np.array(latencies), mismatches
+
+
+def directory_bytes(path):
+    return sum(f.stat().st_size for f in Path(path).rglob('*') if f.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prediction history: appends and trajectory reads')
+    parser.add_argument('--students', type=int, default=200000)
+    parser.add_argument('--runs', type=int, default=365, help='Nightly runs (one per day)')
+    parser.add_argument('--churn', type=float, default=0.001, help='Share of students replaced every night')
+    parser.add_argument('--sample', type=int, default=200, help='Students whose trajectories are read and checked')
+    parser.add_argument('--output', type=str, default='benchmarks/results/prediction_history.json')
+    args = parser.parse_args()
+
+    print("\n⏱️  PREDICTION HISTORY\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        history = PredictionHistory(Path(tmp) / 'history')
+        print(f"   Appending {args.runs} runs of {args.students:,} students...")
+        append_seconds, expected = simulate_year(history, args.students, args.runs, args.churn, args.sample)
+        stored_bytes = directory_bytes(history.path)
+        student_runs = sum(entry['students'] for entry in history.runs())
+        latencies, mismatches = check_trajectories(history, expected)
+
+    results = {
+        'append_ms_median': float(np.median(append_seconds) * 1000),
+        'append_ms_max': float(np.max(append_seconds) * 1000),
+        'stored_bytes': stored_bytes,
+        'bytes_per_student_run': stored_bytes / student_runs,
+        'trajectory_ms_median': float(np.median(latencies) * 1000),
+        'trajectory_ms_p99': float(np.percentile(latencies, 99) * 1000),
+        'trajectory_ms_max': float(latencies.max() * 1000),
+        'mismatches': mismatches,
+    }
+    print(f"\n   Append:      {results['append_ms_median']:.0f} ms median, {results['append_ms_max']:.0f} ms max")
+    print(f"   Storage:     {stored_bytes / 1e9:.2f} GB, {results['bytes_per_student_run']:.1f} bytes per student-run")
+    print(f"   Trajectory:  {results['trajectory_ms_median']:.2f} ms median, "
+          f"{results['trajectory_ms_p99']:.2f} ms p99 over {args.runs} runs")
+    print(f"   Checked {len(expected)} students: {mismatches} mismatch(es)")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'students': args.students,
+                'runs': args.runs,
+                'churn': args.churn,
+                'sample': args.sample,
+                'cpu_count': os.cpu_count(),
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f"\n💾 Saved: {output}\n")
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,144 @@
+"""
+Benchmark: Sharded Scoring
+==========================
+Rows/sec of the chunked batch scorer against process-pool size on a large
+synthetic cohort.
+
+Forests for the three historical targets are trained on a small synthetic
+sample into a temporary registry, then the same input CSV is scored serially
+(BatchScorer) and with ShardedScorer for every worker count. Every sharded
+output is checked byte-for-byte against the serial one, so ordering bugs
+fail the run.
+
+Usage:
+    python -m benchmarks.sharded_scoring
+    python -m benchmarks.sharded_scoring --rows 500000 --workers 1,2,4
+
+Output:
+    benchmarks/results/sharded_scoring.json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.synthetic import synthetic_cohort
+from models.batch_scoring import DEFAULT_CHUNK_SIZE, BatchScorer, ShardedScorer
+from models.features import TARGETS
+from models.loader import HISTORICAL_REF, load_model
+from models.registry import ModelRegistry, file_sha256
+
+
+def historical_features(df):
+    """Synthetic cohorts already carry the y1s1_* model features"""
+    from train_model import feature_columns
+    return df[feature_columns]
+
+
+def train_registry(root, rows):
+    """Train one forest per historical target into a fresh registry"""
+    from train_model import feature_columns, fit_model
+
+    registry = ModelRegistry(root)
+    df = synthetic_cohort(rows, seed=7)
+    entries = {}
+    for target_col in TARGETS.values():
+        model, scaler = fit_model('forest', df, df[target_col])
+        entries[target_col] = registry.store_target(model, scaler, feature_names=feature_columns)
+    version = registry.publish(entries, feature_columns, feature_set='historical')
+    registry.promote(version, HISTORICAL_REF)
+
+
+def _default_workers():
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    return ','.join(str(c) for c in counts)
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(',') if v]
+
+
+def run(rows, worker_counts, chunk_size, train_rows):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        registry_root = Path(tmp) / 'registry'
+        print(f"🌲 Training forests on {train_rows:,} synthetic students...")
+        train_registry(registry_root, train_rows)
+        bundles = {
+            name: load_model(col, registry_root=registry_root) for name, col in TARGETS.items()
+        }
+
+        input_csv = Path(tmp) / 'students.csv'
+        print(f"📝 Writing {rows:,} synthetic students...")
+        synthetic_cohort(rows).to_csv(input_csv, index=False)
+
+        configs = [('serial', 1)] + [('sharded', w) for w in worker_counts]
+        baseline_hash = None
+        print()
+        for mode, workers in configs:
+            output = Path(tmp) / f'{mode}_{workers}.csv'
+            if mode == 'serial':
+                scorer = BatchScorer(bundles, historical_features, chunk_size=chunk_size)
+            else:
+                scorer = ShardedScorer(bundles, historical_features, workers=workers,
+                                       chunk_size=chunk_size, registry_root=registry_root)
+
+            start = time.perf_counter()
+            scorer.score_csv(input_csv, output)
+            seconds = time.perf_counter() - start
+
+            digest = file_sha256(output)
+            baseline_hash = baseline_hash or digest
+            identical = digest == baseline_hash
+            output.unlink()
+
+            results.append({
+                'mode': mode,
+                'workers': workers,
+                'seconds': seconds,
+                'rows_per_sec': rows / seconds,
+                'identical_to_serial': identical,
+            })
+            print(f"   {mode:8s} workers={workers:>3} | {seconds:8.2f}s  "
+                  f"{rows / seconds:>10,.0f} rows/s  {'✅' if identical else '❌ output differs'}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sharded scoring benchmark')
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--workers', type=_int_list, default=_int_list(_default_workers()))
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--train-rows', type=int, default=20000)
+    parser.add_argument('--output', type=str, default='benchmarks/results/sharded_scoring.json')
+    args = parser.parse_args()
+
+    print("\n⏱️  SHARDED SCORING\n")
+    results = run(args.rows, args.workers, args.chunk_size, args.train_rows)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'rows': args.rows,
+                'chunk_size': args.chunk_size,
+                'cpu_count': os.cpu_count(),
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f"\n💾 Saved: {output}\n")
+
+    return 0 if all(r['identical_to_serial'] for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
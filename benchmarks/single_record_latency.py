@@ -0,0 +1,127 @@
+"""
+Benchmark: Single-Record Latency
+================================
+Latency of scoring one student with the DataFrame path (one-row DataFrame ->
+prepare_features_from_current_data -> scaler -> predict_proba) against the
+zero-pandas RecordScorer, on real student records.
+
+Every record is scored by both paths and the probabilities must agree. The
+run fails (exit 1) when they do not, or when the fast path's p99 exceeds
+--max-p99-us.
+
+Usage:
+    python -m benchmarks.single_record_latency
+    python -m benchmarks.single_record_latency --records 500 --max-p99-us 500
+
+Output:
+    benchmarks/results/single_record_latency.json
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from models.features import TARGETS, prepare_features_from_current_data
+from models.loader import load_model
+from models.record_scoring import load_record_scorer
+
+DATA_FILE = 'data/processed/features_engineered.csv'
+
+
+def percentiles(timings_us):
+    p50, p95, p99 = np.percentile(timings_us, [50, 95, 99])
+    return {'p50_us': float(p50), 'p95_us': float(p95), 'p99_us': float(p99),
+            'mean_us': float(np.mean(timings_us))}
+
+
+def dataframe_path(bundle, record):
+    features = prepare_features_from_current_data(pd.DataFrame([record]))
+    return bundle.risk_probability(features)[0]
+
+
+def time_calls(fn, records, repeats):
+    timings = []
+    for _ in range(repeats):
+        for record in records:
+            start = time.perf_counter()
+            fn(record)
+            timings.append((time.perf_counter() - start) * 1e6)
+    return np.asarray(timings)
+
+
+def run(target, n_records, repeats, warmup=50):
+    records = pd.read_csv(DATA_FILE).sample(n_records, random_state=42).to_dict('records')
+    bundle = load_model(target)
+    scorer = load_record_scorer(target)
+
+    # Both paths must give the same probability for every record
+    slow = np.array([dataframe_path(bundle, r) for r in records])
+    fast = np.array([scorer.probability(r) for r in records])
+    max_error = float(np.abs(slow - fast).max())
+
+    for record in records[:warmup]:
+        scorer.probability(record)
+        dataframe_path(bundle, record)
+
+    return {
+        'target': target,
+        'version': bundle.version,
+        'path': 'compact_forest' if scorer.forest is not None else 'predict_proba',
+        'records': n_records,
+        'max_abs_error': max_error,
+        'dataframe': percentiles(time_calls(lambda r: dataframe_path(bundle, r), records, 1)),
+        'record_scorer': percentiles(time_calls(scorer.probability, records, repeats)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Single-record scoring latency')
+    parser.add_argument('--target', choices=list(TARGETS), default='dropout')
+    parser.add_argument('--records', type=int, default=1000)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--max-p99-us', type=float, default=1000.0,
+                        help='Fail when the fast path p99 exceeds this many microseconds')
+    parser.add_argument('--tolerance', type=float, default=1e-9,
+                        help='Largest allowed probability difference between the paths')
+    parser.add_argument('--output', type=str, default='benchmarks/results/single_record_latency.json')
+    args = parser.parse_args()
+
+    print("\n⏱️  SINGLE-RECORD LATENCY\n")
+    result = run(TARGETS[args.target], args.records, args.repeats)
+    result['meta'] = {'timestamp': datetime.now().isoformat(timespec='seconds'),
+                      'max_p99_us': args.max_p99_us}
+
+    for name in ('dataframe', 'record_scorer'):
+        r = result[name]
+        print(f"   {name:14s} p50 {r['p50_us']:9.1f} µs   p95 {r['p95_us']:9.1f} µs   "
+              f"p99 {r['p99_us']:9.1f} µs")
+    speedup = result['dataframe']['p50_us'] / result['record_scorer']['p50_us']
+    print(f"\n   Speedup (p50): {speedup:.1f}x via {result['path']}")
+    print(f"   Max probability difference: {result['max_abs_error']:.2e}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"\n💾 Saved: {output}")
+
+    failures = []
+    if result['max_abs_error'] > args.tolerance:
+        failures.append(f"paths disagree by {result['max_abs_error']:.2e}")
+    if result['record_scorer']['p99_us'] > args.max_p99_us:
+        failures.append(f"p99 {result['record_scorer']['p99_us']:.1f} µs > {args.max_p99_us:.1f} µs")
+
+    if failures:
+        print(f"\n❌ {'; '.join(failures)}\n")
+        return 1
+    print("\n✅ Within budget\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
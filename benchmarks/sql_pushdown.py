@@ -0,0 +1,144 @@
+"""
+Benchmark: SQL Push-down Aggregation
+====================================
+StrathmoreDataCleaner's two sources for the per-student merged dataset:
+
+- csv: read every raw CSV into pandas, clean, aggregate and merge
+  (clean_and_merge_csv)
+- database: one SQL query over the analytics database's indexes, only the
+  per-student rows come back (load_student_aggregates)
+
+The real reference data (students, courses, enrollments...) is combined
+with synthetic attendance and LMS activity of the requested size, loaded
+with scripts/csv_to_sql.py, and both sources are checked to agree.
+
+Usage:
+    python -m benchmarks.sql_pushdown
+    python -m benchmarks.sql_pushdown --attendance-rows 3000000 --lms-rows 1000000
+
+Output:
+    benchmarks/results/sql_pushdown.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics.data_processing.data_cleaning import StrathmoreDataCleaner
+from backend.database.connection import dispose_engines
+from benchmarks.synthetic import synthetic_activity
+from scripts.csv_to_sql import csv_files, load_tables
+
+REFERENCE_TABLES = ['schools', 'programs', 'courses', 'students', 'sis_enrollments']
+
+
+def build_dataset(raw_dir, directory, attendance_rows, lms_rows):
+    """Raw CSVs (reference + synthetic activity) and the database loaded from them"""
+    raw = Path(directory) / 'raw'
+    raw.mkdir()
+    for table in REFERENCE_TABLES:
+        shutil.copy(Path(raw_dir) / f'{table}.csv', raw / f'{table}.csv')
+
+    attendance, lms = synthetic_activity(pd.read_csv(raw / 'sis_enrollments.csv'), attendance_rows, lms_rows)
+    attendance.to_csv(raw / 'attendance_records.csv', index=False)
+    lms.to_csv(raw / 'lms_activities.csv', index=False)
+
+    db = Path(directory) / 'analytics.db'
+    load_tables(csv_files(raw), db)
+    return raw, db
+
+
+def timed(func, repeats):
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def max_difference(a, b):
+    """Largest absolute difference over the numeric columns (inf if the frames disagree otherwise)"""
+    if list(a.columns) != list(b.columns) or len(a) != len(b):
+        return float('inf')
+    a = a.sort_values('student_id').reset_index(drop=True)
+    b = b.sort_values('student_id').reset_index(drop=True)
+    worst = 0.0
+    for column in a.columns:
+        if pd.api.types.is_numeric_dtype(a[column]):
+            x, y = a[column].to_numpy(float), b[column].to_numpy(float)
+            if not np.array_equal(np.isnan(x), np.isnan(y)):
+                return float('inf')
+            diff = np.abs(x - y)[~np.isnan(x)]
+            worst = max(worst, float(diff.max()) if len(diff) else 0.0)
+        elif not (a[column].astype(str) == b[column].astype(str)).all():
+            return float('inf')
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CSV vs SQL push-down aggregation')
+    parser.add_argument('--raw-dir', type=str, default='data/raw', help='Reference CSVs (students, courses...)')
+    parser.add_argument('--attendance-rows', type=int, default=1000000)
+    parser.add_argument('--lms-rows', type=int, default=500000)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', type=str, default='benchmarks/results/sql_pushdown.json')
+    args = parser.parse_args()
+
+    logging.getLogger('analytics.data_processing.data_cleaning').setLevel(logging.WARNING)
+
+    print("\n⏱️  SQL PUSH-DOWN AGGREGATION\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"   Building {args.attendance_rows:,} attendance + {args.lms_rows:,} LMS rows...")
+        raw, db = build_dataset(args.raw_dir, tmp, args.attendance_rows, args.lms_rows)
+
+        processed = Path(tmp) / 'processed'
+        csv_cleaner = StrathmoreDataCleaner(raw, processed)
+        db_cleaner = StrathmoreDataCleaner(raw, processed, source='database', db_path=db)
+
+        csv_seconds, csv_df = timed(csv_cleaner.clean_and_merge_csv, args.repeats)
+        db_seconds, db_df = timed(db_cleaner.load_student_aggregates, args.repeats)
+        dispose_engines()
+
+    difference = max_difference(csv_df, db_df)
+    source_rows = args.attendance_rows + args.lms_rows
+    results = [
+        {'source': 'csv', 'seconds': csv_seconds, 'rows_into_python': source_rows},
+        {'source': 'database', 'seconds': db_seconds, 'rows_into_python': len(db_df)},
+    ]
+    print()
+    for r in results:
+        print(f"   {r['source']:9s} {r['seconds']:7.2f}s   {r['rows_into_python']:>10,} rows into pandas")
+    print(f"\n   Speedup: {csv_seconds / db_seconds:.1f}x   max |difference|: {difference:.2e}")
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'attendance_rows': args.attendance_rows,
+                'lms_rows': args.lms_rows,
+                'students': len(db_df),
+                'repeats': args.repeats,
+                'cpu_count': os.cpu_count(),
+            },
+            'results': results,
+            'speedup': csv_seconds / db_seconds,
+            'max_difference': difference,
+        }, f, indent=2)
+    print(f"\n💾 Saved: {output}\n")
+    return 0 if difference < 1e-9 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
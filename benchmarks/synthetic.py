@@ -0,0 +1,95 @@
+"""
+Synthetic Cohorts for Benchmarks
+================================
+Vectorized version of generate_historical_cohort_2021.py: same performance
+bands, feature ranges and outcome probabilities, but generated with NumPy so
+millions of rows take seconds.
+"""
+
+import numpy as np
+import pandas as pd
+
+SCHOOLS = ['SBS', 'SCES', 'SIMS', 'SHSS', 'SLS']
+
+# perf band -> (attendance, gpa, grade, lms range, dropout chance, fail/delay chances)
+PERFORMANCE_BANDS = [
+    ((0.85, 1.00), (3.5, 4.0), (80, 95), (100, 200), 0.05, 0.05, 0.10),  # excellent
+    ((0.75, 0.90), (2.8, 3.5), (70, 85), (60, 120), 0.10, 0.05, 0.10),   # good
+    ((0.65, 0.80), (2.3, 2.9), (55, 75), (40, 80), 0.20, 0.30, 0.25),    # average
+    ((0.30, 0.70), (1.5, 2.4), (30, 60), (10, 50), 0.50, 0.30, 0.25),    # struggling
+]
+
+
+def synthetic_cohort(n_rows, seed=42):
+    """Historical cohort with the y1s1_* features and outcome columns"""
+    rng = np.random.default_rng(seed)
+    band = rng.integers(0, len(PERFORMANCE_BANDS), size=n_rows)
+
+    def pick(i):
+        return np.array([b[i] for b in PERFORMANCE_BANDS])
+
+    def uniform(ranges):
+        lo, hi = ranges[band, 0], ranges[band, 1]
+        return lo + (hi - lo) * rng.random(n_rows)
+
+    attend = uniform(pick(0).astype(float))
+    gpa = uniform(pick(1).astype(float))
+    grade = uniform(pick(2).astype(float))
+    lms_range = pick(3)
+    lms = rng.integers(lms_range[band, 0], lms_range[band, 1] + 1)
+
+    dropped_out = rng.random(n_rows) < pick(4)[band]
+    failed = np.where(dropped_out, True, rng.random(n_rows) < pick(5)[band])
+    delayed = np.where(dropped_out, False, rng.random(n_rows) < pick(6)[band])
+
+    return pd.DataFrame({
+        'student_id': np.arange(100001, 100001 + n_rows),
+        'school_id': np.asarray(SCHOOLS)[rng.integers(0, len(SCHOOLS), size=n_rows)],
+        'y1s1_attendance_rate': attend.round(3),
+        'y1s1_gpa': gpa.round(2),
+        'y1s1_avg_grade': grade.round(1),
+        'y1s1_lms_activities': lms,
+        'y1s1_courses_enrolled': rng.choice([6, 7], size=n_rows),
+        'y1s1_exam_eligible': (attend >= 0.67).astype(int),
+        'y1s1_attendance_below_67': (attend < 0.67).astype(int),
+        'y1s1_gpa_below_2': (gpa < 2.0).astype(int),
+        'y1s1_grade_below_40': (grade < 40).astype(int),
+        'y1s1_low_engagement': (lms < 50).astype(int),
+        'dropped_out': dropped_out.astype(int),
+        'delayed_graduation': delayed.astype(int),
+        'failed_courses': failed.astype(int),
+    })
+
+
+def synthetic_activity(enrollments, attendance_rows, lms_rows, seed=42):
+    """
+    attendance_records / lms_activities rows (generate_strathmore_data.py
+    format) for existing enrollments, each with its own attendance rate
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2026-01-12')
+    rate = rng.uniform(0.30, 1.00, size=len(enrollments))
+
+    def sample(n_rows, id_column, id_prefix):
+        pick = rng.integers(0, len(enrollments), size=n_rows)
+        rows = enrollments.iloc[pick][['student_id', 'course_id', 'unit_code']].reset_index(drop=True)
+        rows.insert(0, id_column, id_prefix + pd.Series(np.arange(n_rows)).astype(str))
+        return pick, rows
+
+    pick, attendance = sample(attendance_rows, 'attendance_id', 'ATT_')
+    attended = rng.random(attendance_rows) < rate[pick]
+    attendance['session_date'] = (start + rng.integers(0, 98, size=attendance_rows)).astype(str)
+    attendance['session_type'] = 'Lecture'
+    attendance['status'] = np.where(attended, 'Present', 'Absent')
+    attendance['late'] = attended & (rng.random(attendance_rows) < 0.15)
+
+    pick, lms = sample(lms_rows, 'activity_id', 'LMS_')
+    dates = (start + rng.integers(0, 96, size=lms_rows)).astype(str)
+    lms['activity_type'] = np.asarray(['quiz_attempt', 'assignment_submit', 'resource_download'])[
+        rng.integers(0, 3, size=lms_rows)]
+    lms['activity_date'] = dates
+    lms['timestamp'] = pd.Series(dates) + ' 10:00:00'
+    lms['duration_minutes'] = np.maximum(1, rng.normal(5 + 40 * rate[pick], 10)).astype(int)
+    lms['completed'] = rng.random(lms_rows) < 0.85
+
+    return attendance, lms
@@ -0,0 +1,223 @@
+"""
+Benchmark: Training Scalability
+===============================
+Sweeps synthetic cohort size, n_estimators, max_depth and n_jobs for the
+Random Forest used by train_model.py and records, per configuration:
+
+    fit_seconds          wall time of model.fit
+    peak_rss_mb          process high-water mark (data + fit)
+    data_rss_mb          high-water mark after building the data, before fit
+    model_mb             joblib pickle size on disk
+    compact_mb           compact forest (.npy) size on disk
+    predict_rows_per_sec predict_proba throughput
+
+Each configuration runs in a fresh process so peak RSS is not polluted by
+earlier runs.
+
+Usage:
+    python -m benchmarks.training_scalability
+    python -m benchmarks.training_scalability --sizes 5000,50000 --trees 50,100 --jobs 1,-1
+    python -m benchmarks.training_scalability --compare old.json new.json
+
+Output:
+    benchmarks/results/training_scalability.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+DEFAULT_SIZES = '5000,50000,500000,5000000'
+
+# metric -> True if larger is worse
+REGRESSION_METRICS = {
+    'fit_seconds': True,
+    'peak_rss_mb': True,
+    'model_mb': True,
+    'compact_mb': True,
+    'predict_rows_per_sec': False,
+}
+
+CONFIG_KEYS = ('rows', 'n_estimators', 'max_depth', 'n_jobs')
+
+
+def _max_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024**2 if sys.platform == 'darwin' else rss / 1024
+
+
+def run_config(rows, n_estimators, max_depth, n_jobs, predict_rows=100000):
+    """Benchmark one configuration (runs inside a fresh worker process)"""
+    import joblib
+    from sklearn.preprocessing import StandardScaler
+
+    from benchmarks.synthetic import synthetic_cohort
+    from models.compact_forest import export_compact_forest
+    from train_model import build_forest, feature_columns
+
+    df = synthetic_cohort(rows)
+    X = StandardScaler().fit_transform(df[feature_columns])
+    y = df['dropped_out'].values
+    del df
+    data_rss = _max_rss_mb()
+
+    model = build_forest().set_params(
+        n_estimators=n_estimators, max_depth=max_depth, n_jobs=n_jobs
+    )
+    start = time.perf_counter()
+    model.fit(X, y)
+    fit_seconds = time.perf_counter() - start
+    peak_rss = _max_rss_mb()
+
+    X_pred = X[:predict_rows]
+    start = time.perf_counter()
+    model.predict_proba(X_pred)
+    predict_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = Path(tmp) / 'model.pkl'
+        joblib.dump(model, model_path)
+        compact_path = export_compact_forest(model, None, Path(tmp) / 'forest.npy')
+        model_mb = model_path.stat().st_size / 1024**2
+        compact_mb = compact_path.stat().st_size / 1024**2
+
+    return {
+        'rows': rows,
+        'n_estimators': n_estimators,
+        'max_depth': max_depth,
+        'n_jobs': n_jobs,
+        'fit_seconds': fit_seconds,
+        'data_rss_mb': data_rss,
+        'peak_rss_mb': peak_rss,
+        'model_mb': model_mb,
+        'compact_mb': compact_mb,
+        'predict_rows_per_sec': len(X_pred) / predict_seconds,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(',') if v]
+
+
+def _depth_list(value):
+    return [None if v.lower() == 'none' else int(v) for v in value.split(',') if v]
+
+
+def sweep(args):
+    import sklearn
+
+    configs = list(itertools.product(args.sizes, args.trees, args.depths, args.jobs))
+    print(f"   {len(configs)} configuration(s)\n")
+
+    results = []
+    ctx = get_context('spawn')
+    for rows, trees, depth, jobs in configs:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            result = pool.submit(run_config, rows, trees, depth, jobs).result()
+        results.append(result)
+        print(f"   rows={rows:>9,} trees={trees:>4} depth={str(depth):>4} jobs={jobs:>3} | "
+              f"fit {result['fit_seconds']:8.2f}s  peak {result['peak_rss_mb']:8.0f} MB  "
+              f"model {result['model_mb']:7.1f} MB  "
+              f"{result['predict_rows_per_sec']:>10,.0f} rows/s")
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sklearn': sklearn.__version__,
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def compare(baseline_file, current_file, tolerance):
+    """Print metric changes between two result files; return the regressions"""
+    with open(baseline_file) as f:
+        baseline = json.load(f)
+    with open(current_file) as f:
+        current = json.load(f)
+
+    def key(r):
+        return tuple(r[k] for k in CONFIG_KEYS)
+
+    base_by_key = {key(r): r for r in baseline['results']}
+    regressions = []
+
+    print(f"   baseline {baseline['meta'].get('commit')} -> current {current['meta'].get('commit')} "
+          f"(tolerance {tolerance:.0%})\n")
+
+    for result in current['results']:
+        base = base_by_key.get(key(result))
+        if base is None:
+            continue
+
+        label = ' '.join(f"{k}={v}" for k, v in zip(CONFIG_KEYS, key(result)))
+        for metric, larger_is_worse in REGRESSION_METRICS.items():
+            old, new = base[metric], result[metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            worse = change > tolerance if larger_is_worse else change < -tolerance
+            flag = '❌' if worse else '  '
+            print(f"   {flag} {label:45s} {metric:22s} {old:12.2f} -> {new:12.2f} ({change:+.1%})")
+            if worse:
+                regressions.append({'config': label, 'metric': metric, 'old': old, 'new': new})
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Training scalability benchmark')
+    parser.add_argument('--sizes', type=_int_list, default=_int_list(DEFAULT_SIZES))
+    parser.add_argument('--trees', type=_int_list, default=[100])
+    parser.add_argument('--depths', type=_depth_list, default=[10])
+    parser.add_argument('--jobs', type=_int_list, default=[1, -1])
+    parser.add_argument('--output', type=str, default='benchmarks/results/training_scalability.json')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help='Compare two result files instead of running')
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help='Relative change that counts as a regression')
+    args = parser.parse_args()
+
+    if args.compare:
+        print("\n🔍 TRAINING SCALABILITY - COMPARISON\n")
+        regressions = compare(*args.compare, args.tolerance)
+        print(f"\n   {len(regressions)} regression(s)\n")
+        return 1 if regressions else 0
+
+    print("\n⏱️  TRAINING SCALABILITY\n")
+    report = sweep(args)
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Saved: {output}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,284 @@
+"""
+Batch Scoring Engine
+====================
+Streams a student CSV in fixed-size chunks and scores every risk target
+(dropout, failure, delay) in one pass over the data. Features are prepared
+once per chunk; each model applies its own scaler. Scored chunks are appended
+to the output file as they finish, so memory stays flat however large the
+input is.
+
+With a PredictionCache (models/prediction_cache.py) only students whose
+feature vector changed since the last run are rescored, and the students
+whose risk level moved are collected into a compact diff. Reason codes are
+cached too: a reused student keeps the reasons of the run that scored it.
+
+ShardedScorer spreads the chunks over a process pool. Each worker loads the
+models once, memory-mapped from the registry, so workers share the model
+arrays through the page cache. Results come back in input order.
+
+Usage:
+    scorer = BatchScorer(bundles, prepare_features)
+    summary = scorer.score_csv('students.csv', 'predictions_output.csv')
+
+    scorer = BatchScorer(bundles, prepare_features, cache=PredictionCache(versions=...))
+    scorer = ShardedScorer(bundles, prepare_features, workers=4)
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from models.explanations import reason_codes
+from models.loader import load_forest, load_model
+from models.prediction_cache import feature_hashes
+from models.registry import DEFAULT_ROOT
+from models.risk_levels import RISK_LEVELS, risk_level_index
+
+DEFAULT_CHUNK_SIZE = 50000
+
+# Input columns carried through to the output when present
+ID_COLUMNS = [
+    'student_id', 'name', 'class_level', 'school_id', 'program_id',
+    'physical_attendance_rate', 'cumulative_gpa', 'avg_grade',
+]
+
+
+class BatchScorer:
+    """Scores several targets chunk by chunk"""
+
+    def __init__(self, bundles, prepare_features, forest=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 cache=None):
+        """
+        bundles:          {name: ModelBundle}, e.g. {'dropout': ..., 'failure': ...}
+        prepare_features: maps an input chunk to the model feature frame
+        forest:           compact forest for reason codes (None disables them)
+        cache:            PredictionCache; only students whose features changed
+                          are rescored (delta scoring)
+        """
+        self.bundles = bundles
+        self.prepare_features = prepare_features
+        self.forest = forest
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.rescored = 0
+        self.changes = []
+
+    def _probabilities(self, df, features):
+        """
+        ({name: probabilities}, cache lookup)
+
+        With a cache, unchanged students are not rescored; the lookup is
+        (feature hashes, cache positions, unchanged mask), else None.
+        """
+        if self.cache is None:
+            return {name: bundle.risk_probability(features) for name, bundle in self.bundles.items()}, None
+
+        student_ids = df['student_id'].to_numpy()
+        hashes = feature_hashes(features)
+        positions, unchanged = self.cache.lookup(student_ids, hashes)
+        changed = ~unchanged
+        self.rescored += int(changed.sum())
+
+        probabilities = {}
+        for name, bundle in self.bundles.items():
+            current = np.empty(len(df), dtype=np.float64)
+            current[unchanged] = self.cache.previous(name, positions[unchanged])
+            if changed.any():
+                current[changed] = bundle.risk_probability(features[changed])
+            probabilities[name] = current
+            self._record_changes(name, bundle, student_ids, positions, changed, current)
+
+        return probabilities, (hashes, positions, unchanged)
+
+    def _record_changes(self, name, bundle, student_ids, positions, changed, current):
+        """Students whose risk level moved (or who are new) for one target"""
+        rows = np.flatnonzero(changed)
+        if len(rows) == 0:
+            return
+
+        known = positions[rows] >= 0
+        previous = np.full(len(rows), np.nan)
+        previous[known] = self.cache.previous(name, positions[rows][known])
+        old_level = risk_level_index(np.nan_to_num(previous), bundle.cutoffs)
+        new_level = risk_level_index(current[rows], bundle.cutoffs)
+
+        moved = ~known | (old_level != new_level)
+        if not moved.any():
+            return
+
+        self.changes.append(pd.DataFrame({
+            'student_id': student_ids[rows][moved],
+            'target': name,
+            'previous_probability': previous[moved],
+            'previous_risk_level': np.where(known, RISK_LEVELS[old_level], 'NEW')[moved],
+            'probability': current[rows][moved],
+            'risk_level': RISK_LEVELS[new_level][moved],
+        }))
+
+    def score_frame(self, df):
+        """Probability and risk level for every target, aligned with df"""
+        features = self.prepare_features(df)
+        scored = pd.DataFrame(index=df.index)
+
+        all_probabilities, lookup = self._probabilities(df, features)
+        for name, probabilities in all_probabilities.items():
+            cutoffs = self.bundles[name].cutoffs
+            scored[f'{name}_probability'] = probabilities
+            scored[f'{name}_risk_level'] = RISK_LEVELS[risk_level_index(probabilities, cutoffs)]
+
+        reasons = None
+        if self.forest is not None:
+            reasons = self._reason_codes(features, lookup)
+            scored = scored.join(reasons)
+        if lookup is not None:
+            self.cache.record(df['student_id'].to_numpy(), lookup[0], all_probabilities, reasons)
+        return scored
+
+    def _reason_codes(self, features, lookup):
+        """Reason codes aligned with features; cached ones are reused for unchanged students"""
+        if lookup is None:
+            return reason_codes(self.forest, features)
+
+        _, positions, unchanged = lookup
+        reuse = unchanged.copy()
+        reuse[unchanged] = self.cache.explained[positions[unchanged]]
+        if not reuse.any():
+            return reason_codes(self.forest, features)
+        reasons = reason_codes(self.forest, features[~reuse])
+        if list(reasons.columns) != self.cache.reason_columns:
+            # Cached with another reason layout: explain every row again
+            return reason_codes(self.forest, features)
+
+        cached = self.cache.previous_reasons(positions[reuse])
+        cached.index = features.index[reuse]
+        return pd.concat([reasons, cached]).reindex(features.index)
+
+    def iter_chunks(self, filepath):
+        """(input chunk, scored chunk) pairs in file order"""
+        for chunk in pd.read_csv(filepath, chunksize=self.chunk_size):
+            yield chunk, self.score_frame(chunk)
+
+    def score_csv(self, filepath, output_path, on_chunk=None, changes_path=None, complete=False):
+        """
+        Score a CSV into output_path, one chunk at a time
+
+        on_chunk(result) is called with every scored chunk (ID columns plus
+        predictions) before it is written. With a cache, the students whose
+        risk level changed are written to changes_path and the cache is
+        saved (complete: the file is the whole population, so students not in
+        it leave the cache). Returns per-target risk level counts and row
+        totals.
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        level_counts = {name: np.zeros(len(RISK_LEVELS), dtype=np.int64) for name in self.bundles}
+        rows = 0
+        self.rescored = 0
+        self.changes = []
+
+        with open(output_path, 'w', newline='') as out:
+            for chunk, scored in self.iter_chunks(filepath):
+                keep = [c for c in ID_COLUMNS if c in chunk.columns]
+                result = chunk[keep].join(scored)
+
+                for name, bundle in self.bundles.items():
+                    index = risk_level_index(scored[f'{name}_probability'].values, bundle.cutoffs)
+                    level_counts[name] += np.bincount(index, minlength=len(RISK_LEVELS))
+
+                if on_chunk is not None:
+                    on_chunk(result)
+
+                result.to_csv(out, header=(rows == 0), index=False)
+                rows += len(result)
+
+        level_changes = 0
+        if self.cache is not None:
+            self.cache.save(complete=complete)
+            changes = pd.concat(self.changes, ignore_index=True) if self.changes else pd.DataFrame()
+            level_changes = len(changes)
+            if changes_path is not None:
+                Path(changes_path).parent.mkdir(parents=True, exist_ok=True)
+                changes.to_csv(changes_path, index=False)
+
+        return {
+            'rows': rows,
+            'rescored': self.rescored if self.cache is not None else rows,
+            'level_changes': level_changes,
+            'levels': {
+                name: dict(zip(RISK_LEVELS.tolist(), counts.tolist()))
+                for name, counts in level_counts.items()
+            },
+        }
+
+
+# Scorer of the current worker process (set by _init_worker)
+_worker_scorer = None
+
+
+def _init_worker(targets, versions, registry_root, prepare_features, explain):
+    """Load every model once per worker process"""
+    global _worker_scorer
+    bundles = {
+        name: load_model(target, registry_root=registry_root, version=versions[name])
+        for name, target in targets.items()
+    }
+    for bundle in bundles.values():
+        # Parallelism comes from the pool; threads per worker would oversubscribe
+        if hasattr(bundle.model, 'n_jobs'):
+            bundle.model.n_jobs = 1
+
+    forest = None
+    if explain is not None:
+        forest = load_forest(targets[explain], registry_root=registry_root, version=versions[explain])
+    _worker_scorer = BatchScorer(bundles, prepare_features, forest=forest)
+
+
+def _score_in_worker(chunk):
+    return _worker_scorer.score_frame(chunk)
+
+
+class ShardedScorer(BatchScorer):
+    """BatchScorer that scores chunks on a process pool, output in input order"""
+
+    def __init__(self, bundles, prepare_features, workers=None, explain=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, registry_root=DEFAULT_ROOT, max_pending=None):
+        """
+        workers:     pool size (default: CPU count)
+        explain:     bundle name whose compact forest gives reason codes, or None
+        max_pending: chunks in flight at once (default: 2 per worker)
+        """
+        super().__init__(bundles, prepare_features, chunk_size=chunk_size)
+        self.workers = workers or os.cpu_count() or 1
+        self.explain = explain
+        self.registry_root = str(registry_root)
+        self.max_pending = max_pending or 2 * self.workers
+
+    def _init_args(self):
+        targets = {name: bundle.target for name, bundle in self.bundles.items()}
+        # Workers load exactly the versions the parent resolved
+        versions = {name: bundle.version for name, bundle in self.bundles.items()}
+        return targets, versions, self.registry_root, self.prepare_features, self.explain
+
+    def iter_chunks(self, filepath):
+        """
+        (input chunk, scored chunk) pairs in file order
+
+        At most max_pending chunks are in flight, so memory stays bounded
+        while the pool is kept busy.
+        """
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=self._init_args()) as pool:
+            pending = deque()
+            for chunk in pd.read_csv(filepath, chunksize=self.chunk_size):
+                pending.append((chunk, pool.submit(_score_in_worker, chunk)))
+                if len(pending) >= self.max_pending:
+                    chunk, future = pending.popleft()
+                    yield chunk, future.result()
+
+            while pending:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
@@ -0,0 +1,321 @@
+"""
+Compact Forest Format
+=====================
+Flattens a trained RandomForestClassifier into contiguous NumPy arrays so it
+can be memory-mapped and scored without unpickling scikit-learn objects.
+
+Each bundle is two files:
+    <name>_forest.npy    one structured array with every node of every tree
+                         (feature, left, right, threshold, value)
+    <name>_forest.json   roots, depth and feature names
+
+The StandardScaler is folded into the split thresholds, so the scorer works
+on raw (unscaled) feature values.
+
+Usage:
+    python -m models.compact_forest
+
+Output:
+    models/saved_models/<target>_forest.npy
+    models/saved_models/<target>_forest.json
+"""
+
+import json
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+NODE_DTYPE = np.dtype([
+    ('feature', np.int32),
+    ('left', np.int32),
+    ('right', np.int32),
+    ('threshold', np.float64),
+    ('value', np.float64),
+])
+
+# Rows scored per traversal block (keeps the (rows x trees) index matrix small)
+DEFAULT_BATCH_SIZE = 8192
+
+
+def _positive_class_values(tree, positive_index):
+    """Probability of the positive class at every node of one tree"""
+    values = tree.value[:, 0, :]
+    totals = values.sum(axis=1)
+    totals[totals == 0] = 1.0
+    return values[:, positive_index] / totals
+
+
+def _goes_left(x, threshold, mean, scale):
+    """The exact test sklearn applies: float32((x - mean) / scale) <= threshold"""
+    return ((x - mean) / scale).astype(np.float32) <= threshold
+
+
+def fold_thresholds(threshold, mean, scale):
+    """
+    Map scaled-space thresholds back to raw feature values
+
+    Returns the largest raw value that still goes left, so `x <= raw` gives
+    the same split as scaling, casting to float32 and comparing. The naive
+    `t * scale + mean` can land one float32 rounding step off, which flips
+    rows sitting exactly on a training value; bisection fixes that.
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    guess = threshold * scale + mean
+    step = (np.abs(threshold) + 1.0) * scale * 1e-5
+
+    lo = guess - step
+    hi = guess + step
+    while True:
+        bad_lo = ~_goes_left(lo, threshold, mean, scale)
+        bad_hi = _goes_left(hi, threshold, mean, scale)
+        if not (bad_lo.any() or bad_hi.any()):
+            break
+        step = step * 16
+        lo = np.where(bad_lo, guess - step, lo)
+        hi = np.where(bad_hi, guess + step, hi)
+
+    # Invariant: lo goes left, hi goes right
+    for _ in range(128):
+        mid = lo + (hi - lo) / 2
+        left = _goes_left(mid, threshold, mean, scale)
+        lo = np.where(left, mid, lo)
+        hi = np.where(left, hi, mid)
+        if np.all(np.nextafter(lo, np.inf) >= hi):
+            break
+
+    return lo
+
+
+def flatten_forest(model, scaler=None):
+    """
+    Flatten a fitted forest into one node array
+
+    Leaf nodes point to themselves on both sides with a +inf threshold, so a
+    fixed number of traversal steps lands every row on its leaf.
+    """
+    if len(model.classes_) != 2:
+        raise ValueError("Compact format only supports binary classifiers")
+
+    if scaler is not None:
+        mean = getattr(scaler, 'mean_', None)
+        scale = getattr(scaler, 'scale_', None)
+        mean = np.zeros(model.n_features_in_) if mean is None else np.asarray(mean, dtype=np.float64)
+        scale = np.ones(model.n_features_in_) if scale is None else np.asarray(scale, dtype=np.float64)
+    else:
+        mean = np.zeros(model.n_features_in_)
+        scale = np.ones(model.n_features_in_)
+
+    total_nodes = sum(est.tree_.node_count for est in model.estimators_)
+    nodes = np.empty(total_nodes, dtype=NODE_DTYPE)
+    roots = []
+    offset = 0
+
+    for est in model.estimators_:
+        tree = est.tree_
+        count = tree.node_count
+        local = np.arange(count, dtype=np.int32)
+        is_leaf = tree.children_left == -1
+
+        block = nodes[offset:offset + count]
+        block['feature'] = np.where(is_leaf, 0, tree.feature)
+        block['left'] = np.where(is_leaf, local, tree.children_left) + offset
+        block['right'] = np.where(is_leaf, local, tree.children_right) + offset
+
+        # Undo the scaler: float32((x - mean) / scale) <= t  <=>  x <= raw
+        feat = block['feature']
+        split = ~is_leaf
+        block['threshold'] = np.inf
+        block['threshold'][split] = fold_thresholds(
+            tree.threshold[split], mean[feat[split]], scale[feat[split]]
+        )
+        block['value'] = _positive_class_values(tree, 1)
+
+        roots.append(offset)
+        offset += count
+
+    max_depth = max(est.tree_.max_depth for est in model.estimators_)
+    return nodes, np.asarray(roots, dtype=np.int32), int(max_depth)
+
+
+def export_compact_forest(model, scaler, path, feature_names=None):
+    """Write a forest (and its folded scaler) as a .npy/.json bundle"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    nodes, roots, max_depth = flatten_forest(model, scaler)
+    np.save(path, nodes, allow_pickle=False)
+
+    meta = {
+        'format': 'compact_forest/1',
+        'n_trees': len(roots),
+        'n_nodes': len(nodes),
+        'n_features': int(model.n_features_in_),
+        'max_depth': max_depth,
+        'roots': roots.tolist(),
+        'classes': [c.item() if hasattr(c, 'item') else c for c in model.classes_],
+        'feature_names': list(feature_names) if feature_names is not None else None,
+        'scaler_folded': scaler is not None,
+    }
+    with open(path.with_suffix('.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    return path
+
+
+class CompactForest:
+    """Vectorized scorer for the compact forest format"""
+
+    def __init__(self, nodes, roots, max_depth, n_features, classes=(0, 1), feature_names=None):
+        self.nodes = nodes
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features
+        self.classes_ = np.asarray(classes)
+        self.feature_names = feature_names
+
+    @classmethod
+    def load(cls, path, mmap_mode='r', meta_path=None):
+        """Load a bundle; the node array is memory-mapped by default"""
+        path = Path(path)
+        meta_path = Path(meta_path) if meta_path is not None else path.with_suffix('.json')
+        with open(meta_path) as f:
+            meta = json.load(f)
+        nodes = np.load(path, mmap_mode=mmap_mode, allow_pickle=False)
+        return cls(
+            nodes, meta['roots'], meta['max_depth'], meta['n_features'],
+            classes=meta.get('classes', (0, 1)),
+            feature_names=meta.get('feature_names'),
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def apply(self, X):
+        """Leaf index reached in every tree, shape (n_rows, n_trees)"""
+        X = np.asarray(X, dtype=np.float64)
+        n_features = X.shape[1]
+        flat = X.ravel()
+        base = (np.arange(len(X)) * n_features)[:, None]
+        idx = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+
+        feature = self.nodes['feature']
+        threshold = self.nodes['threshold']
+        left = self.nodes['left']
+        right = self.nodes['right']
+
+        for _ in range(self.max_depth):
+            go_left = flat[base + feature[idx]] <= threshold[idx]
+            idx = np.where(go_left, left[idx], right[idx])
+
+        return idx
+
+    def predict_positive(self, X, batch_size=DEFAULT_BATCH_SIZE):
+        """Positive-class probability for every row"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        values = self.nodes['value']
+        out = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), batch_size):
+            leaves = self.apply(X[start:start + batch_size])
+            out[start:start + batch_size] = values[leaves].sum(axis=1) / self.n_trees
+        return out
+
+    def _block_contributions(self, X):
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        base = (np.arange(n_rows) * n_features)[:, None]
+        idx = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+
+        feature = self.nodes['feature']
+        threshold = self.nodes['threshold']
+        left = self.nodes['left']
+        right = self.nodes['right']
+        values = self.nodes['value']
+
+        # (row, feature) cell each step's value change is credited to
+        cell_base = np.arange(n_rows)[:, None] * n_features
+        totals = np.zeros(n_rows * n_features, dtype=np.float64)
+
+        for _ in range(self.max_depth):
+            split_feature = feature[idx]
+            go_left = flat[base + split_feature] <= threshold[idx]
+            child = np.where(go_left, left[idx], right[idx])
+            # Leaves loop back to themselves, so finished paths add zero
+            delta = values[child] - values[idx]
+            totals += np.bincount(
+                (cell_base + split_feature).ravel(), weights=delta.ravel(),
+                minlength=n_rows * n_features,
+            )
+            idx = child
+
+        return totals.reshape(n_rows, n_features) / self.n_trees
+
+    def contributions(self, X, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Decompose every prediction along its decision paths
+
+        Returns (bias, contributions): bias is the forest's mean root value and
+        contributions[i, j] is how much feature j moved row i's positive-class
+        probability, so bias + contributions.sum(axis=1) == predict_positive(X).
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        bias = float(self.nodes['value'][self.roots].mean())
+        out = np.empty(X.shape, dtype=np.float64)
+        for start in range(0, len(X), batch_size):
+            out[start:start + batch_size] = self._block_contributions(X[start:start + batch_size])
+        return bias, out
+
+    def predict_proba(self, X, batch_size=DEFAULT_BATCH_SIZE):
+        """Same layout as RandomForestClassifier.predict_proba"""
+        positive = self.predict_positive(X, batch_size=batch_size)
+        return np.column_stack([1.0 - positive, positive])
+
+
+def load_compact_forest(path, mmap_mode='r', meta_path=None):
+    """Load a compact forest bundle"""
+    return CompactForest.load(path, mmap_mode=mmap_mode, meta_path=meta_path)
+
+
+def export_saved_models(model_dir='models/saved_models', feature_names=None):
+    """Export every <target>_model.pkl with a matching scaler in model_dir"""
+    model_dir = Path(model_dir)
+    exported = []
+
+    for model_file in sorted(model_dir.glob('*_model.pkl')):
+        target = model_file.name[:-len('_model.pkl')]
+        scaler_file = model_dir / f'{target}_scaler.pkl'
+
+        model = joblib.load(model_file)
+        scaler = joblib.load(scaler_file) if scaler_file.exists() else None
+
+        if not hasattr(model, 'estimators_'):
+            print(f"   ⚠️  Skipping {model_file.name} (not a forest)")
+            continue
+
+        out_path = export_compact_forest(
+            model, scaler, model_dir / f'{target}_forest.npy', feature_names=feature_names
+        )
+        old_size = model_file.stat().st_size
+        new_size = out_path.stat().st_size
+        print(f"   ✅ {model_file.name}: {old_size / 1024**2:.2f} MB -> "
+              f"{out_path.name}: {new_size / 1024**2:.2f} MB")
+        exported.append(out_path)
+
+    return exported
+
+
+def main():
+    print("\n📦 EXPORTING COMPACT FORESTS\n")
+    exported = export_saved_models()
+    print(f"\n✅ Exported {len(exported)} forest(s)\n")
+
+
+if __name__ == "__main__":
+    main()
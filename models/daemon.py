@@ -0,0 +1,199 @@
+"""
+Prediction Daemon
+=================
+Long-lived local process that keeps the risk models resident and reads
+students from the online feature store (or an indexed copy of the CSV),
+answering single-student lookups over a Unix domain socket in milliseconds.
+
+Protocol: one JSON object per line in each direction.
+    {"op": "ping"}
+    {"op": "student", "student_id": "100001"}   score a student from the feature table
+    {"op": "score", "student": {...}}           score a record supplied by the caller
+
+This module only imports the standard library at the top, so clients
+(predict_student.py --student-id) connect without paying for pandas or
+scikit-learn; the server side imports them when it starts.
+
+Usage:
+    python -m models.daemon
+    python -m models.daemon --socket /tmp/other.sock
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+
+from models.features import FEATURES_FILE
+
+DEFAULT_SOCKET = os.environ.get('PREDICT_DAEMON_SOCKET', '/tmp/strathmore_predict.sock')
+FEATURE_STORE = 'data/processed/feature_store.sqlite'
+
+# Risk target the daemon reports (same as predict_student's single-student mode)
+DAEMON_TARGET = 'dropped_out'
+
+CLIENT_TIMEOUT = 5.0
+
+
+def request(payload, socket_path=DEFAULT_SOCKET, timeout=CLIENT_TIMEOUT):
+    """Send one request; None when no daemon is listening"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(payload).encode() + b'\n')
+            with sock.makefile('rb') as reply:
+                line = reply.readline()
+    except (FileNotFoundError, ConnectionRefusedError, socket.timeout, OSError):
+        return None
+    return json.loads(line) if line else None
+
+
+class FeatureTable:
+    """features_engineered.csv indexed by student_id, reloaded when the file changes"""
+
+    def __init__(self, path=FEATURES_FILE):
+        self.path = path
+        self.mtime = None
+        self.rows = {}
+        self._lock = threading.Lock()
+
+    def _reload_if_changed(self):
+        import pandas as pd
+
+        mtime = os.stat(self.path).st_mtime
+        if mtime == self.mtime:
+            return
+        with self._lock:
+            if mtime == self.mtime:
+                return
+            df = pd.read_csv(self.path)
+            self.rows = dict(zip(df['student_id'].astype(str), df.to_dict('records')))
+            self.mtime = mtime
+
+    def get(self, student_id):
+        """Record for a student, or None"""
+        self._reload_if_changed()
+        return self.rows.get(str(student_id))
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def feature_lookup(store_path=FEATURE_STORE, features_file=FEATURES_FILE):
+    """Online feature store when it has been materialized, else the CSV table"""
+    from analytics.feature_engineering.online_store import OnlineFeatureStore
+
+    store = OnlineFeatureStore(store_path)
+    if store.exists() and len(store):
+        return store
+    return FeatureTable(features_file)
+
+
+def _json_safe(record):
+    """Plain Python values (NaN is kept; Python's json round-trips it)"""
+    return {key: value.item() if hasattr(value, 'item') else value for key, value in record.items()}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.dispatch(json.loads(line))
+            except Exception as error:
+                response = {'ok': False, 'error': str(error)}
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+            self.wfile.flush()
+
+
+class PredictionDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server with models and the feature table kept warm"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, features_file=FEATURES_FILE, store_path=FEATURE_STORE):
+        from models.record_scoring import load_record_scorer
+
+        self.socket_path = socket_path
+        self.features = feature_lookup(store_path, features_file)
+        self._load_scorer = load_record_scorer
+        # Record scorers reuse one feature vector: score one request at a time
+        self._score_lock = threading.Lock()
+        self.started = time.time()
+
+        self.features.get('')
+        self._load_scorer(DAEMON_TARGET)
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o600)
+
+    def predict(self, record):
+        with self._score_lock:
+            # Re-resolves the ref, so a newly promoted version is picked up
+            scorer = self._load_scorer(DAEMON_TARGET)
+            return scorer.predict(record)
+
+    def dispatch(self, message):
+        op = message.get('op')
+        if op == 'ping':
+            return {'ok': True, 'pid': os.getpid(), 'students': len(self.features),
+                    'uptime_seconds': round(time.time() - self.started, 1)}
+        if op == 'student':
+            record = self.features.get(message.get('student_id'))
+            if record is None:
+                return {'ok': False, 'error': 'not_found'}
+            return {'ok': True, 'student': _json_safe(record), 'prediction': self.predict(record)}
+        if op == 'score':
+            record = message.get('student') or {}
+            return {'ok': True, 'prediction': self.predict(record)}
+        return {'ok': False, 'error': f'unknown op {op!r}'}
+
+
+def _remove_stale_socket(socket_path):
+    """Delete a socket file left by a dead daemon; refuse if one is still running"""
+    if not os.path.exists(socket_path):
+        return
+    if request({'op': 'ping'}, socket_path, timeout=1.0) is not None:
+        raise RuntimeError(f"A daemon is already listening on {socket_path}")
+    os.unlink(socket_path)
+
+
+def _stop(signum, frame):
+    raise SystemExit(0)
+
+
+def serve(socket_path=DEFAULT_SOCKET, features_file=FEATURES_FILE, store_path=FEATURE_STORE):
+    _remove_stale_socket(socket_path)
+    # `kill` should shut down cleanly and remove the socket file
+    signal.signal(signal.SIGTERM, _stop)
+    server = PredictionDaemon(socket_path, features_file, store_path)
+    source = features_file if isinstance(server.features, FeatureTable) else server.features.path
+    print(f"   ✅ {len(server.features):,} students indexed ({source})")
+    print(f"   ✅ Listening on {socket_path}\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Warm prediction daemon')
+    parser.add_argument('--socket', type=str, default=DEFAULT_SOCKET)
+    parser.add_argument('--features', type=str, default=FEATURES_FILE,
+                        help='CSV used when the online feature store is missing')
+    parser.add_argument('--store', type=str, default=FEATURE_STORE)
+    args = parser.parse_args()
+
+    print("\n🔥 PREDICTION DAEMON\n")
+    serve(args.socket, args.features, args.store)
+
+
+if __name__ == "__main__":
+    main()
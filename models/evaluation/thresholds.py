@@ -0,0 +1,95 @@
+"""
+Threshold Optimization
+======================
+Precision / recall / F1 at every distinct probability threshold, computed in
+a single sort-and-cumsum pass, and operating points chosen for target recall
+levels.
+
+The chosen cutoffs are stored in the model metadata and used by scoring to
+bucket probabilities into risk levels (see models/risk_levels.py).
+"""
+
+import numpy as np
+
+# Recall each risk level must reach on the validation set:
+# MEDIUM catches 90% of at-risk students, HIGH 75%, CRITICAL 50%
+TARGET_RECALLS = (0.90, 0.75, 0.50)
+
+
+def threshold_curve(y_true, proba):
+    """
+    Metrics for the rule `proba >= threshold` at every distinct threshold
+
+    Returns a dict of arrays (threshold, tp, fp, precision, recall, f1),
+    thresholds in descending order.
+    """
+    y_true = np.asarray(y_true).astype(np.int64)
+    proba = np.asarray(proba, dtype=np.float64)
+
+    order = np.argsort(-proba, kind='mergesort')
+    proba = proba[order]
+    y_true = y_true[order]
+
+    tp = np.cumsum(y_true)
+    fp = np.cumsum(1 - y_true)
+
+    # Last position of each run of equal probabilities
+    distinct = np.r_[np.flatnonzero(np.diff(proba)), len(proba) - 1]
+    tp = tp[distinct]
+    fp = fp[distinct]
+    total_positive = max(int(y_true.sum()), 1)
+
+    precision = tp / (tp + fp)
+    recall = tp / total_positive
+    with np.errstate(invalid='ignore', divide='ignore'):
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+    return {
+        'threshold': proba[distinct],
+        'tp': tp,
+        'fp': fp,
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+    }
+
+
+def choose_operating_points(curve, target_recalls=TARGET_RECALLS):
+    """
+    Highest threshold reaching each target recall
+
+    Returns cutoffs in ascending order (ready for np.searchsorted) together
+    with the precision/recall/F1 achieved at each one.
+    """
+    points = []
+    for target in target_recalls:
+        reached = np.flatnonzero(curve['recall'] >= target)
+        # Thresholds are descending, so the first hit is the highest threshold
+        i = reached[0] if len(reached) else len(curve['threshold']) - 1
+        points.append({
+            'target_recall': float(target),
+            'threshold': float(curve['threshold'][i]),
+            'precision': float(curve['precision'][i]),
+            'recall': float(curve['recall'][i]),
+            'f1': float(curve['f1'][i]),
+        })
+
+    points.sort(key=lambda p: p['threshold'])
+    cutoffs = np.maximum.accumulate([p['threshold'] for p in points])
+
+    best = int(np.argmax(curve['f1']))
+    return {
+        'cutoffs': [float(c) for c in cutoffs],
+        'points': points,
+        'best_f1': {
+            'threshold': float(curve['threshold'][best]),
+            'precision': float(curve['precision'][best]),
+            'recall': float(curve['recall'][best]),
+            'f1': float(curve['f1'][best]),
+        },
+    }
+
+
+def operating_points(y_true, proba, target_recalls=TARGET_RECALLS):
+    """Threshold curve + operating point selection in one call"""
+    return choose_operating_points(threshold_curve(y_true, proba), target_recalls)
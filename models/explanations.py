@@ -0,0 +1,55 @@
+"""
+Reason Codes
+============
+Per-student explanations for forest predictions.
+
+Each prediction is decomposed along its decision paths (treeinterpreter
+style): every split a row passes through credits the change in node value to
+the split feature. The traversal runs over all rows and trees at once on the
+compact forest (models/compact_forest.py), so a whole cohort is explained in
+one vectorized pass.
+
+Usage:
+    forest = load_forest('dropped_out')
+    reasons = reason_codes(forest, features, top_k=3)
+"""
+
+import numpy as np
+import pandas as pd
+
+TOP_REASONS = 3
+
+
+def top_contributions(contributions, top_k=TOP_REASONS):
+    """Column indices of the top_k largest contributions per row, largest first"""
+    top_k = min(top_k, contributions.shape[1])
+    top = np.argpartition(-contributions, top_k - 1, axis=1)[:, :top_k]
+    order = np.argsort(-np.take_along_axis(contributions, top, axis=1), axis=1)
+    return np.take_along_axis(top, order, axis=1)
+
+
+def reason_codes(forest, features, top_k=TOP_REASONS, feature_names=None):
+    """
+    Top features pushing each student's risk up
+
+    Returns a DataFrame aligned with `features` holding reason_<n> (feature
+    name) and reason_<n>_contribution (probability points) columns. Reasons
+    that lower the risk are left blank.
+    """
+    if feature_names is None:
+        feature_names = forest.feature_names or list(getattr(features, 'columns', []))
+    names = np.asarray(feature_names, dtype=object)
+
+    # The forest was fitted on zero-filled inputs
+    X = features.fillna(0).values if hasattr(features, 'fillna') else np.nan_to_num(features, nan=0.0)
+    _, contributions = forest.contributions(X)
+
+    top = top_contributions(contributions, top_k)
+    values = np.take_along_axis(contributions, top, axis=1)
+    labels = np.where(values > 0, names[top], None)
+
+    reasons = pd.DataFrame(index=getattr(features, 'index', None))
+    for n in range(top.shape[1]):
+        reasons[f'reason_{n + 1}'] = labels[:, n]
+        reasons[f'reason_{n + 1}_contribution'] = np.where(values[:, n] > 0, values[:, n], np.nan).round(4)
+    return reasons
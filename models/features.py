@@ -0,0 +1,86 @@
+"""
+Model Features
+==============
+Maps current-student records to the historical (y1s1_*) features the risk
+models were trained on, and loads the model of each risk target. Shared by
+the batch scripts, the scoring service and the benchmarks.
+
+pandas and the model modules are imported inside the functions that need
+them, so importing this module stays cheap (predict_student.py answers
+daemon lookups without loading pandas).
+"""
+
+from pathlib import Path
+
+# Engineered features of the whole current student population
+FEATURES_FILE = 'data/processed/features_engineered.csv'
+
+# Risk targets: display name -> model target (historical feature set)
+TARGETS = {
+    'dropout': 'dropped_out',
+    'failure': 'failed_courses',
+    'delay': 'delayed_graduation',
+}
+
+# Scored columns kept for the risk rollups (besides probabilities and levels)
+ROLLUP_COLUMNS = ('student_id', 'school_id', 'program_id', 'class_level')
+
+# Current-data fields prepare_features_from_current_data reads
+INPUT_FIELDS = [
+    'physical_attendance_rate',
+    'cumulative_gpa',
+    'avg_grade',
+    'lms_activity_count',
+    'courses_enrolled',
+    'exam_eligible',
+    'low_lms_engagement',
+]
+
+
+def prepare_features_from_current_data(df):
+    """
+    Map current data features to historical training features
+    """
+    import pandas as pd
+
+    features = pd.DataFrame()
+
+    # Map to historical feature names
+    features['y1s1_attendance_rate'] = df['physical_attendance_rate']
+    features['y1s1_gpa'] = df['cumulative_gpa']
+    features['y1s1_avg_grade'] = df['avg_grade']
+    features['y1s1_lms_activities'] = df['lms_activity_count']
+    features['y1s1_courses_enrolled'] = df['courses_enrolled']
+    features['y1s1_exam_eligible'] = df['exam_eligible']
+    features['y1s1_attendance_below_67'] = (df['physical_attendance_rate'] < 0.67).astype(int)
+    features['y1s1_gpa_below_2'] = (df['cumulative_gpa'] < 2.0).astype(int)
+    features['y1s1_grade_below_40'] = (df['avg_grade'] < 40).astype(int)
+    features['y1s1_low_engagement'] = df['low_lms_engagement']
+
+    # Missing values are left as NaN; the model bundle fills them only for
+    # models that cannot route NaN themselves
+    return features
+
+
+_announced = set()
+
+
+def get_model(name):
+    """
+    Model bundle (model + its own scaler) for a risk target
+
+    Loaded on first use and cached for the life of the process, so a run that
+    only needs the dropout model never touches the other pickles.
+    """
+    from models.loader import load_model
+
+    bundle = load_model(TARGETS[name])
+    if name not in _announced:
+        print(f"   ✅ {name.title()} model loaded (version {bundle.version})")
+        _announced.add(name)
+    return bundle
+
+
+def is_whole_population(filepath):
+    """True when `filepath` is the full current-student feature file"""
+    return Path(filepath).resolve() == Path(FEATURES_FILE).resolve()
@@ -0,0 +1,173 @@
+"""
+Model Loader
+============
+Loads models on first use and keeps them in a process-wide LRU cache keyed by
+model version.
+
+Models are resolved through a registry ref (see models/registry.py). When the
+ref does not exist yet, the flat pickles in models/saved_models are used; their
+version carries the newest file mtime, so retrained pickles are reloaded.
+Pickles are opened with joblib's mmap_mode so large arrays are paged in from
+disk instead of copied.
+
+Usage:
+    bundle = load_model('dropped_out')
+    probs = bundle.risk_probability(features)
+"""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from models.compact_forest import load_compact_forest
+from models.registry import DEFAULT_ROOT, ModelRegistry
+from models.risk_levels import cutoffs_from_metadata, risk_levels
+
+# Ref that train_model.py promotes (historical y1s1_* feature set)
+HISTORICAL_REF = 'historical'
+
+LEGACY_DIR = 'models/saved_models'
+LEGACY_VERSION = 'saved_models'
+
+MODEL_CACHE_SIZE = 16
+
+# Model types that route NaN natively; everything else gets fillna(0)
+NATIVE_MISSING_MODELS = ('HistGradientBoostingClassifier',)
+
+
+class ModelBundle:
+    """A model, its own scaler and the version they came from"""
+
+    def __init__(self, target, version, model, scaler, features=None, metadata=None):
+        self.target = target
+        self.version = version
+        self.model = model
+        self.scaler = scaler
+        self.features = features
+        self.metadata = metadata or {}
+
+    @property
+    def handles_missing(self):
+        return type(self.model).__name__ in NATIVE_MISSING_MODELS
+
+    def transform(self, X):
+        """Fill missing values (if the model needs it) and apply this model's scaler"""
+        if not self.handles_missing:
+            X = X.fillna(0) if hasattr(X, 'fillna') else np.nan_to_num(X, nan=0.0)
+        if self.scaler is None:
+            return X
+        return self.scaler.transform(X)
+
+    @property
+    def cutoffs(self):
+        """Risk level cutoffs chosen at training time (or the defaults)"""
+        return cutoffs_from_metadata(self.metadata)
+
+    def risk_probability(self, X):
+        """Probability of the positive (at-risk) class for every row"""
+        return self.model.predict_proba(self.transform(X))[:, 1]
+
+    def risk_levels(self, probabilities):
+        """Risk level label for every probability, using this model's cutoffs"""
+        return risk_levels(probabilities, self.cutoffs)
+
+
+def is_legacy(version):
+    """True for versions that name the flat pickles in LEGACY_DIR"""
+    return version == LEGACY_VERSION or version.startswith(LEGACY_VERSION + '@')
+
+
+def legacy_version():
+    """
+    LEGACY_VERSION stamped with the newest mtime in LEGACY_DIR
+
+    Rewriting a pickle changes the version, so cached models (and delta
+    prediction caches) of the old files are not reused.
+    """
+    try:
+        with os.scandir(LEGACY_DIR) as entries:
+            stamp = max((e.stat().st_mtime_ns for e in entries if e.is_file()), default=None)
+    except FileNotFoundError:
+        stamp = None
+    return LEGACY_VERSION if stamp is None else f"{LEGACY_VERSION}@{stamp}"
+
+
+def resolve_version(ref=HISTORICAL_REF, registry_root=DEFAULT_ROOT):
+    """Version a ref points to, or the legacy version for the flat pickles"""
+    ref_path = Path(registry_root, 'refs', ref)
+    if ref_path.exists():
+        return ref_path.read_text().strip()
+    return legacy_version()
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _load_bundle(registry_root, version, target):
+    if is_legacy(version):
+        model_file = Path(LEGACY_DIR) / f'{target}_model.pkl'
+        scaler_file = Path(LEGACY_DIR) / f'{target}_scaler.pkl'
+        if not model_file.exists():
+            raise FileNotFoundError(f"No model for '{target}' in {LEGACY_DIR}")
+
+        model = joblib.load(model_file, mmap_mode='r')
+        scaler = joblib.load(scaler_file, mmap_mode='r') if scaler_file.exists() else None
+        return ModelBundle(target, version, model, scaler)
+
+    registry = ModelRegistry(registry_root)
+    manifest = registry.manifest(version)
+    if target not in manifest['targets']:
+        raise FileNotFoundError(f"No model for '{target}' in version {version}")
+
+    model, scaler = registry.load_target(target, version, mmap_mode='r')
+    return ModelBundle(
+        target, version, model, scaler,
+        features=manifest.get('features'),
+        metadata=manifest['targets'][target],
+    )
+
+
+@lru_cache(maxsize=MODEL_CACHE_SIZE)
+def _load_forest(registry_root, version, target):
+    if is_legacy(version):
+        path = Path(LEGACY_DIR) / f'{target}_forest.npy'
+        return load_compact_forest(path) if path.exists() else None
+    return ModelRegistry(registry_root).load_forest(target, version)
+
+
+def load_model(target, ref=HISTORICAL_REF, registry_root=DEFAULT_ROOT, version=None):
+    """
+    Model bundle for a target, loaded on first use
+
+    The ref is re-resolved on every call (one small file read), so a
+    long-running process picks up a newly promoted version while versions it
+    has already loaded stay cached. Pass `version` to pin an exact version
+    instead (e.g. so worker processes score with the parent's models).
+    """
+    if version is None:
+        version = resolve_version(ref, registry_root)
+    return _load_bundle(str(registry_root), version, target)
+
+
+def load_forest(target, ref=HISTORICAL_REF, registry_root=DEFAULT_ROOT, version=None):
+    """Memory-mapped compact forest for a target, or None if not exported"""
+    if version is None:
+        version = resolve_version(ref, registry_root)
+    return _load_forest(str(registry_root), version, target)
+
+
+def load_cutoffs(target, ref=HISTORICAL_REF, registry_root=DEFAULT_ROOT, version=None):
+    """Risk level cutoffs of a target's model, read from the manifest (no model load)"""
+    if version is None:
+        version = resolve_version(ref, registry_root)
+    if is_legacy(version):
+        return cutoffs_from_metadata(None)
+    manifest = ModelRegistry(registry_root).manifest(version)
+    return cutoffs_from_metadata(manifest['targets'].get(target))
+
+
+def clear_cache():
+    """Drop every cached model"""
+    _load_bundle.cache_clear()
+    _load_forest.cache_clear()
@@ -0,0 +1,195 @@
+"""
+Prediction Cache
+================
+Probabilities from the previous run, keyed by student_id and a hash of the
+student's model feature vector. The whole cache belongs to one set of model
+versions; when any version changes, it is ignored and every student is
+rescored.
+
+A run only rescores students whose feature hash is new or changed, so
+nightly cost is proportional to the number of changed students rather than
+the size of the student body. Reason codes depend on the same features and
+model versions, so they are cached next to the probabilities and reused too.
+
+A run that scored only part of the population (a --file subset) is merged
+into the cache; only a whole-population run drops students it did not see.
+
+File format (one .npz, written atomically):
+    student_id, hash (uint64), <target>_probability (float64),
+    explained (bool: reason codes stored), <reason column>..., meta (JSON)
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_PATH = 'data/predictions/prediction_cache.npz'
+
+
+def feature_hashes(features):
+    """64-bit hash of every feature row (values only, index ignored)"""
+    return pd.util.hash_pandas_object(features, index=False).to_numpy(dtype=np.uint64)
+
+
+class PredictionCache:
+    """Last run's probabilities, reused for students whose features did not change"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, versions=None):
+        """versions: {target name: model version} the cached probabilities came from"""
+        self.path = Path(path)
+        self.versions = dict(versions or {})
+        self.index = pd.Index([])
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.probabilities = {name: np.empty(0) for name in self.versions}
+        self.explained = np.zeros(0, dtype=bool)
+        self.reasons = pd.DataFrame()
+        self.status = 'empty'
+        self._recorded = []
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+
+        with np.load(self.path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('versions') != self.versions:
+                self.status = 'stale'
+                return
+            index = pd.Index(data['student_id'])
+            if not index.is_unique:
+                self.status = 'stale'
+                return
+
+            self.index = index
+            self.hashes = data['hash']
+            self.probabilities = {
+                name: data[f'{name}_probability'] for name in self.versions
+            }
+            reason_columns = meta.get('reasons', [])
+            if reason_columns:
+                self.explained = data['explained']
+                self.reasons = pd.DataFrame({column: data[column] for column in reason_columns})
+                # Blank reasons are stored as '' (no pickled None in the file)
+                self.reasons = self.reasons.replace('', None)
+            else:
+                self.explained = np.zeros(len(index), dtype=bool)
+        self.status = 'loaded'
+
+    def __len__(self):
+        return len(self.index)
+
+    def lookup(self, student_ids, hashes):
+        """
+        (positions, unchanged) for a batch of students
+
+        positions[i] is the row of student i in the previous run (-1 if new);
+        unchanged[i] is True when the cached probabilities can be reused.
+        """
+        positions = self.index.get_indexer(np.asarray(student_ids))
+        found = positions >= 0
+        unchanged = found.copy()
+        unchanged[found] = self.hashes[positions[found]] == hashes[found]
+        return positions, unchanged
+
+    def previous(self, name, positions):
+        """Cached probabilities of one target at the given positions"""
+        return self.probabilities[name][positions]
+
+    @property
+    def reason_columns(self):
+        return list(self.reasons.columns)
+
+    def previous_reasons(self, positions):
+        """Cached reason code columns at the given positions (only where explained)"""
+        return self.reasons.iloc[positions].reset_index(drop=True)
+
+    def record(self, student_ids, hashes, probabilities, reasons=None):
+        """Remember this run's results (reasons: reason code frame or None); saved by save()"""
+        self._recorded.append((np.asarray(student_ids), hashes, probabilities, reasons))
+
+    def _merged(self, complete):
+        """(student_ids, hashes, {name: probabilities}, explained, reasons) to store"""
+        student_ids = np.concatenate([r[0] for r in self._recorded])
+        if student_ids.dtype == object:
+            student_ids = student_ids.astype(str)
+        hashes = np.concatenate([r[1] for r in self._recorded])
+        probabilities = {name: np.concatenate([r[2][name] for r in self._recorded]) for name in self.versions}
+
+        explained_parts = [r[3] for r in self._recorded if r[3] is not None]
+        columns = list(explained_parts[0].columns) if explained_parts else self.reason_columns
+        explained = np.concatenate([np.full(len(r[0]), r[3] is not None) for r in self._recorded])
+        reasons = pd.concat(
+            [r[3].reset_index(drop=True) if r[3] is not None else pd.DataFrame(index=range(len(r[0])))
+             for r in self._recorded], ignore_index=True,
+        ).reindex(columns=columns)
+
+        # Unexplained this run but unchanged: keep the cached reasons
+        positions = self.index.get_indexer(student_ids)
+        keep = ~explained & (positions >= 0) & (self.reason_columns == columns)
+        keep[keep] = self.explained[positions[keep]] & (self.hashes[positions[keep]] == hashes[keep])
+        if keep.any():
+            for column in columns:
+                values = reasons[column].to_numpy(dtype=object, copy=True)
+                values[keep] = self.reasons[column].to_numpy(dtype=object)[positions[keep]]
+                reasons[column] = values
+            explained = explained | keep
+
+        if complete or not len(self.index):
+            return student_ids, hashes, probabilities, explained, reasons
+
+        # Partial run: students it did not score keep their cached rows
+        unseen = np.ones(len(self.index), dtype=bool)
+        unseen[positions[positions >= 0]] = False
+        old_explained = self.explained[unseen] & (self.reason_columns == columns)
+        old_reasons = (self.reasons.iloc[np.flatnonzero(unseen)].reset_index(drop=True) if columns
+                       else pd.DataFrame(index=range(int(unseen.sum()))))
+        return (
+            np.concatenate([student_ids, self.index.to_numpy()[unseen].astype(student_ids.dtype)]),
+            np.concatenate([hashes, self.hashes[unseen]]),
+            {name: np.concatenate([values, self.probabilities[name][unseen]])
+             for name, values in probabilities.items()},
+            np.concatenate([explained, old_explained]),
+            pd.concat([reasons, old_reasons.reindex(columns=columns)], ignore_index=True),
+        )
+
+    def save(self, complete=False):
+        """
+        Store this run's results
+
+        complete: the run scored the whole population, so students it did
+        not see are dropped; otherwise they keep their cached rows.
+        """
+        if not self._recorded:
+            return
+
+        student_ids, hashes, probabilities, explained, reasons = self._merged(complete)
+        arrays = {
+            'student_id': student_ids,
+            'hash': hashes,
+            'explained': explained,
+            'meta': np.array(json.dumps({'versions': self.versions, 'reasons': list(reasons.columns)})),
+        }
+        for name, values in probabilities.items():
+            arrays[f'{name}_probability'] = values
+        for column in reasons.columns:
+            values = reasons[column]
+            if pd.api.types.infer_dtype(values, skipna=True) == 'string':
+                arrays[column] = np.array(['' if pd.isna(v) else v for v in values], dtype=str)
+            else:
+                arrays[column] = pd.to_numeric(values).to_numpy(dtype=np.float64)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix='.tmp-', suffix='.npz')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
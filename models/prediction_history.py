@@ -0,0 +1,290 @@
+"""
+Prediction History
+==================
+Append-only, columnar history of every scoring run, partitioned by run date.
+The predictions table keeps a row per student per run; after a year of
+nightly runs over the whole student body that is hundreds of millions of
+rows. This store keeps the same history in 5 bytes per student per target.
+
+Every student gets a small integer code the first time they are scored, and
+a student's row in every partition is their code, so the per-student index
+is just the student dictionary: finding a trajectory is one binary search
+plus one fixed-offset read per column file of each partition (a student's
+targets are adjacent).
+
+Layout (under data/predictions/history/):
+    <YYYY-MM-DD>/<run_id>_probability.npy   float32, (students x targets)
+    <YYYY-MM-DD>/<run_id>_risk_level.npy    int8 index into RISK_LEVELS
+                                            (-1: not scored in this run)
+    students.npy                            int64 (2 x students): sorted
+                                            student_ids, then their codes
+    catalog.json                            runs in order: date, targets,
+                                            rows and data offsets
+
+Partition files are never rewritten. A run becomes visible only when the
+catalog is replaced (atomically, after its partition and the student
+dictionary are on disk), so readers never see half a run.
+
+Usage:
+    python -m models.prediction_history 100001
+    python -m models.prediction_history 100001 --history /path/to/history
+
+    from models.prediction_history import PredictionHistory
+    PredictionHistory().trajectory(100001)
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from models.risk_levels import RISK_LEVELS
+
+DEFAULT_HISTORY_PATH = 'data/predictions/history'
+
+PROBABILITY_DTYPE = np.dtype(np.float32)
+RISK_LEVEL_DTYPE = np.dtype(np.int8)
+CODE_DTYPE = np.dtype(np.int32)
+
+# Risk level byte of a student not scored in a run (int8 -1)
+_MISSING = np.array(-1, dtype=RISK_LEVEL_DTYPE).tobytes()
+
+
+def _atomic_save(path, array):
+    """np.save to a temporary file, then rename over `path`"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-', suffix='.npy')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, array, allow_pickle=False)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _data_offset(path):
+    """Byte offset of the array data in a .npy file"""
+    with open(path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            np.lib.format.read_array_header_1_0(f)
+        else:
+            np.lib.format.read_array_header_2_0(f)
+        return f.tell()
+
+
+def risk_level_codes(labels):
+    """int8 position of each label in RISK_LEVELS (-1 if unknown or missing)"""
+    codes = pd.Categorical(np.asarray(labels, dtype=object), categories=RISK_LEVELS).codes
+    return codes.astype(RISK_LEVEL_DTYPE)
+
+
+class PredictionHistory:
+    """Append runs and read student trajectories (one writer, any number of readers)"""
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = Path(path)
+        self.root = str(self.path)
+        self.catalog_path = self.path / 'catalog.json'
+        self.students_path = self.path / 'students.npy'
+        self._catalog = (None, [])
+
+    def runs(self):
+        """Catalog entries, oldest first (re-read only when the catalog file changes)"""
+        try:
+            stat = self.catalog_path.stat()
+        except FileNotFoundError:
+            return []
+        version = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if self._catalog[0] != version:
+            self._catalog = (version, json.loads(self.catalog_path.read_text())['runs'])
+        return list(self._catalog[1])
+
+    def __len__(self):
+        return len(self.runs())
+
+    def _dictionary(self, mmap_mode='r'):
+        """(sorted student_ids, their codes); empty before the first run"""
+        if not self.students_path.exists():
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=CODE_DTYPE)
+        # One file, so a reader never pairs new ids with old codes
+        students = np.load(self.students_path, mmap_mode=mmap_mode, allow_pickle=False)
+        return students[0], students[1]
+
+    def codes(self, student_ids):
+        """int32 code of each student (-1 if never scored)"""
+        student_ids = np.asarray(student_ids, dtype=np.int64)
+        ids, codes = self._dictionary()
+        if not len(ids):
+            return np.full(len(student_ids), -1, dtype=CODE_DTYPE)
+        positions = np.minimum(np.searchsorted(ids, student_ids), len(ids) - 1)
+        return np.where(ids[positions] == student_ids, codes[positions], -1).astype(CODE_DTYPE)
+
+    def _assign_codes(self, student_ids):
+        """Codes for a run's students, giving new students the next free codes"""
+        ids, codes = self._dictionary(mmap_mode=None)
+        positions = pd.Index(ids).get_indexer(student_ids)
+        new_ids = np.unique(student_ids[positions < 0])
+        if not len(new_ids):
+            return codes[positions].astype(CODE_DTYPE), None
+
+        first = int(codes.max()) + 1 if len(codes) else 0
+        new_codes = np.arange(first, first + len(new_ids), dtype=CODE_DTYPE)
+        merged_ids = np.concatenate([ids, new_ids])
+        merged_codes = np.concatenate([codes, new_codes])
+        order = np.argsort(merged_ids, kind='stable')
+        dictionary = (merged_ids[order], merged_codes[order])
+
+        run_codes = np.empty(len(student_ids), dtype=CODE_DTYPE)
+        known = positions >= 0
+        run_codes[known] = codes[positions[known]]
+        run_codes[~known] = new_codes[np.searchsorted(new_ids, student_ids[~known])]
+        return run_codes, dictionary
+
+    def append(self, run_id, student_ids, probabilities, risk_levels, run_date=None):
+        """
+        Store one run
+
+        probabilities: {target: probability per student}
+        risk_levels:   {target: risk level label per student}
+        run_date:      partition date (default: today)
+
+        Raises ValueError if the run is already stored or a student appears
+        twice. Returns the catalog entry.
+        """
+        runs = self.runs()
+        if any(entry['run_id'] == run_id for entry in runs):
+            raise ValueError(f"Run {run_id} is already in the prediction history")
+        student_ids = np.asarray(student_ids, dtype=np.int64)
+        if len(np.unique(student_ids)) != len(student_ids):
+            raise ValueError(f"Run {run_id} has duplicate student_ids")
+
+        targets = list(probabilities)
+        codes, dictionary = self._assign_codes(student_ids)
+        rows = int(codes.max()) + 1 if len(codes) else 0
+
+        # Row = student code; students not in this run stay NaN / -1
+        probability = np.full((rows, len(targets)), np.nan, dtype=PROBABILITY_DTYPE)
+        risk_level = np.full((rows, len(targets)), -1, dtype=RISK_LEVEL_DTYPE)
+        for i, target in enumerate(targets):
+            probability[codes, i] = np.asarray(probabilities[target], dtype=PROBABILITY_DTYPE)
+            risk_level[codes, i] = risk_level_codes(risk_levels[target])
+
+        run_date = run_date or datetime.now().strftime('%Y-%m-%d')
+        partition = self.path / run_date
+        files = {
+            'probability': partition / f'{run_id}_probability.npy',
+            'risk_level': partition / f'{run_id}_risk_level.npy',
+        }
+        _atomic_save(files['probability'], probability)
+        _atomic_save(files['risk_level'], risk_level)
+        if dictionary is not None:
+            _atomic_save(self.students_path, np.vstack(dictionary).astype(np.int64))
+
+        entry = {
+            'run_id': run_id,
+            'run_date': run_date,
+            'targets': targets,
+            'rows': rows,
+            'students': len(student_ids),
+        }
+        for name, path in files.items():
+            entry[name] = {'file': str(path.relative_to(self.path)), 'offset': _data_offset(path)}
+        runs.append(entry)
+
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix='.tmp-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'runs': runs}, f, indent=1)
+            os.replace(tmp, self.catalog_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return entry
+
+    def _read_row(self, info, code, size):
+        """One student's row of a partition column file (`size` bytes)"""
+        fd = os.open(f"{self.root}/{info['file']}", os.O_RDONLY)
+        try:
+            return os.pread(fd, size, info['offset'] + code * size)
+        finally:
+            os.close(fd)
+
+    def trajectory(self, student_id):
+        """
+        Every stored run of one student, oldest first
+
+        Columns: run_id, run_date, <target>_probability, <target>_risk_level.
+        Empty if the student was never scored; runs the student was missing
+        from are skipped.
+        """
+        code = int(self.codes([student_id])[0])
+        records = []
+        for entry in self.runs() if code >= 0 else []:
+            if code >= entry['rows']:
+                continue
+            width = len(entry['targets'])
+            row = self._read_row(entry['risk_level'], code, width)
+            if row == _MISSING * width:
+                continue
+            levels = np.frombuffer(row, dtype=RISK_LEVEL_DTYPE)
+            row = self._read_row(entry['probability'], code, width * PROBABILITY_DTYPE.itemsize)
+            probabilities = np.frombuffer(row, dtype=PROBABILITY_DTYPE)
+            record = {'run_id': entry['run_id'], 'run_date': entry['run_date']}
+            for target, probability, level in zip(entry['targets'], probabilities.tolist(), levels.tolist()):
+                record[f'{target}_probability'] = probability
+                record[f'{target}_risk_level'] = RISK_LEVELS[level] if level >= 0 else None
+            records.append(record)
+        return pd.DataFrame.from_records(records, columns=None if records else ['run_id', 'run_date'])
+
+    def load_run(self, run_id):
+        """One whole run as a DataFrame (student_id, <target>_probability, <target>_risk_level)"""
+        entry = next((e for e in self.runs() if e['run_id'] == run_id), None)
+        if entry is None:
+            raise KeyError(f"Run {run_id} is not in the prediction history")
+
+        ids, codes = self._dictionary()
+        in_run = codes < entry['rows']
+        ids, codes = np.asarray(ids[in_run]), np.asarray(codes[in_run])
+        probability = np.load(self.path / entry['probability']['file'], mmap_mode='r')
+        risk_level = np.load(self.path / entry['risk_level']['file'], mmap_mode='r')
+        levels = np.asarray(risk_level[codes])
+        scored = (levels >= 0).any(axis=1)
+        probabilities = np.asarray(probability[codes[scored]])
+        levels = levels[scored]
+
+        columns = {'student_id': ids[scored]}
+        for i, target in enumerate(entry['targets']):
+            columns[f'{target}_probability'] = probabilities[:, i]
+            columns[f'{target}_risk_level'] = np.where(levels[:, i] >= 0, RISK_LEVELS[levels[:, i]], None)
+        return pd.DataFrame(columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show a student's stored risk trajectory")
+    parser.add_argument('student_id', type=int)
+    parser.add_argument('--history', type=str, default=DEFAULT_HISTORY_PATH, help='Prediction history directory')
+    args = parser.parse_args()
+
+    history = PredictionHistory(args.history)
+    frame = history.trajectory(args.student_id)
+    if frame.empty:
+        print(f"\n⚠️  No stored predictions for student {args.student_id} ({len(history)} runs)\n")
+        return 1
+
+    print(f"\n📈 RISK TRAJECTORY: student {args.student_id} ({len(frame)} of {len(history)} runs)\n")
+    print(frame.to_string(index=False))
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
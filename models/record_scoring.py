@@ -0,0 +1,153 @@
+"""
+Single-Record Scoring
+=====================
+Low-latency path for scoring one student: no pandas, no joblib thread
+dispatch.
+
+A current-data record (dict) is written straight into a preallocated
+feature vector laid out like prepare_features_from_current_data's output.
+Forests are evaluated from the compact format, whose split thresholds
+already have the StandardScaler folded in (an exact version of applying the
+affine scaler), walking all trees at once on a single thread. Models
+without a compact forest (e.g. HistGradientBoosting) fall back to
+predict_proba on the same vector.
+
+Usage:
+    scorer = load_record_scorer('dropped_out')
+    probability = scorer.probability(student_record)
+"""
+
+import math
+import warnings
+from functools import lru_cache
+
+import numpy as np
+
+from models.loader import HISTORICAL_REF, load_forest, load_model, resolve_version
+from models.registry import DEFAULT_ROOT
+
+# Model feature order (historical y1s1_* features)
+FEATURE_ORDER = (
+    'y1s1_attendance_rate',
+    'y1s1_gpa',
+    'y1s1_avg_grade',
+    'y1s1_lms_activities',
+    'y1s1_courses_enrolled',
+    'y1s1_exam_eligible',
+    'y1s1_attendance_below_67',
+    'y1s1_gpa_below_2',
+    'y1s1_grade_below_40',
+    'y1s1_low_engagement',
+)
+
+
+def _number(record, field):
+    value = record.get(field)
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def record_vector(record, out):
+    """
+    Fill `out` with the model features of one current-data record
+
+    Mirrors prepare_features_from_current_data: missing values stay NaN and
+    a NaN never trips a below-threshold flag.
+    """
+    attendance = _number(record, 'physical_attendance_rate')
+    gpa = _number(record, 'cumulative_gpa')
+    grade = _number(record, 'avg_grade')
+
+    out[0] = attendance
+    out[1] = gpa
+    out[2] = grade
+    out[3] = _number(record, 'lms_activity_count')
+    out[4] = _number(record, 'courses_enrolled')
+    out[5] = _number(record, 'exam_eligible')
+    out[6] = attendance < 0.67
+    out[7] = gpa < 2.0
+    out[8] = grade < 40
+    out[9] = _number(record, 'low_lms_engagement')
+    return out
+
+
+class RecordScorer:
+    """Scores one record at a time for a single target"""
+
+    def __init__(self, bundle, forest=None):
+        self.bundle = bundle
+        self.version = bundle.version
+        self.cutoffs = bundle.cutoffs
+        # Reused for every call: one scorer per thread
+        self._x = np.empty(len(FEATURE_ORDER), dtype=np.float64)
+        self._row = self._x.reshape(1, -1)
+
+        self.forest = forest
+        if forest is not None:
+            if forest.feature_names and tuple(forest.feature_names) != FEATURE_ORDER:
+                raise ValueError(f"Forest features {forest.feature_names} do not match {FEATURE_ORDER}")
+            # Contiguous copies of the node fields: faster gathers than the
+            # strided views of the structured (possibly memory-mapped) array
+            nodes = forest.nodes
+            self._feature = np.ascontiguousarray(nodes['feature'])
+            self._threshold = np.ascontiguousarray(nodes['threshold'])
+            self._left = np.ascontiguousarray(nodes['left'])
+            self._right = np.ascontiguousarray(nodes['right'])
+            self._value = np.ascontiguousarray(nodes['value'])
+            self._roots = np.asarray(forest.roots)
+            self._depth = forest.max_depth
+        elif bundle.model is not None and getattr(bundle.model, 'n_jobs', None) not in (None, 1):
+            bundle.model.n_jobs = 1
+
+    def _forest_probability(self, x):
+        idx = self._roots
+        feature, threshold = self._feature, self._threshold
+        left, right = self._left, self._right
+        for _ in range(self._depth):
+            idx = np.where(x[feature[idx]] <= threshold[idx], left[idx], right[idx])
+        return float(self._value[idx].mean())
+
+    def probability(self, record):
+        """Positive-class probability for one record"""
+        x = record_vector(record, self._x)
+
+        if self.forest is not None or not self.bundle.handles_missing:
+            np.copyto(x, 0.0, where=np.isnan(x))
+        if self.forest is not None:
+            return self._forest_probability(x)
+
+        with warnings.catch_warnings():
+            # Fitted on a DataFrame; the bare vector has the same column order
+            warnings.filterwarnings('ignore', message='X does not have valid feature names')
+            row = self._row if self.bundle.scaler is None else self.bundle.scaler.transform(self._row)
+            return float(self.bundle.model.predict_proba(row)[0, 1])
+
+    def risk_level(self, probability):
+        return str(self.bundle.risk_levels([probability])[0])
+
+    def predict(self, record):
+        """Probability, risk level, cutoffs and model version as plain values"""
+        probability = self.probability(record)
+        return {
+            'probability': probability,
+            'risk_level': self.risk_level(probability),
+            'cutoffs': [float(c) for c in self.cutoffs],
+            'version': self.version,
+        }
+
+
+@lru_cache(maxsize=16)
+def _load_record_scorer(registry_root, version, target):
+    bundle = load_model(target, registry_root=registry_root, version=version)
+    forest = load_forest(target, registry_root=registry_root, version=version)
+    return RecordScorer(bundle, forest)
+
+
+def load_record_scorer(target, ref=HISTORICAL_REF, registry_root=DEFAULT_ROOT):
+    """Record scorer for a target, built once per model version"""
+    version = resolve_version(ref, registry_root)
+    return _load_record_scorer(str(registry_root), version, target)
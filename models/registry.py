@@ -0,0 +1,254 @@
+"""
+Model Registry
+==============
+Content-addressed storage for trained models.
+
+Layout:
+    models/registry/
+        objects/<sha256>.<ext>           model, scaler and compact forest files
+        versions/<version>/manifest.json features, hashes, metrics, training data
+        refs/<name>                      pointer to a version (e.g. "latest")
+
+Every artifact is stored once under the hash of its bytes, so re-registering an
+unchanged scaler (or a whole unchanged model) costs nothing. Objects, manifests
+and refs are written to a temp file and renamed into place, so a scoring
+process never sees a half-written file and a ref always names a complete
+version.
+
+Usage:
+    registry = ModelRegistry()
+    entry = registry.store_target(model, scaler, feature_names=features)
+    version = registry.publish({'dropout_risk': entry}, features, 'data/...csv')
+    registry.promote(version)
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+
+from models.compact_forest import export_compact_forest, load_compact_forest
+
+DEFAULT_ROOT = 'models/registry'
+DEFAULT_REF = 'latest'
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write_text(path, text):
+    """Write text to path via temp file + rename"""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def new_version_id():
+    """Timestamp version id; microseconds keep back-to-back trainings apart"""
+    return datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+
+
+class ModelRegistry:
+    """Content-addressed model store with versioned manifests and refs"""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.versions_dir = self.root / 'versions'
+        self.refs_dir = self.root / 'refs'
+
+    def _ensure_dirs(self):
+        """Create the store directories (writes only; lookups never create them)"""
+        for directory in (self.objects_dir, self.versions_dir, self.refs_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+
+    # ------------------------------------------------------------------
+    # Objects
+    # ------------------------------------------------------------------
+    def object_path(self, name):
+        """Path of a stored object (name is '<sha256>.<ext>')"""
+        return self.objects_dir / name
+
+    def put_file(self, src):
+        """
+        Move a finished file into the object store
+
+        Returns the object name. If an identical object already exists the
+        source file is simply dropped.
+        """
+        self._ensure_dirs()
+        src = Path(src)
+        name = f"{file_sha256(src)}{src.suffix}"
+        dest = self.object_path(name)
+
+        if dest.exists():
+            src.unlink()
+        else:
+            os.chmod(src, 0o644)
+            os.replace(src, dest)
+        return name
+
+    def put_joblib(self, obj, suffix='.pkl'):
+        """Pickle an object into the store and return its object name"""
+        self._ensure_dirs()
+        fd, tmp = tempfile.mkstemp(dir=self.objects_dir, prefix='.tmp-', suffix=suffix)
+        os.close(fd)
+        try:
+            joblib.dump(obj, tmp)
+            return self.put_file(tmp)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def store_target(self, model, scaler, feature_names=None):
+        """
+        Store one trained model and its scaler
+
+        Forests are also stored in the compact format so scorers can
+        memory-map them. Returns the manifest entry for the target.
+        """
+        entry = {
+            'model': self.put_joblib(model),
+            'scaler': self.put_joblib(scaler) if scaler is not None else None,
+            'model_type': type(model).__name__,
+        }
+
+        if hasattr(model, 'estimators_') and hasattr(model, 'classes_'):
+            self._ensure_dirs()
+            with tempfile.TemporaryDirectory(dir=self.objects_dir, prefix='.tmp-') as tmp_dir:
+                forest_path = export_compact_forest(
+                    model, scaler, Path(tmp_dir) / 'forest.npy', feature_names=feature_names
+                )
+                entry['forest'] = self.put_file(forest_path)
+                entry['forest_meta'] = self.put_file(forest_path.with_suffix('.json'))
+
+        return entry
+
+    # ------------------------------------------------------------------
+    # Versions
+    # ------------------------------------------------------------------
+    def _claim_version_dir(self, version):
+        """
+        Create the directory of a new version and return its id
+
+        mkdir is the claim: if another training already took the id (two
+        publishes in the same microsecond), a numeric suffix is added.
+        """
+        self._ensure_dirs()
+        candidate, n = version, 1
+        while True:
+            try:
+                (self.versions_dir / candidate).mkdir()
+                return candidate
+            except FileExistsError:
+                candidate = f"{version}_{n}"
+                n += 1
+
+    def publish(self, targets, features, training_data=None, feature_set=None,
+                version=None, report=None, parent=None):
+        """
+        Write a manifest for a set of stored targets and return the version id
+
+        The version is not visible through any ref until promote() is called.
+        If `version` is already taken a suffix is added, so always use the
+        returned id.
+        """
+        version = self._claim_version_dir(version or new_version_id())
+        version_dir = self.versions_dir / version
+
+        manifest = {
+            'version': version,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'feature_set': feature_set,
+            'parent': parent,
+            'features': list(features),
+            'training_data': None,
+            'targets': targets,
+        }
+
+        if training_data is not None:
+            manifest['training_data'] = {
+                'path': str(training_data),
+                'sha256': file_sha256(training_data),
+            }
+
+        if report is not None:
+            _atomic_write_text(version_dir / 'training_report.txt', report)
+
+        _atomic_write_text(version_dir / 'manifest.json', json.dumps(manifest, indent=2))
+        return version
+
+    def versions(self):
+        """All published version ids, oldest first"""
+        if not self.versions_dir.exists():
+            return []
+        return sorted(
+            p.name for p in self.versions_dir.iterdir()
+            if (p / 'manifest.json').exists()
+        )
+
+    def manifest(self, version):
+        """Load the manifest of a version"""
+        with open(self.versions_dir / version / 'manifest.json') as f:
+            return json.load(f)
+
+    # ------------------------------------------------------------------
+    # Refs
+    # ------------------------------------------------------------------
+    def promote(self, version, ref=DEFAULT_REF):
+        """Atomically point ref at version"""
+        if not (self.versions_dir / version / 'manifest.json').exists():
+            raise ValueError(f"Unknown model version: {version}")
+        self._ensure_dirs()
+        _atomic_write_text(self.refs_dir / ref, version + '\n')
+
+    def resolve(self, ref=DEFAULT_REF):
+        """Version id a ref points to, or None if the ref does not exist"""
+        ref_path = self.refs_dir / ref
+        if not ref_path.exists():
+            return None
+        return ref_path.read_text().strip()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def load_target(self, target, version, mmap_mode=None):
+        """Load (model, scaler) for one target of a version"""
+        entry = self.manifest(version)['targets'][target]
+        model = joblib.load(self.object_path(entry['model']), mmap_mode=mmap_mode)
+        scaler = None
+        if entry.get('scaler'):
+            scaler = joblib.load(self.object_path(entry['scaler']), mmap_mode=mmap_mode)
+        return model, scaler
+
+    def load_forest(self, target, version, mmap_mode='r'):
+        """Load the compact forest of one target, or None if it has none"""
+        entry = self.manifest(version)['targets'][target]
+        if not entry.get('forest'):
+            return None
+        return load_compact_forest(
+            self.object_path(entry['forest']),
+            mmap_mode=mmap_mode,
+            meta_path=self.object_path(entry['forest_meta']),
+        )
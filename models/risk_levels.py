@@ -0,0 +1,34 @@
+"""
+Risk Levels
+===========
+Buckets probabilities into risk levels with one vectorized np.searchsorted.
+
+Cutoffs come from the operating points stored with each model
+(models/evaluation/thresholds.py); models trained before those existed use
+the original fixed 0.3 / 0.5 / 0.7 cutoffs.
+"""
+
+import numpy as np
+
+RISK_LEVELS = np.array(["🟢 LOW", "🟡 MEDIUM", "🟠 HIGH", "🔴 CRITICAL"])
+
+# Lower bounds of MEDIUM, HIGH and CRITICAL
+DEFAULT_CUTOFFS = (0.3, 0.5, 0.7)
+
+
+def risk_level_index(probabilities, cutoffs=DEFAULT_CUTOFFS):
+    """0 (LOW) .. 3 (CRITICAL) for every probability; p >= cutoff moves up a level"""
+    return np.searchsorted(np.asarray(cutoffs), np.asarray(probabilities), side='right')
+
+
+def risk_levels(probabilities, cutoffs=DEFAULT_CUTOFFS):
+    """Risk level label for every probability"""
+    return RISK_LEVELS[risk_level_index(probabilities, cutoffs)]
+
+
+def cutoffs_from_metadata(metadata):
+    """Cutoffs stored in a registry target entry, or the defaults"""
+    points = (metadata or {}).get('operating_points')
+    if points and len(points.get('cutoffs', ())) == len(DEFAULT_CUTOFFS):
+        return tuple(points['cutoffs'])
+    return DEFAULT_CUTOFFS
@@ -0,0 +1,75 @@
+"""
+Incremental Forest Training
+===========================
+Grows an existing RandomForestClassifier with trees fitted on a new semester
+slice (scikit-learn warm_start) instead of refitting on the full history.
+
+The oldest trees are evicted once the forest exceeds max_trees, so the model
+gradually forgets old cohorts and its size stays bounded.
+
+Eviction keeps len(estimators_) the same from round to round, and sklearn
+seeds the new trees of a warm start from random_state and that length, so
+with a fixed random_state every round would reuse the previous round's
+seeds. Each round therefore passes its own seed (round_seed).
+"""
+
+import copy
+
+import numpy as np
+from sklearn.utils.class_weight import compute_class_weight
+
+
+def round_seed(random_state, round_index):
+    """Seed of the new trees of incremental round `round_index` (None stays None)"""
+    if random_state is None:
+        return None
+    return int(random_state) + round_index
+
+
+def warm_start_update(model, X_new, y_new, n_new_trees=25, max_trees=None, random_state=None):
+    """
+    Return a copy of model with n_new_trees extra trees fitted on X_new
+
+    X_new must already be in the model's input space (i.e. scaled with the
+    scaler the existing trees were trained with) and y_new must hold every
+    class of the model, else ValueError. Trees are kept oldest first, so
+    eviction drops from the front. random_state seeds the new trees (default:
+    the model's own); the returned model keeps the original random_state.
+    """
+    if n_new_trees < 1:
+        raise ValueError("n_new_trees must be at least 1")
+
+    # New trees must vote over the same classes as the existing ones; sklearn
+    # would refit classes_ from the slice and mix incompatible trees
+    present = np.unique(np.asarray(y_new))
+    missing = [c for c in model.classes_ if c not in present]
+    if missing or len(present) != len(model.classes_):
+        raise ValueError(
+            f"New slice must contain every class the model was trained on "
+            f"({', '.join(map(str, model.classes_))}); it has {', '.join(map(str, present)) or 'no rows'}"
+        )
+
+    model = copy.deepcopy(model)
+    class_weight = model.class_weight
+    base_random_state = model.random_state
+
+    # 'balanced' would be recomputed from the slice anyway; passing the
+    # weights explicitly keeps that behaviour without sklearn's warm_start warning
+    if class_weight == 'balanced':
+        classes = np.unique(y_new)
+        weights = compute_class_weight('balanced', classes=classes, y=y_new)
+        model.set_params(class_weight=dict(zip(classes, weights)))
+
+    model.set_params(
+        warm_start=True,
+        n_estimators=len(model.estimators_) + n_new_trees,
+        random_state=base_random_state if random_state is None else random_state,
+    )
+    model.fit(X_new, y_new)
+    model.set_params(warm_start=False, class_weight=class_weight, random_state=base_random_state)
+
+    if max_trees is not None and len(model.estimators_) > max_trees:
+        model.estimators_ = model.estimators_[-max_trees:]
+        model.set_params(n_estimators=len(model.estimators_))
+
+    return model
@@ -1,127 +1,160 @@
-
-import pandas as pd
-import joblib
-import numpy as np
 import argparse
 from pathlib import Path
 
-print("\n" + "🔮" * 35)
-print("STUDENT RISK PREDICTION SYSTEM")
-print("🔮" * 35 + "\n")
+from models import daemon
+from models.features import (FEATURES_FILE, ROLLUP_COLUMNS, TARGETS, get_model, is_whole_population,
+                             prepare_features_from_current_data)
 
-# Load models
-print("📂 Loading trained models...")
+# pandas, scikit-learn and the model modules are imported inside the functions
+# that need them, so `--student-id` answered by the daemon starts instantly
 
-try:
-    dropout_model = joblib.load('models/saved_models/dropped_out_model.pkl')
-    dropout_scaler = joblib.load('models/saved_models/dropped_out_scaler.pkl')
-    print("   ✅ Dropout model loaded")
-except:
-    print("   ❌ Dropout model not found")
-    exit(1)
+# Risk level changes of a --delta run, next to the prediction cache
+CHANGES_FILE = 'data/predictions/predictions_changes.csv'
 
-try:
-    failure_model = joblib.load('models/saved_models/failed_courses_model.pkl')
-    failure_scaler = joblib.load('models/saved_models/failed_courses_scaler.pkl')
-    print("   ✅ Failure model loaded")
-except:
-    failure_model = None
 
-try:
-    delay_model = joblib.load('models/saved_models/delayed_graduation_model.pkl')
-    delay_scaler = joblib.load('models/saved_models/delayed_graduation_scaler.pkl')
-    print("   ✅ Delay model loaded")
-except:
-    delay_model = None
+def get_risk_level(probability, cutoffs=None):
+    from models.risk_levels import DEFAULT_CUTOFFS, risk_levels
 
-print()
+    return risk_levels([probability], cutoffs or DEFAULT_CUTOFFS)[0]
 
 
-def prepare_features_from_current_data(df):
-    """
-    Map current data features to historical training features
-    """
-    features = pd.DataFrame()
-    
-    # Map to historical feature names
-    features['y1s1_attendance_rate'] = df['physical_attendance_rate']
-    features['y1s1_gpa'] = df['cumulative_gpa']
-    features['y1s1_avg_grade'] = df['avg_grade']
-    features['y1s1_lms_activities'] = df['lms_activity_count']
-    features['y1s1_courses_enrolled'] = df['courses_enrolled']
-    features['y1s1_exam_eligible'] = df['exam_eligible']
-    features['y1s1_attendance_below_67'] = (df['physical_attendance_rate'] < 0.67).astype(int)
-    features['y1s1_gpa_below_2'] = (df['cumulative_gpa'] < 2.0).astype(int)
-    features['y1s1_grade_below_40'] = (df['avg_grade'] < 40).astype(int)
-    features['y1s1_low_engagement'] = df['low_lms_engagement']
-    
-    return features.fillna(0)
-
-
-def get_risk_level(probability):
-    if probability >= 0.7:
-        return "🔴 CRITICAL"
-    elif probability >= 0.5:
-        return "🟠 HIGH"
-    elif probability >= 0.3:
-        return "🟡 MEDIUM"
-    else:
-        return "🟢 LOW"
+def explanation_forest():
+    """Dropout compact forest used for reason codes, or None if not exported"""
+    from models.loader import load_forest
 
+    forest = load_forest(TARGETS['dropout'])
+    if forest is None:
+        print("   ⚠️  No compact forest for this model version - skipping reason codes")
+    return forest
 
-def predict_from_csv(filepath, limit=20):
-    """Predict risk for students"""
+
+def predict_from_csv(filepath, limit=20, explain=False, chunk_size=None,
+                     output_file='predictions_output.csv', workers=1, group_by=None,
+                     delta=False, changes_file=CHANGES_FILE, rollups=False, db_path=None,
+                     complete=None):
+    """
+    Predict dropout, failure and delay risk for every student in a CSV
+
+    With rollups, the school/program/class risk rollups in the analytics
+    database (db_path) are refreshed from the scored students; only changed
+    students are written. Students missing from the file are removed from
+    the rollups and the delta cache only when it holds the whole population
+    (complete; default: the file is FEATURES_FILE).
+    """
+    from models.batch_scoring import DEFAULT_CHUNK_SIZE, BatchScorer, ShardedScorer
+    from models.prediction_cache import PredictionCache
+    from models.top_k import StreamingTopK
     
-    print(f"📂 Loading students from: {filepath}")
-    df = pd.read_csv(filepath)
-    print(f"   ✅ Loaded {len(df):,} students\n")
+    chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+    if complete is None:
+        complete = is_whole_population(filepath)
     
-    # Prepare features (map to historical format)
-    features = prepare_features_from_current_data(df)
+    # Every target is scored with its own model and scaler in the same pass
+    bundles = {name: get_model(name) for name in TARGETS}
+    forest = explanation_forest() if explain else None
     
-    # Scale features
-    features_scaled = dropout_scaler.transform(features)
+    cache = None
+    if delta:
+        # Cached probabilities are only valid for the exact model versions
+        cache = PredictionCache(versions={name: b.version for name, b in bundles.items()})
+        print(f"   ♻️  Prediction cache: {len(cache):,} students ({cache.status})")
+        if workers > 1:
+            print("   ⚠️  Delta scoring runs in one process - ignoring --workers")
+            workers = 1
     
-    # Predict dropout risk
-    dropout_probs = dropout_model.predict_proba(features_scaled)[:, 1]
-    df['dropout_probability'] = dropout_probs
-    df['dropout_risk_level'] = df['dropout_probability'].apply(get_risk_level)
+    if workers > 1:
+        # Chunks are sharded over a process pool; output stays in input order
+        scorer = ShardedScorer(bundles, prepare_features_from_current_data, workers=workers,
+                               explain='dropout' if forest is not None else None,
+                               chunk_size=chunk_size)
+    else:
+        scorer = BatchScorer(bundles, prepare_features_from_current_data,
+                             forest=forest, chunk_size=chunk_size, cache=cache)
+    
+    # Only the `limit` riskiest HIGH/CRITICAL students (per group) are kept in memory
+    high_cutoff = bundles['dropout'].cutoffs[1]
+    top = StreamingTopK(limit, 'dropout_probability')
+    top_by_group = StreamingTopK(limit, 'dropout_probability', by=group_by) if group_by else None
+    
+    # Group and prediction columns of every chunk are staged in the database
+    # (not kept in memory) for the rollup refresh after the run
+    staging = None
+    if rollups:
+        from backend.database.connection import DEFAULT_DATABASE
+        from backend.database.rollups import RollupStaging
+        
+        db_path = db_path or DEFAULT_DATABASE
+        staging = RollupStaging(db_path)
     
-    # Sort by risk
-    df_sorted = df.sort_values('dropout_probability', ascending=False)
+    def collect_high_risk(result):
+        high_risk = result[result['dropout_probability'].values >= high_cutoff]
+        top.update(high_risk)
+        if top_by_group is not None:
+            top_by_group.update(high_risk)
+        if staging is not None:
+            staging.add(result[[c for c in result.columns if c in ROLLUP_COLUMNS
+                                or c.endswith(('_probability', '_risk_level'))]])
     
-    # Show high-risk students
-    high_risk = df_sorted[df_sorted['dropout_probability'] >= 0.5]
+    print(f"📂 Scoring students from: {filepath} ({chunk_size:,} rows per chunk, "
+          f"{workers} worker{'s' if workers > 1 else ''})")
+    try:
+        summary = scorer.score_csv(filepath, output_file, on_chunk=collect_high_risk,
+                                   changes_path=changes_file if delta else None, complete=complete)
+    except BaseException:
+        if staging is not None:
+            staging.close()
+        raise
+    print(f"   ✅ Scored {summary['rows']:,} students")
+    if delta:
+        print(f"   ♻️  Rescored {summary['rescored']:,}, reused {summary['rows'] - summary['rescored']:,}")
+        print(f"   🔀 {summary['level_changes']:,} risk level change(s) -> {changes_file}")
+    if staging is not None and not staging.students:
+        staging.close()
+    elif staging is not None:
+        refreshed = staging.finish(complete=complete)
+        print(f"   📦 Risk rollups: {refreshed['changed']:,} changed student(s) applied -> {db_path}")
+    print()
     
     print("=" * 70)
-    print(f"🚨 HIGH RISK STUDENTS ({len(high_risk)} found)")
+    print("📊 RISK LEVELS")
     print("=" * 70 + "\n")
+    for name, counts in summary['levels'].items():
+        line = '  '.join(f"{level} {count:,}" for level, count in counts.items())
+        print(f"   {name.title():8s} {line}")
+    print()
     
-    if len(high_risk) > 0:
-        display_df = high_risk[[
-            'student_id', 'name', 'class_level',
-            'physical_attendance_rate', 'cumulative_gpa',
-            'dropout_probability', 'dropout_risk_level'
-        ]].head(limit)
-        
-        print(display_df.to_string(index=False))
+    print("=" * 70)
+    print(f"🚨 HIGH RISK STUDENTS ({top.seen} found)")
+    print("=" * 70 + "\n")
+    
+    display_columns = [
+        'student_id', 'name', 'class_level',
+        'physical_attendance_rate', 'cumulative_gpa',
+        'dropout_probability', 'dropout_risk_level'
+    ] + (['reason_1'] if forest is not None else [])
+    
+    if top.seen > 0:
+        print(top.result()[display_columns].to_string(index=False))
         
-        # Save predictions
-        print(f"\n💾 Saving predictions to: predictions_output.csv")
-        df_sorted[[
-            'student_id', 'name', 'class_level', 'school_id',
-            'physical_attendance_rate', 'cumulative_gpa', 'avg_grade',
-            'dropout_probability', 'dropout_risk_level'
-        ]].to_csv('predictions_output.csv', index=False)
-        print("   ✅ Saved!\n")
+        if top_by_group is not None:
+            for group, rows in top_by_group.result().groupby(group_by, sort=True):
+                print(f"\n🏫 {group_by} = {group} (top {len(rows)})")
+                print(rows[display_columns].to_string(index=False))
     else:
-        print("   ✅ No high-risk students found!\n")
+        print("   ✅ No high-risk students found!")
+    
+    print(f"\n💾 Predictions saved to: {output_file}\n")
     
-    return df_sorted
+    return summary
 
 
-def predict_single_student(student_data):
-    """Predict for single student"""
+def predict_single_student(student_data, prediction=None):
+    """
+    Predict for single student
+
+    `prediction` is a daemon reply (probability, risk_level, cutoffs); without
+    it the dropout model is scored in this process.
+    """
     
     print("=" * 70)
     print("STUDENT RISK ASSESSMENT")
@@ -138,21 +171,22 @@ def predict_single_student(student_data):
     print(f"   Grade: {student_data.get('avg_grade', 0):.1f}%")
     print(f"   LMS Activities: {student_data.get('lms_activity_count', 0):.0f}")
     
-    # Prepare features
-    temp_df = pd.DataFrame([student_data])
-    features = prepare_features_from_current_data(temp_df)
-    features_scaled = dropout_scaler.transform(features)
-    
-    # Predict
-    dropout_prob = dropout_model.predict_proba(features_scaled)[0][1]
+    # Predict (dict -> feature vector -> forest, no DataFrame round trip)
+    if prediction is None:
+        from models.record_scoring import load_record_scorer
+
+        get_model('dropout')
+        prediction = load_record_scorer(TARGETS['dropout']).predict(student_data)
+    dropout_prob = prediction['probability']
+    _, high_cutoff, critical_cutoff = prediction['cutoffs']
     
     print(f"\n" + "=" * 70)
     print("🎯 DROPOUT RISK PREDICTION")
     print("=" * 70)
     print(f"\n   Probability: {dropout_prob:.1%}")
-    print(f"   Risk Level: {get_risk_level(dropout_prob)}")
+    print(f"   Risk Level: {prediction['risk_level']}")
     
-    if dropout_prob >= 0.5:
+    if dropout_prob >= high_cutoff:
         print(f"\n   ⚠️  ACTION REQUIRED: High dropout risk!")
     
     # Recommendations
@@ -166,32 +200,85 @@ def predict_single_student(student_data):
         print("   📚 GPA below 2.0 - Academic counseling needed")
     if student_data.get('avg_grade', 100) < 40:
         print("   ⚠️  Grade below 40% - Tutoring support")
-    if dropout_prob >= 0.7:
+    if dropout_prob >= critical_cutoff:
         print("   🔴 CRITICAL RISK - Dean intervention")
     
     print("\n" + "=" * 70 + "\n")
 
 
-# Main
-if __name__ == "__main__":
+def main():
+    print("\n" + "🔮" * 35)
+    print("STUDENT RISK PREDICTION SYSTEM")
+    print("🔮" * 35 + "\n")
+    
     parser = argparse.ArgumentParser()
     parser.add_argument('--file', type=str, help='CSV file')
     parser.add_argument('--student-id', type=str, help='Student ID')
     parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--explain', action='store_true',
+                        help='Add top-3 reason codes per student (batch mode)')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help='Rows scored per chunk (batch mode, default 50,000)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Score chunks on this many processes (batch mode)')
+    parser.add_argument('--group-by', choices=['school_id', 'class_level'],
+                        help='Also list the top --limit high-risk students per group')
+    parser.add_argument('--delta', action='store_true',
+                        help='Only rescore students whose features changed since the last run')
+    parser.add_argument('--rollups', action='store_true',
+                        help='Refresh the school/program risk rollups in the analytics database')
+    parser.add_argument('--db', type=str, default=None,
+                        help='Analytics database for --rollups (default: STRATHMORE_DB or strathmore_analytics.db)')
+    parser.add_argument('--complete', action='store_true',
+                        help='--file holds every current student: drop missing students from the rollups and the delta cache')
+    
+    parser.add_argument('--no-daemon', action='store_true',
+                        help='Score in this process even if the prediction daemon is running')
     
     args = parser.parse_args()
     
+    # A running daemon already has the models and feature table warm
+    if args.student_id and not args.no_daemon:
+        reply = daemon.request({'op': 'student', 'student_id': args.student_id})
+        if reply is not None:
+            print(f"⚡ Answered by prediction daemon (version {reply.get('prediction', {}).get('version', '?')})\n")
+            if reply.get('ok'):
+                predict_single_student(reply['student'], reply['prediction'])
+            elif reply.get('error') == 'not_found':
+                print(f"❌ Student {args.student_id} not found")
+            else:
+                print(f"❌ Daemon error: {reply.get('error')}")
+            return
+    
+    # Single-student mode only needs dropout; batch mode loads the others on first use
+    print("📂 Loading trained models...")
+    try:
+        get_model('dropout')
+    except FileNotFoundError:
+        print("   ❌ Dropout model not found")
+        exit(1)
+    print()
+    
     if args.file:
-        predict_from_csv(args.file, limit=args.limit)
+        predict_from_csv(args.file, limit=args.limit, explain=args.explain,
+                         chunk_size=args.chunk_size, workers=args.workers,
+                         group_by=args.group_by, delta=args.delta, rollups=args.rollups, db_path=args.db,
+                         complete=args.complete or None)
     elif args.student_id:
-        df = pd.read_csv('data/processed/features_engineered.csv')
-        student = df[df['student_id'].astype(str) == args.student_id]
-        if len(student) > 0:
-            predict_single_student(student.iloc[0].to_dict())
+        student = daemon.feature_lookup(features_file=FEATURES_FILE).get(args.student_id)
+        if student is not None:
+            predict_single_student(student)
         else:
             print(f"❌ Student {args.student_id} not found")
     else:
-        if Path('data/processed/features_engineered.csv').exists():
-            predict_from_csv('data/processed/features_engineered.csv', limit=args.limit)
+        if Path(FEATURES_FILE).exists():
+            predict_from_csv(FEATURES_FILE, limit=args.limit,
+                             explain=args.explain, chunk_size=args.chunk_size,
+                             workers=args.workers, group_by=args.group_by,
+                             delta=args.delta, rollups=args.rollups, db_path=args.db)
         else:
             print("❌ No data file found")
+
+
+if __name__ == "__main__":
+    main()
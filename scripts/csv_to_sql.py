@@ -1,39 +1,499 @@
-import os
+"""
+CSV -> SQL Bulk Loader
+======================
+Loads every CSV in data/raw into the analytics database.
+
+Tables declared in backend/database/schema.sql are loaded into that schema:
+their indexes are dropped, the rows replaced and the indexes rebuilt once
+the rows are in (much cheaper than maintaining them row by row), and
+foreign keys are checked once before committing. Any other CSV gets a
+table typed from its first chunk (INTEGER/REAL/TEXT) with keys and lookup
+indexes from TABLE_KEYS / TABLE_INDEXES.
+
+Each file is streamed in chunks with executemany on one raw DB-API
+connection. The whole load is a single transaction: readers keep seeing
+the previous tables until it commits, and a failure leaves the database
+untouched.
+
+SQLite has one writer, so parallelism goes where it helps: CSV parsing runs
+on a thread pool (one file per worker) and feeds the writer through a
+bounded queue.
+
+--sync is the incremental mode: tables are never dropped or emptied. Each
+row's content hash is compared with the one recorded at the previous sync
+(sync_row_hashes, keyed by table and source id) and only new or changed
+rows are written, with INSERT ... ON CONFLICT DO UPDATE, in one short
+transaction per chunk. Readers stay online throughout.
+
+Usage:
+    python scripts/csv_to_sql.py
+    python scripts/csv_to_sql.py --workers 4 --chunk-size 200000
+    python scripts/csv_to_sql.py --tables students attendance_records
+    python scripts/csv_to_sql.py --sync              # incremental upsert
+    python scripts/csv_to_sql.py --sync --prune      # ... and delete removed rows
+"""
+
+import argparse
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 import pandas as pd
-from sqlalchemy import create_engine, text
+
+# Run as a script: make the project root importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.database.connection import PRAGMAS, get_engine
+from backend.database.models import SYNC_HASH_TABLE, Base, apply_schema
 
 # Configuration
 DB_NAME = "strathmore_analytics.db"
 DATA_DIR = "data/raw"
+CHUNK_SIZE = 100000
+
+# Row hashes recorded by --sync (apply_schema clears them for tables it recreates)
+HASH_TABLE = SYNC_HASH_TABLE
+
+# Tables with a declared schema (schema.sql / models.py)
+SCHEMA_TABLES = set(Base.metadata.tables)
+
+# Source id of every table: the upsert conflict target in --sync mode, and
+# the unique index built for tables without a declared schema
+SOURCE_KEYS = {
+    'schools': 'school_id',
+    'programs': 'program_id',
+    'courses': 'course_id',
+    'students': 'student_id',
+    'sis_enrollments': 'enrollment_id',
+    'attendance_records': 'attendance_id',
+    'lms_activities': 'activity_id',
+    'users': 'user_id',
+    'school_admins': 'admin_id',
+}
+
+# Lookup indexes for tables without a declared schema, built after the load
+TABLE_INDEXES = {
+    'users': [('email',)],
+    'school_admins': [('school_id',)],
+}
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def sql_type(dtype):
+    kind = getattr(dtype, 'kind', 'O')
+    if kind in 'biu':
+        return 'INTEGER'
+    if kind == 'f':
+        return 'REAL'
+    return 'TEXT'
+
+
+def _put(out, item, stop):
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _rows(chunk):
+    """Row tuples of plain Python values (NaN binds as NULL)"""
+    # Column-wise tolist + zip is several times faster than itertuples
+    return list(zip(*[chunk[column].tolist() for column in chunk.columns]))
+
+
+def _row_hashes(chunk):
+    """64-bit content hash per row, as signed integers for SQLite"""
+    return pd.util.hash_pandas_object(chunk, index=False).to_numpy().view('int64').tolist()
+
+
+def _read(path, table, chunk_size, out, stop, key=None):
+    """
+    Parse one CSV into the queue: (table, (schema, rows))... then (table, None)
+
+    With a key column, payloads also carry each row's key (as text) and hash.
+    """
+    try:
+        for chunk in pd.read_csv(path, chunksize=chunk_size):
+            schema = [(column, sql_type(chunk[column].dtype)) for column in chunk.columns]
+            payload = (schema, _rows(chunk))
+            if key is not None:
+                payload += (chunk[key].astype(str).tolist(), _row_hashes(chunk))
+            if not _put(out, (table, payload), stop):
+                return
+        _put(out, (table, None), stop)
+    except Exception as error:
+        _put(out, (table, error), stop)
+
+
+def _create_table(cursor, table, schema):
+    columns = ', '.join(f'{_quote(name)} {column_type}' for name, column_type in schema)
+    cursor.execute(f'DROP TABLE IF EXISTS {_quote(table)}')
+    cursor.execute(f'CREATE TABLE {_quote(table)} ({columns})')
+
+
+def _clear_schema_table(cursor, table, columns):
+    """Empty a declared table and drop its indexes; returns their DDL for rebuilding"""
+    declared = {row[1] for row in cursor.execute(f'PRAGMA table_info({_quote(table)})')}
+    unknown = [c for c in columns if c not in declared]
+    if unknown:
+        raise ValueError(f"{table}: CSV columns not in schema.sql: {', '.join(unknown)}")
+
+    indexes = cursor.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,),
+    ).fetchall()
+    for name, _ in indexes:
+        cursor.execute(f'DROP INDEX {_quote(name)}')
+    cursor.execute(f'DELETE FROM {_quote(table)}')
+    return [sql for _, sql in indexes]
+
+
+def _insert(cursor, table, schema, rows):
+    columns = ', '.join(_quote(name) for name, _ in schema)
+    placeholders = ', '.join('?' for _ in schema)
+    cursor.executemany(f'INSERT INTO {_quote(table)} ({columns}) VALUES ({placeholders})', rows)
+
+
+def _check_foreign_keys(cursor, tables):
+    violations = {}
+    for table in tables:
+        for row in cursor.execute(f'PRAGMA foreign_key_check({_quote(table)})'):
+            violations[(table, row[2])] = violations.get((table, row[2]), 0) + 1
+    if violations:
+        details = ', '.join(f'{table} -> {parent}: {count:,} rows'
+                            for (table, parent), count in sorted(violations.items()))
+        raise RuntimeError(f"Foreign key violations: {details}")
+
+
+def _build_indexes(cursor, table, columns):
+    key = SOURCE_KEYS.get(table)
+    if key in columns:
+        cursor.execute(f'CREATE UNIQUE INDEX {_quote(f"ux_{table}_{key}")} '
+                       f'ON {_quote(table)} ({_quote(key)})')
+    for index_columns in TABLE_INDEXES.get(table, []):
+        if all(c in columns for c in index_columns):
+            name = f"ix_{table}_{'_'.join(index_columns)}"
+            cursor.execute(f'CREATE INDEX {_quote(name)} ON {_quote(table)} '
+                           f'({", ".join(_quote(c) for c in index_columns)})')
+
+
+def _create_hash_table(cursor):
+    cursor.execute(f'CREATE TABLE IF NOT EXISTS {HASH_TABLE} ('
+                   'table_name TEXT NOT NULL, source_key TEXT NOT NULL, row_hash INTEGER NOT NULL, '
+                   'PRIMARY KEY (table_name, source_key)) WITHOUT ROWID')
+
+
+def load_tables(files, db_name=DB_NAME, chunk_size=CHUNK_SIZE, workers=4):
+    """
+    Load {table: csv_path} in one transaction
+
+    Returns {table: {'rows', 'seconds', 'rows_per_sec'}}.
+    """
+    engine = get_engine(db_name)
+    chunks = queue.Queue(maxsize=2 * workers)
+    stop = threading.Event()
+    stats = {}
+    pending = set(files)
+
+    conn = engine.raw_connection()
+    cursor = conn.cursor()
+    # Checked once for the whole load instead of per row (and per parent delete)
+    cursor.execute('PRAGMA foreign_keys=OFF')
+    # Helper threads for the sorts behind CREATE INDEX
+    cursor.execute(f'PRAGMA threads={workers}')
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='csv') as pool:
+            for table, path in files.items():
+                pool.submit(_read, path, table, chunk_size, chunks, stop)
+            try:
+                cursor.execute('BEGIN')
+                for table in apply_schema(cursor):
+                    print(f"   ♻️  Updated {table} to match schema.sql")
+                _create_hash_table(cursor)
+                while pending:
+                    table, payload = chunks.get()
+                    if isinstance(payload, Exception):
+                        raise RuntimeError(f"Failed to read {files[table]}: {payload}") from payload
+
+                    if table not in stats:
+                        stats[table] = {'rows': 0, 'started': time.perf_counter()}
+                        if payload is not None:
+                            schema = payload[0]
+                            columns = [name for name, _ in schema]
+                            if table in SCHEMA_TABLES:
+                                stats[table]['indexes'] = _clear_schema_table(cursor, table, columns)
+                            else:
+                                _create_table(cursor, table, schema)
+                                stats[table]['columns'] = columns
+                            # Rows are replaced: the next --sync compares every row again
+                            cursor.execute(f'DELETE FROM {HASH_TABLE} WHERE table_name = ?', (table,))
+
+                    if payload is not None:
+                        schema, rows = payload
+                        _insert(cursor, table, schema, rows)
+                        stats[table]['rows'] += len(rows)
+                        continue
+
+                    # Last chunk of this table: index it, then report
+                    entry = stats[table]
+                    for sql in entry.pop('indexes', []):
+                        cursor.execute(sql)
+                    _build_indexes(cursor, table, entry.pop('columns', []))
+                    entry['seconds'] = time.perf_counter() - entry.pop('started')
+                    entry['rows_per_sec'] = entry['rows'] / entry['seconds'] if entry['seconds'] else 0.0
+                    pending.discard(table)
+                    print(f"   ✅ {table:20s} {entry['rows']:>10,} rows  "
+                          f"{entry['seconds']:6.2f}s  {entry['rows_per_sec']:>12,.0f} rows/s")
+                _check_foreign_keys(cursor, [t for t in stats if t in SCHEMA_TABLES])
+            except BaseException:
+                # Readers blocked on the full queue give up, so the pool can shut down
+                stop.set()
+                raise
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute(f"PRAGMA foreign_keys={PRAGMAS['foreign_keys']}")
+        cursor.close()
+        conn.close()
+    return stats
+
+
+def _sync_order(tables):
+    """Parents before children, so new rows never break a foreign key"""
+    ordered = [t.name for t in Base.metadata.sorted_tables if t.name in tables]
+    return ordered + sorted(t for t in tables if t not in ordered)
+
+
+def _prepare_sync_table(cursor, table, schema):
+    """Make sure `table` exists with a unique index on its source key"""
+    key = SOURCE_KEYS[table]
+    columns = [name for name, _ in schema]
+    if key not in columns:
+        raise ValueError(f"{table}: CSV has no {key} column")
+    if table in SCHEMA_TABLES:
+        return
+    if not cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone():
+        _create_table(cursor, table, schema)
+        _build_indexes(cursor, table, columns)
+    else:
+        cursor.execute(f'CREATE UNIQUE INDEX IF NOT EXISTS {_quote(f"ux_{table}_{key}")} '
+                       f'ON {_quote(table)} ({_quote(key)})')
+
+
+def _seen_table(table):
+    return _quote(f'seen_{table}')
+
+
+def _sync_chunk(cursor, table, schema, rows, keys, hashes, prune):
+    """Upsert the rows whose hash differs from the recorded one; returns how many"""
+    cursor.execute('DELETE FROM temp.sync_chunk')
+    cursor.executemany('INSERT INTO temp.sync_chunk VALUES (?, ?, ?)', zip(range(len(keys)), keys, hashes))
+    if prune:
+        cursor.execute(f'INSERT OR IGNORE INTO temp.{_seen_table(table)} SELECT source_key FROM temp.sync_chunk')
+
+    changed = [row[0] for row in cursor.execute(
+        f'SELECT c.pos FROM temp.sync_chunk c LEFT JOIN {HASH_TABLE} h '
+        f'ON h.table_name = ? AND h.source_key = c.source_key '
+        f'WHERE h.row_hash IS NULL OR h.row_hash != c.row_hash ORDER BY c.pos', (table,)
+    )]
+    if not changed:
+        return 0
+
+    key = SOURCE_KEYS[table]
+    columns = [name for name, _ in schema]
+    updates = ', '.join(f'{_quote(c)} = excluded.{_quote(c)}' for c in columns if c != key)
+    cursor.executemany(
+        f'INSERT INTO {_quote(table)} ({", ".join(_quote(c) for c in columns)}) '
+        f'VALUES ({", ".join("?" for _ in columns)}) '
+        f'ON CONFLICT ({_quote(key)}) DO UPDATE SET {updates}',
+        (rows[pos] for pos in changed),
+    )
+    cursor.executemany(
+        f'INSERT INTO {HASH_TABLE} (table_name, source_key, row_hash) VALUES (?, ?, ?) '
+        f'ON CONFLICT (table_name, source_key) DO UPDATE SET row_hash = excluded.row_hash',
+        ((table, keys[pos], hashes[pos]) for pos in changed),
+    )
+    return len(changed)
+
+
+def _prune(cursor, table):
+    """Delete rows (and their hashes) whose key was not in the CSV"""
+    key = SOURCE_KEYS[table]
+    seen = f'temp.{_seen_table(table)}'
+    cursor.execute(f'DELETE FROM {_quote(table)} WHERE CAST({_quote(key)} AS TEXT) '
+                   f'NOT IN (SELECT source_key FROM {seen})')
+    deleted = cursor.rowcount
+    cursor.execute(f'DELETE FROM {HASH_TABLE} WHERE table_name = ? '
+                   f'AND source_key NOT IN (SELECT source_key FROM {seen})', (table,))
+    cursor.execute(f'DROP TABLE {seen}')
+    return deleted
+
+
+def sync_tables(files, db_name=DB_NAME, chunk_size=CHUNK_SIZE, workers=4, prune=False):
+    """
+    Incrementally sync {table: csv_path} into the database
+
+    Each chunk is compared with the recorded row hashes (per source key) and
+    only new or changed rows are upserted, one short transaction per chunk,
+    so readers stay online and a rerun after a failure picks up where it
+    stopped. With prune, rows missing from the CSV are deleted at the end
+    (children before parents).
+
+    A table apply_schema recreates for schema drift starts empty with no
+    hashes, so all its rows are written again; it must be one of `files`.
+    Foreign keys are checked afterwards.
+
+    Returns {table: {'rows', 'upserted', 'deleted', 'seconds'}}.
+    """
+    order = _sync_order(files)
+    queues = {table: queue.Queue(maxsize=2) for table in order}
+    stop = threading.Event()
+    stats = {}
+
+    conn = get_engine(db_name).raw_connection()
+    cursor = conn.cursor()
+    # Recreating a drifted parent table drops rows its children point to
+    # (cannot be toggled inside a transaction)
+    cursor.execute('PRAGMA foreign_keys=OFF')
+    try:
+        cursor.execute('BEGIN')
+        recreated = []
+        for table in apply_schema(cursor):
+            print(f"   ♻️  Updated {table} to match schema.sql")
+            if table in SCHEMA_TABLES:
+                recreated.append(table)
+        not_synced = [table for table in recreated if table not in files]
+        if not_synced:
+            # Rolled back: the tables keep their rows
+            raise RuntimeError(f"{', '.join(not_synced)} would be recreated empty; include "
+                               "them in the sync or run a full load")
+        _create_hash_table(cursor)
+        # Keyed by position: appending is cheap, lookups go to the hash table's key
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS sync_chunk '
+                       '(pos INTEGER PRIMARY KEY, source_key TEXT, row_hash INTEGER)')
+        if prune:
+            # Keys present in each CSV, kept until the tables are pruned
+            for table in order:
+                cursor.execute(f'CREATE TEMP TABLE IF NOT EXISTS {_seen_table(table)} '
+                               '(source_key TEXT PRIMARY KEY) WITHOUT ROWID')
+        conn.commit()
+        cursor.execute(f"PRAGMA foreign_keys={PRAGMAS['foreign_keys']}")
+
+        # Submitted in sync order, so the table being written always has a reader
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='csv') as pool:
+            for table in order:
+                pool.submit(_read, files[table], table, chunk_size, queues[table], stop, SOURCE_KEYS[table])
+            try:
+                for table in order:
+                    entry = stats[table] = {'rows': 0, 'upserted': 0, 'deleted': 0}
+                    started = time.perf_counter()
+                    while True:
+                        _, payload = queues[table].get()
+                        if isinstance(payload, Exception):
+                            raise RuntimeError(f"Failed to read {files[table]}: {payload}") from payload
+                        if payload is None:
+                            break
+                        schema, rows, keys, hashes = payload
+                        cursor.execute('BEGIN')
+                        if entry['rows'] == 0:
+                            _prepare_sync_table(cursor, table, schema)
+                        entry['upserted'] += _sync_chunk(cursor, table, schema, rows, keys, hashes, prune)
+                        conn.commit()
+                        entry['rows'] += len(rows)
+
+                    entry['seconds'] = time.perf_counter() - started
+                    print(f"   ✅ {table:20s} {entry['rows']:>10,} rows  {entry['upserted']:>9,} upserted  "
+                          f"{entry['seconds']:6.2f}s")
+            except BaseException:
+                stop.set()
+                raise
+
+        if prune:
+            # Children before parents
+            for table in reversed(order):
+                if not stats[table]['rows']:
+                    # An empty CSV is more likely a broken export than a purge
+                    continue
+                cursor.execute('BEGIN')
+                stats[table]['deleted'] = _prune(cursor, table)
+                conn.commit()
+                if stats[table]['deleted']:
+                    print(f"   🗑️  {table:20s} {stats[table]['deleted']:>10,} rows deleted")
+
+        if recreated:
+            # Children of a recreated parent were never rewritten: check they still resolve
+            _check_foreign_keys(cursor, [table for table in order if table in SCHEMA_TABLES])
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute(f"PRAGMA foreign_keys={PRAGMAS['foreign_keys']}")
+        cursor.close()
+        conn.close()
+    return stats
+
+
+def csv_files(data_dir=DATA_DIR, tables=None):
+    files = {path.stem: path for path in sorted(Path(data_dir).glob('*.csv'))}
+    if tables:
+        missing = set(tables) - set(files)
+        if missing:
+            raise FileNotFoundError(f"No CSV for: {', '.join(sorted(missing))}")
+        files = {table: files[table] for table in tables}
+    # Largest first, so the long parses start right away
+    return dict(sorted(files.items(), key=lambda item: -item[1].stat().st_size))
+
+
+def migrate_to_sql(db_name=DB_NAME, data_dir=DATA_DIR, chunk_size=CHUNK_SIZE, workers=4, tables=None,
+                   sync=False, prune=False):
+    files = csv_files(data_dir, tables)
+    mode = 'Syncing' if sync else 'Loading'
+    print(f"--- {mode} {len(files)} files from {data_dir} into {db_name} ---\n")
+
+    start = time.perf_counter()
+    if sync:
+        stats = sync_tables(files, db_name, chunk_size, workers, prune)
+    else:
+        stats = load_tables(files, db_name, chunk_size, workers)
+    elapsed = time.perf_counter() - start
+
+    total = sum(s['rows'] for s in stats.values())
+    summary = f"{total:,} rows in {elapsed:.2f}s ({total / elapsed:,.0f} rows/s)"
+    if sync:
+        summary += (f", {sum(s['upserted'] for s in stats.values()):,} upserted, "
+                    f"{sum(s['deleted'] for s in stats.values()):,} deleted")
+    print(f"\n--- {summary} ---")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk-load data/raw CSVs into the analytics database')
+    parser.add_argument('--db', type=str, default=DB_NAME)
+    parser.add_argument('--data-dir', type=str, default=DATA_DIR)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help='Rows parsed and inserted per batch')
+    parser.add_argument('--workers', type=int, default=4, help='CSV files parsed concurrently')
+    parser.add_argument('--tables', nargs='+', help='Only load these tables (CSV file stems)')
+    parser.add_argument('--sync', action='store_true',
+                        help='Upsert only new or changed rows instead of reloading every table')
+    parser.add_argument('--prune', action='store_true',
+                        help='With --sync, also delete rows that are no longer in the CSVs')
+    args = parser.parse_args()
+
+    migrate_to_sql(args.db, args.data_dir, args.chunk_size, args.workers, args.tables,
+                   sync=args.sync, prune=args.prune)
 
-def migrate_to_sql():
-    # 1. Create the SQL Engine (SQLite is easy for local dev)
-    engine = create_engine(f'sqlite:///{DB_NAME}')
-    
-    print(f"--- Starting Migration to {DB_NAME} ---")
-
-    # 2. Iterate through your 'data/raw' folder
-    for file in os.listdir(DATA_DIR):
-        if file.endswith(".csv"):
-            table_name = file.replace(".csv", "")
-            file_path = os.path.join(DATA_DIR, file)
-            
-            print(f"Loading {file} into SQL table '{table_name}'...")
-            
-            # Read CSV
-            df = pd.read_csv(file_path)
-            
-            # 3. Use SQL to write the data
-            # 'replace' drops the table if it exists and recreates it
-            df.to_sql(table_name, engine, if_exists='replace', index=False)
-            
-            # Optional: Verify with a SQL Query
-            with engine.connect() as conn:
-                result = conn.execute(text(f"SELECT COUNT(*) FROM {table_name}"))
-                count = result.scalar()
-                print(f"Successfully inserted {count} rows.")
-
-    print("\n--- All files migrated to SQL successfully ---")
 
 if __name__ == "__main__":
-    migrate_to_sql()
\ No newline at end of file
+    main()
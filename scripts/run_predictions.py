@@ -0,0 +1,290 @@
+"""
+Nightly Batch Scoring
+=====================
+Scores the current student population for every risk target (dropout,
+failure, delay) and stores the results in the analytics database:
+
+    predictions        one row per (run_id, student_id): probability and
+                       risk level of each target
+    prediction_runs    model versions, students, duration, rows/sec
+
+Scored chunks are staged in a temporary table, so the database write lock
+is only taken at the end, when the run row and all its predictions are
+inserted in one transaction: readers see the whole run or none of it. A
+failed run is recorded with status 'failed' and no predictions. The risk
+rollups (backend/database/rollups.py) are refreshed afterwards from the
+staged rows and the run is appended to the columnar prediction history
+(models/prediction_history.py), which serves per-student risk trajectories.
+A failing follow-up step does not undo the stored run: it is reported and
+the script exits 2 (1 when the run itself failed).
+
+Latest complete run:
+    SELECT * FROM predictions WHERE run_id = (
+        SELECT run_id FROM prediction_runs WHERE status = 'complete'
+        ORDER BY run_id DESC LIMIT 1)
+
+Usage:
+    python scripts/run_predictions.py
+    python scripts/run_predictions.py --file students.csv --workers 4
+    python scripts/run_predictions.py --delta --db /path/to/analytics.db
+    python scripts/run_predictions.py --history /path/to/history
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from itertools import repeat
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Run as a script: make the project root importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.database.connection import DEFAULT_DATABASE, get_engine
+from backend.database.models import Prediction, apply_schema
+from backend.database.rollups import RollupStaging
+from models.batch_scoring import DEFAULT_CHUNK_SIZE, BatchScorer, ShardedScorer
+from models.features import (FEATURES_FILE, ROLLUP_COLUMNS, TARGETS, get_model, is_whole_population,
+                             prepare_features_from_current_data)
+from models.prediction_cache import PredictionCache
+from models.prediction_history import DEFAULT_HISTORY_PATH, PredictionHistory
+
+# run_id, student_id, then <target>_probability / <target>_risk_level
+PREDICTION_COLUMNS = [column.name for column in Prediction.__table__.columns]
+
+# Staged with each prediction for the rollups (not stored in predictions)
+GROUP_COLUMNS = [c for c in ROLLUP_COLUMNS if c != 'student_id']
+STAGE_COLUMNS = PREDICTION_COLUMNS + GROUP_COLUMNS
+
+TARGET_NAMES = [c[:-len('_probability')] for c in PREDICTION_COLUMNS if c.endswith('_probability')]
+
+
+def new_run_id(now=None):
+    """Run id sortable by start time; microseconds keep same-second runs apart"""
+    return (now or datetime.now()).strftime('%Y%m%d_%H%M%S_%f')
+
+
+def _stage(cursor, run_id, chunk, scored):
+    """Append one scored chunk to temp.run_predictions"""
+    values = [chunk['student_id'].astype(np.int64).tolist()]
+    values += [scored[column].tolist() for column in PREDICTION_COLUMNS[2:]]
+    values += [chunk[column].tolist() if column in chunk.columns else repeat(None) for column in GROUP_COLUMNS]
+    cursor.executemany(
+        f'INSERT INTO temp.run_predictions VALUES ({", ".join("?" for _ in STAGE_COLUMNS)})',
+        zip(repeat(run_id), *values),
+    )
+
+
+def _record_failure(conn, run):
+    """Leave a 'failed' row for the run (its predictions were rolled back); never replaces a row"""
+    try:
+        conn.execute(
+            'INSERT INTO prediction_runs (run_id, model_version, started_at, finished_at, '
+            "status, source) VALUES (?, ?, ?, ?, 'failed', ?)",
+            (run['run_id'], run['model_version'], run['started_at'],
+             datetime.now().isoformat(timespec='seconds'), run['source']),
+        )
+        conn.commit()
+    except Exception as record_error:
+        conn.rollback()
+        print(f"   ⚠️  Could not record the failed run: {record_error}")
+
+
+def _after_commit(conn, run, steps):
+    """
+    Run the follow-up steps of a stored run
+
+    The run is already complete in the database, so a failing step is
+    reported in run['warnings'] instead of failing the run.
+    """
+    run['warnings'] = []
+    for name, step in steps:
+        try:
+            step()
+        except Exception as error:
+            print(f"   ⚠️  {name} failed: {error}")
+            run['warnings'].append(f"{name}: {error}")
+
+
+def run_predictions(filepath=FEATURES_FILE, db_path=DEFAULT_DATABASE, chunk_size=DEFAULT_CHUNK_SIZE,
+                    workers=1, delta=False, rollups=True, history_path=DEFAULT_HISTORY_PATH, complete=None):
+    """
+    Score every student in `filepath` and persist the run atomically
+
+    delta:   reuse last run's probabilities for students whose features did
+             not change (PredictionCache; single process only)
+    rollups: refresh the risk rollups from this run
+    complete: `filepath` holds every current student, so students missing
+              from it leave the rollups and the prediction cache (default:
+              it is FEATURES_FILE)
+    history_path: prediction history the run is appended to (None: skip)
+
+    Returns the prediction_runs row as a dict.
+    """
+    bundles = {name: get_model(name) for name in TARGETS}
+    versions = {name: bundle.version for name, bundle in bundles.items()}
+
+    cache = None
+    if delta:
+        cache = PredictionCache(versions=versions)
+        print(f"   ♻️  Prediction cache: {len(cache):,} students ({cache.status})")
+        if workers > 1:
+            print("   ⚠️  Delta scoring runs in one process - ignoring --workers")
+            workers = 1
+    if workers > 1:
+        scorer = ShardedScorer(bundles, prepare_features_from_current_data, workers=workers,
+                               chunk_size=chunk_size)
+    else:
+        scorer = BatchScorer(bundles, prepare_features_from_current_data, chunk_size=chunk_size, cache=cache)
+
+    if complete is None:
+        complete = is_whole_population(filepath)
+
+    start = time.perf_counter()
+    run = {
+        'run_id': new_run_id(),
+        'model_version': json.dumps(versions, sort_keys=True),
+        'started_at': datetime.now().isoformat(timespec='seconds'),
+        'source': str(filepath),
+    }
+    print(f"\n📂 Run {run['run_id']}: scoring {filepath} into {db_path}")
+
+    conn = get_engine(db_path).raw_connection()
+    cursor = conn.cursor()
+    try:
+        try:
+            cursor.execute('BEGIN')
+            apply_schema(cursor)
+            conn.commit()
+
+            cursor.execute(f'CREATE TEMP TABLE IF NOT EXISTS run_predictions ({", ".join(STAGE_COLUMNS)})')
+            cursor.execute('DELETE FROM temp.run_predictions')
+
+            # Scoring only writes the connection's temp database: no lock on the main
+            # file, and the scored population is not held in memory
+            students = 0
+            for chunk, scored in scorer.iter_chunks(filepath):
+                _stage(cursor, run['run_id'], chunk, scored)
+                students += len(chunk)
+            conn.commit()
+            scoring_seconds = time.perf_counter() - start
+
+            # The whole run in one write transaction; timings include the insert
+            cursor.execute('BEGIN IMMEDIATE')
+            run.update({
+                'students': students,
+                'status': 'complete',
+                'rescored': scorer.rescored if cache is not None else students,
+            })
+            fields = list(run)
+            cursor.execute(
+                f'INSERT INTO prediction_runs ({", ".join(fields)}) VALUES ({", ".join("?" for _ in fields)})',
+                [run[field] for field in fields],
+            )
+            columns = ', '.join(PREDICTION_COLUMNS)
+            cursor.execute(f'INSERT INTO predictions ({columns}) '
+                           f'SELECT {columns} FROM temp.run_predictions ORDER BY student_id')
+            duration = time.perf_counter() - start
+            run.update({
+                'finished_at': datetime.now().isoformat(timespec='seconds'),
+                'duration_seconds': duration,
+                'rows_per_sec': students / duration if duration else 0.0,
+            })
+            cursor.execute('UPDATE prediction_runs SET finished_at = ?, duration_seconds = ?, rows_per_sec = ? '
+                           'WHERE run_id = ?',
+                           (run['finished_at'], run['duration_seconds'], run['rows_per_sec'], run['run_id']))
+            conn.commit()
+            print(f"   ✅ Stored {students:,} students in {duration:.2f}s "
+                  f"(scoring {scoring_seconds:.2f}s, {run['rows_per_sec']:,.0f} rows/s)")
+        except BaseException:
+            conn.rollback()
+            _record_failure(conn, run)
+            raise
+
+        def save_cache():
+            cache.save(complete=complete)
+            print(f"   ♻️  Rescored {run['rescored']:,}, reused {students - run['rescored']:,}")
+
+        def update_rollups():
+            # Streamed from the staged rows, so memory does not grow with the population
+            staging = RollupStaging(db_path)
+            try:
+                for chunk in pd.read_sql_query(f'SELECT {", ".join(STAGE_COLUMNS[1:])} FROM temp.run_predictions',
+                                               conn.driver_connection, chunksize=chunk_size):
+                    staging.add(chunk)
+            except BaseException:
+                staging.close()
+                raise
+            refreshed = staging.finish(complete=complete)
+            print(f"   📦 Risk rollups: {refreshed['changed']:,} changed student(s) applied")
+
+        def append_history():
+            # Read back only after the run is stored; the history takes whole columns
+            scored = pd.read_sql_query(f'SELECT {", ".join(PREDICTION_COLUMNS[1:])} FROM temp.run_predictions',
+                                       conn.driver_connection)
+            entry = PredictionHistory(history_path).append(
+                run['run_id'],
+                scored['student_id'].to_numpy(),
+                {target: scored[f'{target}_probability'] for target in TARGET_NAMES},
+                {target: scored[f'{target}_risk_level'] for target in TARGET_NAMES},
+                run_date=run['started_at'][:10],
+            )
+            print(f"   🗂️  Prediction history: run {entry['run_id']} appended to {history_path}/{entry['run_date']}")
+
+        steps = [('Prediction cache', save_cache)] if cache is not None else []
+        steps += [('Risk rollups', update_rollups)] if rollups else []
+        steps += [('Prediction history', append_history)] if history_path else []
+        _after_commit(conn, run, steps)
+    finally:
+        cursor.execute('DROP TABLE IF EXISTS temp.run_predictions')
+        cursor.close()
+        conn.close()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score all students and store the run in the database')
+    parser.add_argument('--file', type=str, default=FEATURES_FILE, help='Student feature CSV')
+    parser.add_argument('--db', type=str, default=DEFAULT_DATABASE)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows scored per chunk')
+    parser.add_argument('--workers', type=int, default=1, help='Score chunks on this many processes')
+    parser.add_argument('--delta', action='store_true',
+                        help='Only rescore students whose features changed since the last run')
+    parser.add_argument('--no-rollups', action='store_true', help='Do not refresh the risk rollups')
+    parser.add_argument('--complete', action='store_true',
+                        help='--file holds every current student: drop missing students from the rollups and the delta cache')
+    parser.add_argument('--history', type=str, default=DEFAULT_HISTORY_PATH,
+                        help='Prediction history directory')
+    parser.add_argument('--no-history', action='store_true', help='Do not append the run to the prediction history')
+    args = parser.parse_args()
+
+    print("\n🌙 NIGHTLY BATCH SCORING\n")
+    print("📂 Loading trained models...")
+    try:
+        run = run_predictions(args.file, args.db, args.chunk_size, args.workers, args.delta,
+                              rollups=not args.no_rollups,
+                              history_path=None if args.no_history else args.history,
+                              complete=args.complete or None)
+    except Exception as error:
+        print(f"\n❌ Scoring failed: {error}\n")
+        return 1
+
+    print(f"\n✅ Run {run['run_id']} complete: {run['students']:,} students, "
+          f"{run['rows_per_sec']:,.0f} rows/s")
+    if run['warnings']:
+        # Predictions are stored; only a follow-up step needs attention
+        print(f"⚠️  Stored, but {len(run['warnings'])} follow-up step(s) failed:")
+        for warning in run['warnings']:
+            print(f"   - {warning}")
+        print()
+        return 2
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
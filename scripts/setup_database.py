@@ -0,0 +1,157 @@
+"""
+Database Setup
+==============
+Creates the analytics schema (backend/database/schema.sql) and verifies it:
+
+1. Every ORM model in backend/database/models.py matches its table
+   (columns, types, primary keys) and its indexes exist with the same
+   columns.
+2. The hot per-student and per-course queries are answered through the
+   intended index (EXPLAIN QUERY PLAN), never by a full table scan; the
+   whole-table aggregations of the cleaning pipeline read only a covering
+   index.
+
+Exits 1 if any check fails.
+
+Usage:
+    python scripts/setup_database.py
+    python scripts/setup_database.py --db /path/to/analytics.db
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Run as a script: make the project root importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.database.connection import DEFAULT_DATABASE, get_engine
+from backend.database.models import (Base, SchemaDriftError, apply_schema, database_columns,
+                                     declared_columns, declared_indexes, index_columns)
+
+# (description, query, parameters, index expected in the plan)
+HOT_QUERIES = [
+    ('Student profile',
+     'SELECT * FROM students WHERE student_id = ?', (100001,),
+     'INTEGER PRIMARY KEY'),
+    ('Class list',
+     'SELECT student_id, name FROM students WHERE school_id = ? AND class_level = ?', ('SCES', 'BIT1.1'),
+     'ix_students_school_class'),
+    ('Student enrollments',
+     'SELECT course_id, grade, gpa FROM sis_enrollments WHERE student_id = ?', (100001,),
+     'ix_sis_enrollments_student_course'),
+    ('Course roster',
+     'SELECT student_id, grade FROM sis_enrollments WHERE course_id = ?', ('BIT101',),
+     'ix_sis_enrollments_course'),
+    ('Attendance in a course',
+     'SELECT session_date, status FROM attendance_records WHERE student_id = ? AND course_id = ?',
+     (100001, 'BIT101'),
+     'ix_attendance_student_course'),
+    ('Attendance over a date range',
+     'SELECT course_id, status FROM attendance_records '
+     'WHERE student_id = ? AND session_date BETWEEN ? AND ?', (100001, '2026-01-01', '2026-02-01'),
+     'ix_attendance_student_date'),
+    ('Course session register',
+     'SELECT student_id, status FROM attendance_records WHERE course_id = ? AND session_date = ?',
+     ('BIT101', '2026-01-12'),
+     'ix_attendance_course_date'),
+    ('LMS activity in a course',
+     'SELECT activity_type, duration_minutes FROM lms_activities WHERE student_id = ? AND course_id = ?',
+     (100001, 'BIT101'),
+     'ix_lms_student_course'),
+    ('LMS activity over a date range',
+     'SELECT course_id, activity_type FROM lms_activities '
+     'WHERE student_id = ? AND activity_date >= ?', (100001, '2026-01-01'),
+     'ix_lms_student_date'),
+    ('Attendance rate aggregation',
+     'SELECT student_id, course_id, COUNT(status) FROM attendance_records GROUP BY student_id, course_id', (),
+     'COVERING INDEX ix_attendance_student_course'),
+    ('LMS minutes aggregation',
+     'SELECT student_id, COUNT(*), TOTAL(duration_minutes) FROM lms_activities GROUP BY student_id', (),
+     'COVERING INDEX ix_lms_student_course'),
+    ('Predictions of a run',
+     'SELECT student_id, dropout_probability FROM predictions WHERE run_id = ?', ('20260101_000000',),
+     'PRIMARY KEY'),
+    ('Prediction history of a student',
+     'SELECT run_id, dropout_probability FROM predictions WHERE student_id = ? ORDER BY run_id', (100001,),
+     'ix_predictions_student_run'),
+]
+
+
+def check_models(cursor):
+    """ORM models vs the tables and indexes actually in the database"""
+    failures = []
+    indexes = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    for name, table in Base.metadata.tables.items():
+        # Columns added in place (ALTER TABLE) land at the end: order is not compared
+        if sorted(database_columns(cursor, name)) != sorted(declared_columns(name)):
+            failures.append(f"{name}: columns differ between schema.sql and models.py")
+        missing = {index.name for index in table.indexes} - indexes
+        if missing:
+            failures.append(f"{name}: indexes missing from schema.sql: {', '.join(sorted(missing))}")
+        for index, columns in declared_indexes(name).items():
+            if index not in missing and index_columns(cursor, index) != columns:
+                failures.append(f"{index}: columns differ between schema.sql and models.py")
+    return failures
+
+
+def query_plan(cursor, query, parameters):
+    return ' | '.join(row[-1] for row in cursor.execute(f'EXPLAIN QUERY PLAN {query}', parameters))
+
+
+def check_query_plans(cursor):
+    failures = []
+    for description, query, parameters, expected in HOT_QUERIES:
+        plan = query_plan(cursor, query, parameters)
+        uses_index = f'USING {expected}' in plan or f'INDEX {expected}' in plan
+        # A scan is fine only over a covering index (no table lookups)
+        ok = uses_index and ('SCAN' not in plan or expected.startswith('COVERING'))
+        print(f"   {'✅' if ok else '❌'} {description:32s} {plan}")
+        if not ok:
+            failures.append(f"{description}: expected {expected}, got {plan}")
+    return failures
+
+
+def setup_database(db_name=DEFAULT_DATABASE):
+    conn = get_engine(db_name).raw_connection()
+    try:
+        cursor = conn.cursor()
+        try:
+            for name in apply_schema(cursor):
+                print(f"   ♻️  Updated {name} to match schema.sql")
+        except SchemaDriftError as error:
+            conn.rollback()
+            return [str(error)]
+        conn.commit()
+
+        print("🔎 Models vs schema")
+        failures = check_models(cursor)
+        print(f"   {'✅' if not failures else '❌'} {len(Base.metadata.tables)} tables checked")
+
+        print("\n🔎 Query plans")
+        failures += check_query_plans(cursor)
+        cursor.close()
+    finally:
+        conn.close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Create and verify the analytics schema')
+    parser.add_argument('--db', type=str, default=DEFAULT_DATABASE)
+    args = parser.parse_args()
+
+    print(f"\n🗄️  DATABASE SETUP: {args.db}\n")
+    failures = setup_database(args.db)
+
+    if failures:
+        print("\n❌ Schema checks failed:")
+        for failure in failures:
+            print(f"   - {failure}")
+        return 1
+    print("\n✅ Schema ready\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
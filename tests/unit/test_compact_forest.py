@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from models.compact_forest import export_compact_forest, fold_thresholds, load_compact_forest
+
+
+def _training_data(rows=400, features=5, seed=0):
+    rng = np.random.default_rng(seed)
+    # Rounded values: many rows sit exactly on a split threshold
+    X = np.round(rng.normal(50, 20, size=(rows, features)), 1)
+    y = (X[:, 0] + rng.normal(0, 10, rows) > 50).astype(int)
+    return X, y
+
+
+@pytest.fixture
+def fitted(tmp_path):
+    X, y = _training_data()
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0).fit(scaler.transform(X), y)
+    path = export_compact_forest(model, scaler, tmp_path / 'dropout_forest.npy')
+    return model, scaler, load_compact_forest(path), X
+
+
+def test_compact_forest_matches_sklearn_on_raw_features(fitted):
+    model, scaler, forest, X = fitted
+    X_new, _ = _training_data(rows=300, seed=1)
+    for rows in (X, X_new):
+        expected = model.predict_proba(scaler.transform(rows))
+        np.testing.assert_allclose(forest.predict_proba(rows), expected, rtol=0, atol=1e-12)
+
+
+def test_compact_forest_matches_sklearn_across_batches(fitted):
+    model, scaler, forest, X = fitted
+    expected = model.predict_proba(scaler.transform(X))[:, 1]
+    np.testing.assert_allclose(forest.predict_positive(X, batch_size=7), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(forest.predict_positive(X[3]), expected[3:4], rtol=0, atol=1e-12)
+
+
+def test_contributions_add_up_to_the_prediction(fitted):
+    _, _, forest, X = fitted
+    bias, contributions = forest.contributions(X[:50])
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), forest.predict_positive(X[:50]), atol=1e-12)
+
+
+def test_folded_threshold_is_the_last_raw_value_going_left():
+    mean, scale = np.array([50.0]), np.array([19.7])
+    threshold = np.array([np.float32(0.3172)], dtype=np.float64)
+    raw = fold_thresholds(threshold, mean, scale)
+    scaled = lambda x: ((x - mean) / scale).astype(np.float32)
+    assert scaled(raw) <= threshold
+    assert scaled(np.nextafter(raw, np.inf)) > threshold
@@ -0,0 +1,140 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from scripts.csv_to_sql import sync_tables
+
+SCHOOLS = pd.DataFrame({
+    'school_id': ['SBS', 'SCES', 'SLS'],
+    'name': ['Business School', 'Computing', 'Law School'],
+    'dean': ['Prof. Wanjiru', 'Dr. Kamau', 'Dr. Otieno'],
+    'building': ['Business School', 'ICT Building', 'Law Building'],
+})
+
+USERS = pd.DataFrame({
+    'user_id': ['U_1', 'U_2'],
+    'username': ['amina', 'brian'],
+    'role': ['student', 'student'],
+})
+
+
+def _sync(tmp_path, frames, prune=False):
+    files = {}
+    for table, frame in frames.items():
+        files[table] = tmp_path / f'{table}.csv'
+        frame.to_csv(files[table], index=False)
+    return sync_tables(files, tmp_path / 'analytics.db', chunk_size=2, workers=1, prune=prune)
+
+
+def _table(tmp_path, table, key):
+    conn = sqlite3.connect(tmp_path / 'analytics.db')
+    try:
+        return pd.read_sql_query(f'SELECT * FROM {table} ORDER BY {key}', conn)
+    finally:
+        conn.close()
+
+
+def test_unchanged_rows_are_not_rewritten(tmp_path):
+    stats = _sync(tmp_path, {'schools': SCHOOLS, 'users': USERS})
+    assert stats['schools']['upserted'] == 3
+    assert stats['users']['upserted'] == 2
+
+    stats = _sync(tmp_path, {'schools': SCHOOLS, 'users': USERS})
+    assert (stats['schools']['rows'], stats['schools']['upserted']) == (3, 0)
+    assert stats['users']['upserted'] == 0
+    pd.testing.assert_frame_equal(_table(tmp_path, 'schools', 'school_id'), SCHOOLS)
+
+
+def test_changed_and_new_rows_are_upserted(tmp_path):
+    _sync(tmp_path, {'schools': SCHOOLS, 'users': USERS})
+    schools = SCHOOLS.copy()
+    schools.loc[1, 'dean'] = 'Dr. Njeri'
+    users = pd.concat([USERS, pd.DataFrame({'user_id': ['U_3'], 'username': ['chege'], 'role': ['staff']})])
+
+    stats = _sync(tmp_path, {'schools': schools, 'users': users})
+
+    assert stats['schools']['upserted'] == 1
+    assert stats['users']['upserted'] == 1
+    pd.testing.assert_frame_equal(_table(tmp_path, 'schools', 'school_id'), schools)
+    assert _table(tmp_path, 'users', 'user_id')['user_id'].tolist() == ['U_1', 'U_2', 'U_3']
+
+
+def test_removed_rows_are_only_deleted_with_prune(tmp_path):
+    _sync(tmp_path, {'schools': SCHOOLS})
+    remaining = SCHOOLS[SCHOOLS['school_id'] != 'SLS']
+
+    assert _sync(tmp_path, {'schools': remaining})['schools']['deleted'] == 0
+    assert len(_table(tmp_path, 'schools', 'school_id')) == 3
+
+    assert _sync(tmp_path, {'schools': remaining}, prune=True)['schools']['deleted'] == 1
+    assert _table(tmp_path, 'schools', 'school_id')['school_id'].tolist() == ['SBS', 'SCES']
+
+    # A pruned row that comes back is inserted again, not skipped by a stale hash
+    assert _sync(tmp_path, {'schools': SCHOOLS})['schools']['upserted'] == 1
+    assert len(_table(tmp_path, 'schools', 'school_id')) == 3
+
+
+def test_empty_csv_never_prunes(tmp_path):
+    _sync(tmp_path, {'schools': SCHOOLS})
+    stats = _sync(tmp_path, {'schools': SCHOOLS.iloc[:0]}, prune=True)
+    assert stats['schools']['deleted'] == 0
+    assert len(_table(tmp_path, 'schools', 'school_id')) == 3
+
+
+PROGRAMS = pd.DataFrame({
+    'program_id': ['SBS_BCOM', 'SCES_BICS'],
+    'program_code': ['BCOM', 'BICS'],
+    'name': ['Commerce', 'Informatics'],
+    'school_id': ['SBS', 'SCES'],
+    'degree_type': ['Undergraduate', 'Undergraduate'],
+    'duration_years': [4, 4],
+    'credits_required': [120, 120],
+})
+
+
+def _drift(tmp_path, table):
+    conn = sqlite3.connect(tmp_path / 'analytics.db')
+    conn.execute(f'ALTER TABLE {table} ADD COLUMN foo TEXT')
+    conn.commit()
+    conn.close()
+
+
+def test_drifted_table_is_refilled_by_the_next_sync(tmp_path):
+    _sync(tmp_path, {'schools': SCHOOLS, 'programs': PROGRAMS})
+    _drift(tmp_path, 'programs')
+
+    stats = _sync(tmp_path, {'schools': SCHOOLS, 'programs': PROGRAMS})
+
+    assert stats['programs']['upserted'] == 2
+    assert stats['schools']['upserted'] == 0
+    assert len(_table(tmp_path, 'programs', 'program_id')) == 2
+
+
+def test_drifted_parent_table_is_refilled_under_its_children(tmp_path):
+    _sync(tmp_path, {'schools': SCHOOLS, 'programs': PROGRAMS})
+    _drift(tmp_path, 'schools')
+
+    stats = _sync(tmp_path, {'schools': SCHOOLS, 'programs': PROGRAMS})
+
+    assert stats['schools']['upserted'] == 3
+    pd.testing.assert_frame_equal(_table(tmp_path, 'schools', 'school_id'), SCHOOLS)
+    assert len(_table(tmp_path, 'programs', 'program_id')) == 2
+
+
+def test_drifted_table_outside_the_sync_is_left_alone(tmp_path):
+    _sync(tmp_path, {'schools': SCHOOLS, 'programs': PROGRAMS})
+    _drift(tmp_path, 'schools')
+
+    with pytest.raises(RuntimeError, match='schools'):
+        _sync(tmp_path, {'programs': PROGRAMS})
+    assert 'foo' in _table(tmp_path, 'schools', 'school_id').columns
+    assert len(_table(tmp_path, 'schools', 'school_id')) == 3
+
+
+def test_parent_refilled_without_a_referenced_row_fails_the_check(tmp_path):
+    _sync(tmp_path, {'schools': SCHOOLS, 'programs': PROGRAMS})
+    _drift(tmp_path, 'schools')
+
+    with pytest.raises(RuntimeError, match='Foreign key'):
+        _sync(tmp_path, {'schools': SCHOOLS[SCHOOLS['school_id'] != 'SCES'], 'programs': PROGRAMS})
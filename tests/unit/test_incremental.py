@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from models.training.incremental import round_seed, warm_start_update
+
+
+def _slice(rows, seed):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, 4))
+    return X, (X[:, 0] > 0).astype(int)
+
+
+@pytest.fixture
+def base():
+    X, y = _slice(200, 0)
+    return RandomForestClassifier(n_estimators=10, class_weight='balanced', random_state=0).fit(X, y)
+
+
+def test_new_trees_are_added_and_old_ones_evicted(base):
+    X_new, y_new = _slice(100, 1)
+    model = warm_start_update(base, X_new, y_new, n_new_trees=5, max_trees=12)
+
+    assert len(model.estimators_) == 12
+    # The 3 oldest trees were evicted; the rest keep their order
+    np.testing.assert_array_equal(model.estimators_[0].tree_.threshold, base.estimators_[3].tree_.threshold)
+    assert model.predict_proba(X_new).shape == (100, 2)
+    assert len(base.estimators_) == 10
+
+
+@pytest.mark.parametrize('label', [0, 1])
+def test_single_class_slice_is_rejected(base, label):
+    X_new, _ = _slice(50, 2)
+    with pytest.raises(ValueError, match='every class'):
+        warm_start_update(base, X_new, np.full(50, label))
+
+
+def test_float_labels_match_integer_classes(base):
+    # train_model.py passes fillna(0) targets, which are floats
+    X_new, y_new = _slice(100, 3)
+    model = warm_start_update(base, X_new, y_new.astype(float), n_new_trees=2)
+    assert len(model.estimators_) == 12
+
+
+def _new_tree_seeds(model, before):
+    return [tree.random_state for tree in model.estimators_[before:]]
+
+
+def test_rounds_with_their_own_seed_grow_independent_trees(base):
+    X_new, y_new = _slice(100, 4)
+    # Eviction keeps the forest at 10 trees, so every round starts from the same length
+    same_1 = warm_start_update(base, X_new, y_new, n_new_trees=3, max_trees=10)
+    same_2 = warm_start_update(same_1, X_new, y_new, n_new_trees=3, max_trees=10)
+    assert _new_tree_seeds(same_1, 7) == _new_tree_seeds(same_2, 7)
+
+    round_1 = warm_start_update(base, X_new, y_new, n_new_trees=3, max_trees=10, random_state=round_seed(0, 1))
+    round_2 = warm_start_update(round_1, X_new, y_new, n_new_trees=3, max_trees=10,
+                                random_state=round_seed(0, 2))
+    assert set(_new_tree_seeds(round_1, 7)).isdisjoint(_new_tree_seeds(round_2, 7))
+    assert round_2.random_state == base.random_state
@@ -0,0 +1,35 @@
+import os
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from models import loader
+
+
+def _save_legacy(directory, target, coef, mtime_ns):
+    model = LogisticRegression().fit(np.array([[0.0], [1.0]]), [0, 1])
+    model.coef_[:] = coef
+    path = directory / f'{target}_model.pkl'
+    joblib.dump(model, path)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_retrained_legacy_pickle_is_reloaded(tmp_path, monkeypatch):
+    monkeypatch.setattr(loader, 'LEGACY_DIR', str(tmp_path / 'saved_models'))
+    (tmp_path / 'saved_models').mkdir()
+    root = tmp_path / 'registry'
+    loader.clear_cache()
+
+    _save_legacy(tmp_path / 'saved_models', 'dropped_out', 1.0, 10**18)
+    first = loader.load_model('dropped_out', registry_root=root)
+    assert loader.is_legacy(first.version)
+    assert loader.load_model('dropped_out', registry_root=root) is first
+
+    _save_legacy(tmp_path / 'saved_models', 'dropped_out', 2.0, 2 * 10**18)
+    second = loader.load_model('dropped_out', registry_root=root)
+    assert second.version != first.version
+    assert second.model.coef_[0, 0] == 2.0
+    # A version pinned by a worker still loads the flat pickles
+    assert loader.load_model('dropped_out', registry_root=root, version=second.version) is second
+    loader.clear_cache()
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from models.prediction_cache import PredictionCache
+
+VERSIONS = {'dropout': 'v1'}
+
+
+def _reasons(names, contributions):
+    return pd.DataFrame({'reason_1': names, 'reason_1_contribution': contributions})
+
+
+def _run(path, student_ids, hashes, probabilities, reasons=None, complete=False):
+    cache = PredictionCache(path, versions=VERSIONS)
+    cache.record(np.array(student_ids), np.array(hashes, dtype=np.uint64),
+                 {'dropout': np.array(probabilities)}, reasons)
+    cache.save(complete=complete)
+    return PredictionCache(path, versions=VERSIONS)
+
+
+def _cached(cache, student_ids, hashes):
+    return cache.lookup(np.array(student_ids), np.array(hashes, dtype=np.uint64))
+
+
+def test_reason_codes_round_trip(tmp_path):
+    path = tmp_path / 'cache.npz'
+    cache = _run(path, [1, 2], [10, 20], [0.5, 0.25], _reasons(['y1s1_gpa', None], [0.1, np.nan]))
+
+    positions, unchanged = _cached(cache, [2, 1], [20, 10])
+    assert unchanged.tolist() == [True, True]
+    assert cache.explained[positions].tolist() == [True, True]
+    reasons = cache.previous_reasons(positions)
+    assert reasons['reason_1'].isna().tolist() == [True, False]
+    assert reasons['reason_1'].iloc[1] == 'y1s1_gpa'
+    assert reasons['reason_1_contribution'].iloc[1] == 0.1
+
+
+def test_partial_run_keeps_students_it_did_not_score(tmp_path):
+    path = tmp_path / 'cache.npz'
+    _run(path, [1, 2, 3], [10, 20, 30], [0.5, 0.25, 0.75], complete=True)
+    cache = _run(path, [2], [21], [0.125])
+
+    assert len(cache) == 3
+    positions, unchanged = _cached(cache, [1, 2, 3], [10, 21, 30])
+    assert unchanged.tolist() == [True, True, True]
+    assert cache.previous('dropout', positions).tolist() == [0.5, 0.125, 0.75]
+
+
+def test_whole_population_run_drops_missing_students(tmp_path):
+    path = tmp_path / 'cache.npz'
+    _run(path, [1, 2, 3], [10, 20, 30], [0.5, 0.25, 0.75], complete=True)
+    cache = _run(path, [2, 3], [20, 30], [0.25, 0.75], complete=True)
+
+    assert len(cache) == 2
+    assert _cached(cache, [1], [10])[0].tolist() == [-1]
+
+
+def test_unexplained_run_keeps_reasons_of_unchanged_students(tmp_path):
+    path = tmp_path / 'cache.npz'
+    _run(path, [1, 2], [10, 20], [0.5, 0.25], _reasons(['y1s1_gpa', 'y1s1_avg_grade'], [0.1, 0.2]),
+         complete=True)
+    # Student 2 changed and was rescored without reason codes
+    cache = _run(path, [1, 2], [10, 21], [0.5, 0.375], complete=True)
+
+    positions, _ = _cached(cache, [1, 2], [10, 21])
+    assert cache.explained[positions].tolist() == [True, False]
+    assert cache.previous_reasons(positions[:1])['reason_1'].tolist() == ['y1s1_gpa']
+
+
+def test_other_model_versions_make_the_cache_stale(tmp_path):
+    path = tmp_path / 'cache.npz'
+    _run(path, [1], [10], [0.5])
+    cache = PredictionCache(path, versions={'dropout': 'v2'})
+    assert cache.status == 'stale'
+    assert len(cache) == 0
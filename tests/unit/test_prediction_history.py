@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from models.prediction_history import PredictionHistory
+from models.risk_levels import RISK_LEVELS
+
+LOW, MEDIUM, HIGH = RISK_LEVELS[0], RISK_LEVELS[1], RISK_LEVELS[2]
+
+
+def _append(history, run_id, students, run_date='2026-01-01'):
+    """students: {student_id: (dropout probability, dropout level)}"""
+    ids = list(students)
+    return history.append(
+        run_id,
+        ids,
+        {'dropout': [students[i][0] for i in ids], 'failure': [students[i][0] / 2 for i in ids]},
+        {'dropout': [students[i][1] for i in ids], 'failure': [LOW for _ in ids]},
+        run_date=run_date,
+    )
+
+
+def test_append_round_trips_through_trajectory_and_load_run(tmp_path):
+    history = PredictionHistory(tmp_path)
+    _append(history, 'run1', {300: (0.25, LOW), 100: (0.5, MEDIUM), 200: (0.75, HIGH)})
+
+    run = history.load_run('run1').sort_values('student_id').reset_index(drop=True)
+    assert run['student_id'].tolist() == [100, 200, 300]
+    assert run['dropout_probability'].tolist() == [0.5, 0.75, 0.25]
+    assert run['dropout_risk_level'].tolist() == [MEDIUM, HIGH, LOW]
+    assert run['failure_probability'].tolist() == [0.25, 0.375, 0.125]
+
+    trajectory = history.trajectory(200)
+    assert trajectory['run_id'].tolist() == ['run1']
+    assert trajectory['run_date'].tolist() == ['2026-01-01']
+    assert trajectory['dropout_probability'].tolist() == [0.75]
+    assert trajectory['dropout_risk_level'].tolist() == [HIGH]
+    assert trajectory['failure_risk_level'].tolist() == [LOW]
+
+
+def test_trajectory_skips_runs_the_student_was_missing_from(tmp_path):
+    history = PredictionHistory(tmp_path)
+    _append(history, 'run1', {100: (0.5, MEDIUM), 200: (0.25, LOW)})
+    _append(history, 'run2', {200: (0.5, MEDIUM)}, run_date='2026-01-02')
+    _append(history, 'run3', {100: (0.75, HIGH), 200: (0.75, HIGH)}, run_date='2026-01-03')
+
+    trajectory = history.trajectory(100)
+    assert trajectory['run_id'].tolist() == ['run1', 'run3']
+    assert trajectory['dropout_probability'].tolist() == [0.5, 0.75]
+    assert history.trajectory(200)['run_id'].tolist() == ['run1', 'run2', 'run3']
+    assert history.load_run('run2')['student_id'].tolist() == [200]
+
+
+def test_students_new_after_earlier_runs_get_their_own_rows(tmp_path):
+    history = PredictionHistory(tmp_path)
+    _append(history, 'run1', {200: (0.25, LOW)})
+    _append(history, 'run2', {200: (0.5, MEDIUM), 100: (0.75, HIGH), 300: (0.125, LOW)},
+            run_date='2026-01-02')
+
+    # Older partitions have fewer rows than the dictionary has students
+    assert history.trajectory(100)['run_id'].tolist() == ['run2']
+    assert history.trajectory(300)['dropout_probability'].tolist() == [0.125]
+    assert history.trajectory(200)['dropout_probability'].tolist() == [0.25, 0.5]
+    assert history.load_run('run1')['student_id'].tolist() == [200]
+    assert sorted(history.load_run('run2')['student_id'].tolist()) == [100, 200, 300]
+    assert history.codes([100, 200, 300, 400]).tolist()[3] == -1
+
+
+def test_unknown_student_has_an_empty_trajectory(tmp_path):
+    history = PredictionHistory(tmp_path)
+    assert history.trajectory(100).empty
+    _append(history, 'run1', {200: (0.25, LOW)})
+    assert history.trajectory(100).empty
+
+
+def test_duplicate_run_id_is_rejected(tmp_path):
+    history = PredictionHistory(tmp_path)
+    _append(history, 'run1', {100: (0.5, MEDIUM)})
+
+    with pytest.raises(ValueError, match='already'):
+        _append(history, 'run1', {100: (0.75, HIGH)}, run_date='2026-01-02')
+    assert len(history) == 1
+    assert history.trajectory(100)['dropout_probability'].tolist() == [0.5]
+
+
+def test_duplicate_student_in_a_run_is_rejected(tmp_path):
+    history = PredictionHistory(tmp_path)
+    with pytest.raises(ValueError, match='duplicate'):
+        history.append('run1', np.array([100, 100]), {'dropout': [0.5, 0.5]}, {'dropout': [LOW, LOW]})
+    assert len(history) == 0
+
+
+def test_unknown_run_raises_key_error(tmp_path):
+    with pytest.raises(KeyError):
+        PredictionHistory(tmp_path).load_run('missing')
@@ -0,0 +1,25 @@
+from models.registry import ModelRegistry
+
+
+def test_lookups_do_not_create_the_store(tmp_path):
+    registry = ModelRegistry(tmp_path / 'registry')
+    assert registry.resolve('latest') is None
+    assert registry.versions() == []
+    assert not (tmp_path / 'registry').exists()
+
+
+def test_publishing_a_taken_version_gets_a_suffix(tmp_path):
+    registry = ModelRegistry(tmp_path / 'registry')
+    first = registry.publish({}, ['gpa'], version='20260101_000000')
+    second = registry.publish({}, ['gpa'], version='20260101_000000')
+
+    assert (first, second) == ('20260101_000000', '20260101_000000_1')
+    assert registry.versions() == [first, second]
+    assert registry.manifest(second)['version'] == second
+
+
+def test_new_versions_sort_in_publish_order(tmp_path):
+    registry = ModelRegistry(tmp_path / 'registry')
+    published = [registry.publish({}, ['gpa']) for _ in range(3)]
+    assert len(set(published)) == 3
+    assert registry.versions() == published
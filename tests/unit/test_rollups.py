@@ -0,0 +1,43 @@
+import pandas as pd
+
+from backend.database.rollups import RollupStaging, read_rollups, refresh_rollups
+
+
+def _scored(student_ids, school, probability, level):
+    return pd.DataFrame({
+        'student_id': student_ids,
+        'school_id': school,
+        'program_id': 'P1',
+        'class_level': 'Year 1',
+        'dropout_probability': probability,
+        'dropout_risk_level': level,
+    })
+
+
+def test_staged_chunks_match_a_whole_frame_refresh(tmp_path):
+    frame = pd.concat([_scored([1, 2], 'SBS', 0.5, 'HIGH'), _scored([3], 'SCES', 0.25, 'LOW')],
+                      ignore_index=True)
+    refresh_rollups(frame, tmp_path / 'whole.db', complete=True)
+
+    staging = RollupStaging(tmp_path / 'chunks.db')
+    for start in range(0, len(frame), 2):
+        staging.add(frame.iloc[start:start + 2])
+    assert staging.finish(complete=True) == {'students': 3, 'changed': 3}
+
+    expected = read_rollups('dropout', by=['school_id'], db_path=tmp_path / 'whole.db')
+    pd.testing.assert_frame_equal(read_rollups('dropout', by=['school_id'], db_path=tmp_path / 'chunks.db'),
+                                  expected)
+    assert expected['students'].tolist() == [2, 1]
+
+
+def test_only_changed_and_removed_students_are_applied(tmp_path):
+    db = tmp_path / 'analytics.db'
+    refresh_rollups(_scored([1, 2, 3], 'SBS', 0.5, 'HIGH'), db, complete=True)
+
+    # Student 1 moves school, student 3 leaves; a partial run removes nobody
+    moved = pd.concat([_scored([1], 'SCES', 0.5, 'HIGH'), _scored([2], 'SBS', 0.5, 'HIGH')], ignore_index=True)
+    assert refresh_rollups(moved, db)['changed'] == 1
+    assert read_rollups('dropout', by=['school_id'], db_path=db)['students'].tolist() == [2, 1]
+
+    assert refresh_rollups(moved, db, complete=True)['changed'] == 1
+    assert read_rollups('dropout', by=['school_id'], db_path=db)['students'].tolist() == [1, 1]
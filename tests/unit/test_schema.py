@@ -0,0 +1,70 @@
+import sqlite3
+
+import pytest
+
+from backend.database.models import (SYNC_HASH_TABLE, SchemaDriftError, apply_schema,
+                                     database_columns, declared_columns)
+
+
+def _connect(tmp_path):
+    return sqlite3.connect(tmp_path / 'analytics.db')
+
+
+def test_apply_schema_creates_every_table(tmp_path):
+    conn = _connect(tmp_path)
+    apply_schema(conn.cursor())
+    assert database_columns(conn.cursor(), 'predictions') == declared_columns('predictions')
+    assert apply_schema(conn.cursor()) == []
+
+
+def test_persisted_table_gains_new_columns_and_keeps_rows(tmp_path):
+    conn = _connect(tmp_path)
+    cursor = conn.cursor()
+    # prediction_runs before source / rescored / duration_seconds / rows_per_sec existed
+    cursor.execute('CREATE TABLE prediction_runs (run_id TEXT PRIMARY KEY, model_version TEXT NOT NULL, '
+                   'started_at TEXT NOT NULL, finished_at TEXT, students INTEGER, '
+                   "status TEXT NOT NULL DEFAULT 'running')")
+    cursor.execute("INSERT INTO prediction_runs VALUES ('20260101_000000', '{}', '2026-01-01', NULL, 10, 'complete')")
+
+    changed = apply_schema(cursor)
+
+    assert 'prediction_runs.rows_per_sec' in changed
+    assert 'prediction_runs' not in changed
+    assert sorted(database_columns(cursor, 'prediction_runs')) == sorted(declared_columns('prediction_runs'))
+    assert cursor.execute('SELECT run_id, students, source FROM prediction_runs').fetchall() == [
+        ('20260101_000000', 10, None)]
+
+
+def test_persisted_table_with_incompatible_drift_is_not_dropped(tmp_path):
+    conn = _connect(tmp_path)
+    cursor = conn.cursor()
+    cursor.execute('CREATE TABLE risk_rollup_students (student_id TEXT PRIMARY KEY, row_hash INTEGER NOT NULL)')
+    cursor.execute("INSERT INTO risk_rollup_students VALUES ('100001', 1)")
+
+    with pytest.raises(SchemaDriftError, match='student_id'):
+        apply_schema(cursor)
+    assert cursor.execute('SELECT COUNT(*) FROM risk_rollup_students').fetchone() == (1,)
+
+
+def test_drifted_source_table_is_recreated(tmp_path):
+    conn = _connect(tmp_path)
+    cursor = conn.cursor()
+    # Shape of an old pandas-inferred load
+    cursor.execute('CREATE TABLE schools (school_id TEXT, name TEXT)')
+
+    assert 'schools' in apply_schema(cursor)
+    assert database_columns(cursor, 'schools') == declared_columns('schools')
+
+
+def test_recreated_source_table_loses_its_sync_hashes(tmp_path):
+    conn = _connect(tmp_path)
+    cursor = conn.cursor()
+    apply_schema(cursor)
+    cursor.execute(f'CREATE TABLE {SYNC_HASH_TABLE} (table_name TEXT, source_key TEXT, row_hash INTEGER)')
+    cursor.executemany(f'INSERT INTO {SYNC_HASH_TABLE} VALUES (?, ?, ?)',
+                       [('schools', 'SBS', 1), ('programs', 'SBS_BCOM', 2)])
+    cursor.execute('ALTER TABLE schools ADD COLUMN foo TEXT')
+
+    assert 'schools' in apply_schema(cursor)
+    # The next --sync has to write every school again; other tables keep theirs
+    assert cursor.execute(f'SELECT table_name FROM {SYNC_HASH_TABLE}').fetchall() == [('programs',)]
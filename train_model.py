@@ -1,29 +1,38 @@
 """
 Train ML Models on Historical Data
 ===================================
+
+Usage:
+    python train_model.py                                   # full retrain (Random Forest)
+    python train_model.py --engine hgb                      # HistGradientBoosting
+    python train_model.py --engine compare                  # side-by-side report, nothing saved
+    python train_model.py --incremental data/new_slice.csv  # add trees for a new semester
 """
-import pandas as pd
-import numpy as np
+import argparse
+import io
+import json
+import time
 from pathlib import Path
 import joblib
+import pandas as pd
+import numpy as np
 from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
-
-print("\n" + "🤖" * 35)
-print("MODEL TRAINING - HISTORICAL DATA")
-print("🤖" * 35 + "\n")
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix, roc_auc_score
 
-# Create models directory
-Path('models/saved_models').mkdir(parents=True, exist_ok=True)
+from models.evaluation.thresholds import TARGET_RECALLS, operating_points
+from models.loader import HISTORICAL_REF
+from models.registry import ModelRegistry
+from models.training.incremental import round_seed, warm_start_update
 
-# Load data
-print("📂 Loading historical data...")
-train_df = pd.read_csv('data/historical/train_cohort_2021.csv')
-test_df = pd.read_csv('data/historical/test_cohort_2021.csv')
+TRAIN_FILE = 'data/historical/train_cohort_2021.csv'
+TEST_FILE = 'data/historical/test_cohort_2021.csv'
+COMPARISON_FILE = 'models/evaluation/engine_comparison.json'
 
-print(f"   ✅ Training set: {len(train_df):,} students")
-print(f"   ✅ Test set: {len(test_df):,} students\n")
+ENGINES = {
+    'forest': 'Random Forest',
+    'hgb': 'Histogram Gradient Boosting',
+}
 
 # Features (Year 1 Semester 1 indicators)
 feature_columns = [
@@ -39,12 +48,6 @@ feature_columns = [
     'y1s1_low_engagement'
 ]
 
-# Prepare features
-X_train = train_df[feature_columns].fillna(0)
-X_test = test_df[feature_columns].fillna(0)
-
-print(f"📊 Using {len(feature_columns)} features")
-
 # Targets to predict
 targets = [
     ('Dropout Risk', 'dropped_out'),
@@ -52,29 +55,10 @@ targets = [
     ('Delayed Graduation Risk', 'delayed_graduation')
 ]
 
-# Train for each target
-for target_name, target_col in targets:
-    print(f"\n{'='*70}")
-    print(f"🎯 Training: {target_name}")
-    print('='*70)
-    
-    # Get target variable
-    y_train = train_df[target_col].fillna(0)
-    y_test = test_df[target_col].fillna(0)
-    
-    print(f"\n   Target distribution (training):")
-    train_counts = y_train.value_counts().to_dict()
-    print(f"      No Risk (0): {train_counts.get(0, 0):,}")
-    print(f"      At Risk (1): {train_counts.get(1, 0):,}")
-    
-    # Scale features
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-    
-    # Train Random Forest
-    print(f"\n🌲 Training Random Forest...")
-    model = RandomForestClassifier(
+
+def build_forest():
+    """Random Forest used for every target"""
+    return RandomForestClassifier(
         n_estimators=100,
         max_depth=10,
         min_samples_split=5,
@@ -82,58 +66,349 @@ for target_name, target_col in targets:
         random_state=42,
         n_jobs=-1
     )
-    
+
+
+def build_hist_gradient_boosting():
+    """
+    HistGradientBoosting: bins features once, so fit time and model size grow
+    far slower with rows than a deep forest, and NaNs are routed natively.
+    """
+    return HistGradientBoostingClassifier(
+        max_iter=200,
+        learning_rate=0.1,
+        max_leaf_nodes=31,
+        class_weight='balanced',
+        random_state=42
+    )
+
+
+def fit_model(engine, train_df, y_train):
+    """Fit one engine on the training set; returns (model, scaler)"""
+    if engine == 'hgb':
+        # Scale-invariant splits and native missing values: no scaler, no fillna
+        model = build_hist_gradient_boosting()
+        model.fit(train_df[feature_columns], y_train)
+        return model, None
+
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(train_df[feature_columns].fillna(0))
+    model = build_forest()
     model.fit(X_train_scaled, y_train)
-    
+    return model, scaler
+
+
+def model_inputs(df, scaler):
+    """Feature matrix in the form the model was fitted on"""
+    if scaler is None:
+        return df[feature_columns]
+    return scaler.transform(df[feature_columns].fillna(0))
+
+
+def print_operating_points(points):
+    print(f"\n🎚️  Operating Points (risk level cutoffs):")
+    for level, point in zip(('MEDIUM', 'HIGH', 'CRITICAL'), points['points']):
+        print(f"   {level:9s} p >= {point['threshold']:.3f}  "
+              f"recall {point['recall']:.3f} (target {point['target_recall']:.2f})  "
+              f"precision {point['precision']:.3f}")
+    best = points['best_f1']
+    print(f"   Best F1   p >= {best['threshold']:.3f}  F1 {best['f1']:.3f}")
+
+
+def evaluate(model, X_test_scaled, y_test):
+    """Print test metrics and return them with the chosen operating points"""
     # Predict
     y_pred = model.predict(X_test_scaled)
-    y_pred_proba = model.predict_proba(X_test_scaled)[:, 1]
-    
+
     # Evaluate
     acc = accuracy_score(y_test, y_pred)
     prec = precision_score(y_test, y_pred, zero_division=0)
     rec = recall_score(y_test, y_pred, zero_division=0)
     f1 = f1_score(y_test, y_pred, zero_division=0)
-    
+
     print(f"\n📊 Results:")
     print(f"   Accuracy:  {acc:.3f}")
     print(f"   Precision: {prec:.3f}")
     print(f"   Recall:    {rec:.3f} ⭐ (catching at-risk students)")
     print(f"   F1-Score:  {f1:.3f}")
-    
+
     # Confusion Matrix
-    cm = confusion_matrix(y_test, y_pred)
+    cm = confusion_matrix(y_test, y_pred, labels=[0, 1])
     tn, fp, fn, tp = cm.ravel()
-    
+
     print(f"\n📈 Confusion Matrix:")
     print(f"   True Negatives:  {tn:4d} (correctly predicted no risk)")
     print(f"   False Positives: {fp:4d} (false alarms - OK for intervention!)")
     print(f"   False Negatives: {fn:4d} (MISSED at-risk - want this LOW!)")
     print(f"   True Positives:  {tp:4d} (correctly caught at-risk) ✅")
-    
-    # Feature Importance
+
+    # Precision/recall at every threshold in one pass; cutoffs for the risk levels
+    points = operating_points(y_test, model.predict_proba(X_test_scaled)[:, 1], TARGET_RECALLS)
+    print_operating_points(points)
+
+    metrics = {
+        'accuracy': float(acc), 'precision': float(prec),
+        'recall': float(rec), 'f1': float(f1)
+    }
+    return metrics, points
+
+
+def print_feature_importance(model):
+    if not hasattr(model, 'feature_importances_'):
+        return
+
     importances = model.feature_importances_
     indices = np.argsort(importances)[::-1][:5]
-    
+
     print(f"\n🔝 Top 5 Important Features:")
     for i, idx in enumerate(indices, 1):
         print(f"   {i}. {feature_columns[idx]:30s} {importances[idx]:.3f}")
-    
-    # Save models
-    model_file = f'models/saved_models/{target_col}_model.pkl'
-    scaler_file = f'models/saved_models/{target_col}_scaler.pkl'
-    
-    joblib.dump(model, model_file)
-    joblib.dump(scaler, scaler_file)
-    
-    print(f"\n💾 Saved:")
-    print(f"   {model_file}")
-    print(f"   {scaler_file}")
-
-print("\n" + "="*70)
-print("✅ MODEL TRAINING COMPLETE!")
-print("="*70)
-print("\n📁 All models saved in: models/saved_models/")
-print("\n👉 Next step: Run predictions")
-print("   python predict_student.py")
-print("\n")
+
+
+def train_full(registry, train_df, test_df, engine='forest'):
+    """Fit every target from scratch on the full training set"""
+    registered = {}
+
+    print(f"📊 Using {len(feature_columns)} features")
+
+    # Train for each target
+    for target_name, target_col in targets:
+        print(f"\n{'='*70}")
+        print(f"🎯 Training: {target_name}")
+        print('='*70)
+
+        # Get target variable
+        y_train = train_df[target_col].fillna(0)
+        y_test = test_df[target_col].fillna(0)
+
+        print(f"\n   Target distribution (training):")
+        train_counts = y_train.value_counts().to_dict()
+        print(f"      No Risk (0): {train_counts.get(0, 0):,}")
+        print(f"      At Risk (1): {train_counts.get(1, 0):,}")
+
+        # Train
+        print(f"\n🌲 Training {ENGINES[engine]}...")
+        model, scaler = fit_model(engine, train_df, y_train)
+
+        metrics, points = evaluate(model, model_inputs(test_df, scaler), y_test)
+        print_feature_importance(model)
+
+        # Store model, scaler and compact forest in the registry
+        entry = registry.store_target(model, scaler, feature_names=feature_columns)
+        entry['engine'] = engine
+        entry['metrics'] = metrics
+        entry['operating_points'] = points
+        registered[target_col] = entry
+
+        print(f"\n💾 Stored:")
+        print(f"   model  {entry['model']}")
+        if entry['scaler']:
+            print(f"   scaler {entry['scaler']}")
+        if entry.get('forest'):
+            print(f"   forest {entry['forest']} (compact, scaler folded in)")
+
+    return registered
+
+
+def train_incremental(registry, base_version, new_df, test_df, new_trees, max_trees):
+    """
+    Add trees fitted on a new semester slice to the current registry models
+
+    The scaler of the base version is kept as-is, so the existing trees keep
+    seeing the inputs they were trained on. Each update is numbered in the
+    manifest (incremental_round) and its new trees get that round's seed.
+    """
+    registered = {}
+    base_targets = registry.manifest(base_version)['targets']
+    X_new = new_df[feature_columns].fillna(0)
+    X_test = test_df[feature_columns].fillna(0)
+
+    print(f"📊 Base version: {base_version}")
+    print(f"   Adding {new_trees} trees per target, keeping at most {max_trees}")
+
+    for target_name, target_col in targets:
+        print(f"\n{'='*70}")
+        print(f"🎯 Updating: {target_name}")
+        print('='*70)
+
+        model, scaler = registry.load_target(target_col, base_version)
+        if not hasattr(model, 'estimators_'):
+            raise ValueError(f"Incremental mode needs a forest; {target_col} is {type(model).__name__}")
+        y_new = new_df[target_col].fillna(0)
+        y_test = test_df[target_col].fillna(0)
+
+        before = len(model.estimators_)
+        round_index = base_targets.get(target_col, {}).get('incremental_round', 0) + 1
+        seed = round_seed(model.random_state, round_index)
+        model = warm_start_update(
+            model, scaler.transform(X_new), y_new,
+            n_new_trees=new_trees, max_trees=max_trees, random_state=seed
+        )
+        print(f"\n🌲 Trees: {before} -> {len(model.estimators_)} (round {round_index}, seed {seed})")
+
+        metrics, points = evaluate(model, scaler.transform(X_test), y_test)
+        print_feature_importance(model)
+
+        entry = registry.store_target(model, scaler, feature_names=feature_columns)
+        entry['engine'] = 'forest'
+        entry['metrics'] = metrics
+        entry['operating_points'] = points
+        entry['incremental_round'] = round_index
+        entry['round_seed'] = seed
+        registered[target_col] = entry
+
+        print(f"\n💾 Stored: model {entry['model'][:12]} (scaler unchanged)")
+
+    return registered
+
+
+def artifact_size(model, scaler):
+    """Bytes the model and scaler take as joblib pickles"""
+    size = 0
+    for obj in (model, scaler):
+        if obj is not None:
+            buffer = io.BytesIO()
+            joblib.dump(obj, buffer)
+            size += buffer.tell()
+    return size
+
+
+def scoring_latency(model, scaler, df, repeats=200):
+    """Median and p95 milliseconds to score one student (features -> probability)"""
+    row = df.iloc[:1]
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(model_inputs(row, scaler))
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings)), float(np.percentile(timings, 95))
+
+
+def compare_engines(train_df, test_df, output_file=COMPARISON_FILE):
+    """Train every engine on the same split and report them side by side"""
+    rows = []
+
+    for target_name, target_col in targets:
+        y_train = train_df[target_col].fillna(0)
+        y_test = test_df[target_col].fillna(0)
+
+        for engine in ENGINES:
+            start = time.perf_counter()
+            model, scaler = fit_model(engine, train_df, y_train)
+            fit_seconds = time.perf_counter() - start
+
+            X_test = model_inputs(test_df, scaler)
+            start = time.perf_counter()
+            proba = model.predict_proba(X_test)[:, 1]
+            batch_seconds = time.perf_counter() - start
+            p50, p95 = scoring_latency(model, scaler, test_df)
+
+            rows.append({
+                'target': target_col,
+                'engine': engine,
+                'fit_seconds': fit_seconds,
+                'artifact_mb': artifact_size(model, scaler) / 1024**2,
+                'latency_p50_ms': p50,
+                'latency_p95_ms': p95,
+                'batch_rows_per_sec': len(X_test) / batch_seconds,
+                'recall': float(recall_score(y_test, (proba >= 0.5).astype(int), zero_division=0)),
+                'roc_auc': float(roc_auc_score(y_test, proba)),
+            })
+
+    print(f"\n{'='*100}")
+    print("⚖️  ENGINE COMPARISON (same train/test split)")
+    print('='*100)
+    print(f"\n   {'Target':20s} {'Engine':8s} {'Fit (s)':>8s} {'Size (MB)':>10s} "
+          f"{'p50 (ms)':>9s} {'p95 (ms)':>9s} {'Rows/s':>10s} {'Recall':>7s} {'AUC':>7s}")
+    for r in rows:
+        print(f"   {r['target']:20s} {r['engine']:8s} {r['fit_seconds']:8.2f} {r['artifact_mb']:10.2f} "
+              f"{r['latency_p50_ms']:9.2f} {r['latency_p95_ms']:9.2f} {r['batch_rows_per_sec']:10,.0f} "
+              f"{r['recall']:7.3f} {r['roc_auc']:7.3f}")
+
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w') as f:
+        json.dump({'train_file': TRAIN_FILE, 'test_file': TEST_FILE, 'results': rows}, f, indent=2)
+    print(f"\n💾 Report saved: {output_file}")
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train risk models on historical data')
+    parser.add_argument('--engine', choices=list(ENGINES) + ['compare'], default='forest',
+                        help="Model family, or 'compare' for a side-by-side report")
+    parser.add_argument('--incremental', type=str, metavar='CSV',
+                        help='New semester slice to add to the current models')
+    parser.add_argument('--new-trees', type=int, default=25,
+                        help='Trees fitted on the new slice (incremental mode)')
+    parser.add_argument('--max-trees', type=int, default=100,
+                        help='Oldest trees beyond this count are evicted (incremental mode)')
+    args = parser.parse_args()
+
+    print("\n" + "🤖" * 35)
+    print("MODEL TRAINING - HISTORICAL DATA")
+    print("🤖" * 35 + "\n")
+
+    registry = ModelRegistry()
+
+    # Load data
+    print("📂 Loading historical data...")
+    test_df = pd.read_csv(TEST_FILE)
+
+    if args.engine == 'compare':
+        train_df = pd.read_csv(TRAIN_FILE)
+        print(f"   ✅ Training set: {len(train_df):,} students")
+        print(f"   ✅ Test set: {len(test_df):,} students")
+        compare_engines(train_df, test_df)
+        print("\n")
+        return
+
+    if args.incremental:
+        base_version = registry.resolve(HISTORICAL_REF)
+        if base_version is None:
+            print(f"❌ No '{HISTORICAL_REF}' model in the registry - run a full training first")
+            exit(1)
+
+        train_file = args.incremental
+        new_df = pd.read_csv(train_file)
+        print(f"   ✅ New slice: {len(new_df):,} students")
+        print(f"   ✅ Test set: {len(test_df):,} students\n")
+
+        try:
+            registered = train_incremental(
+                registry, base_version, new_df, test_df,
+                new_trees=args.new_trees, max_trees=args.max_trees
+            )
+        except ValueError as error:
+            # Nothing is published: the current version stays promoted
+            print(f"\n❌ Incremental update failed: {error}")
+            exit(1)
+    else:
+        base_version = None
+        train_file = TRAIN_FILE
+        train_df = pd.read_csv(train_file)
+        print(f"   ✅ Training set: {len(train_df):,} students")
+        print(f"   ✅ Test set: {len(test_df):,} students\n")
+
+        registered = train_full(registry, train_df, test_df, engine=args.engine)
+
+    version = registry.publish(
+        registered, feature_columns,
+        training_data=train_file,
+        feature_set='historical',
+        parent=base_version
+    )
+    registry.promote(version, HISTORICAL_REF)
+
+    print("\n" + "="*70)
+    print("✅ MODEL TRAINING COMPLETE!")
+    print("="*70)
+    print(f"\n📁 Models registered in: {registry.root}")
+    print(f"   Version: {version} (promoted to '{HISTORICAL_REF}')")
+    print("\n👉 Next step: Run predictions")
+    print("   python predict_student.py")
+    print("\n")
+
+
+if __name__ == "__main__":
+    main()
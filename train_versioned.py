@@ -1,28 +1,28 @@
 """
 Versioned Model Training
 ========================
-Saves models with timestamps so you don't lose previous versions
+Stores models in the content-addressed registry (models/registry) with a
+manifest per version, then promotes the new version to "latest".
 """
 import pandas as pd
 import numpy as np
-from pathlib import Path
-import joblib
 from datetime import datetime
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 
+from models.registry import ModelRegistry, new_version_id
+
 # Create version timestamp
-version = datetime.now().strftime("%Y%m%d_%H%M%S")
+version = new_version_id()
 print(f"\n🤖 TRAINING MODELS - Version: {version}\n")
 
-# Create versioned directory
-version_dir = Path(f'models/saved_models/v_{version}')
-version_dir.mkdir(parents=True, exist_ok=True)
+registry = ModelRegistry()
 
 # Load data
-df = pd.read_csv('data/processed/features_engineered.csv')
+data_file = 'data/processed/features_engineered.csv'
+df = pd.read_csv(data_file)
 print(f"✅ Loaded {len(df):,} students")
 
 # Features
@@ -33,6 +33,7 @@ features = [
 ]
 
 results = {}
+targets = {}
 
 # Train for each target
 for target_name, target_col in [
@@ -77,17 +78,17 @@ for target_name, target_col in [
     print(f"Recall:    {rec:.3f}")
     print(f"F1-Score:  {f1:.3f}")
     
-    results[target_name] = {'accuracy': acc, 'precision': prec, 'recall': rec, 'f1': f1}
-    
-    # Save to versioned directory
-    joblib.dump(model, version_dir / f'{target_col}_model.pkl')
-    joblib.dump(scaler, version_dir / f'{target_col}_scaler.pkl')
+    results[target_name] = {
+        'accuracy': float(acc), 'precision': float(prec),
+        'recall': float(rec), 'f1': float(f1)
+    }
     
-    # Also save to main directory (latest)
-    joblib.dump(model, f'models/saved_models/{target_col}_model.pkl')
-    joblib.dump(scaler, f'models/saved_models/{target_col}_scaler.pkl')
+    # Store artifacts by content hash (unchanged scalers are not duplicated)
+    targets[target_col] = registry.store_target(model, scaler, feature_names=features)
+    targets[target_col]['metrics'] = results[target_name]
     
-    print(f"✅ Saved to: {version_dir}")
+    print(f"✅ Stored: model {targets[target_col]['model'][:12]}, "
+          f"scaler {targets[target_col]['scaler'][:12]}")
 
 # Save training report
 report = f"""
@@ -119,13 +120,22 @@ Delay Risk:
   F1-Score:  {results['Delay']['f1']:.3f}
 """
 
-with open(version_dir / 'training_report.txt', 'w') as f:
-    f.write(report)
+# Publish the manifest, then flip "latest" in one atomic rename
+version = registry.publish(
+    targets, features,
+    training_data=data_file,
+    feature_set='current',
+    version=version,
+    report=report
+)
+registry.promote(version, 'latest')
+
+version_dir = registry.versions_dir / version
 
 print("\n" + "="*60)
 print("✅ TRAINING COMPLETE!")
 print("="*60)
-print(f"\n📂 Models saved in:")
-print(f"   Latest: models/saved_models/")
-print(f"   Version: {version_dir}")
+print(f"\n📂 Models registered in: {registry.root}")
+print(f"   Version: {version} (promoted to 'latest')")
+print(f"   Manifest: {version_dir}/manifest.json")
 print(f"\n📊 Report saved: {version_dir}/training_report.txt\n")
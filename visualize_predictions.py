@@ -1,134 +1,353 @@
+"""
+Prediction Visualizations
+=========================
+Renders the dashboard charts of predictions_output.csv into visualizations/.
+
+Every chart is prepared in the main process (only the rows and columns it
+draws) and fingerprinted: a hash of that data, the render parameters and
+the chart's drawing code. A chart whose fingerprint matches the last render
+(visualizations/.render_cache.json) and whose PNG still exists is skipped;
+the others are drawn in a process pool.
+
+--draft is for interactive use: 100 dpi instead of 300 and a rasterized
+scatter without marker edges, written to visualizations/draft/ so the
+full-quality charts and their cache are left alone.
+
+Usage:
+    python visualize_predictions.py
+    python visualize_predictions.py --draft
+    python visualize_predictions.py --workers 4 --force
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
 
-import pandas as pd
 import matplotlib.pyplot as plt
+import pandas as pd
 import seaborn as sns
-import numpy as np
-from pathlib import Path
 
-print("\n📊 CREATING PREDICTION VISUALIZATIONS\n")
+from models.features import TARGETS
+from models.loader import load_cutoffs
+from models.risk_levels import RISK_LEVELS
+from models.top_k import top_k
+
+PREDICTIONS_FILE = 'predictions_output.csv'
+OUTPUT_DIR = 'visualizations'
+CACHE_FILE = '.render_cache.json'
+
+FULL_DPI = 300
+DRAFT_DPI = 100
 
-# Create output directory
-Path('visualizations').mkdir(exist_ok=True)
 
-# Load predictions
-print("📂 Loading predictions...")
-df = pd.read_csv('predictions_output.csv')
-print(f"   ✅ Loaded {len(df):,} students\n")
+def _style():
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = (12, 8)
 
-# Set style
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 8)
 
 # ============================================================================
 # 1. RISK LEVEL DISTRIBUTION (Pie + Bar)
 # ============================================================================
-print("📊 Creating Risk Distribution...")
+def prepare_risk_distribution(df):
+    # Count students by risk level
+    return df['dropout_risk_level'].value_counts()
 
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
 
-# Count students by risk level
-risk_counts = df['dropout_risk_level'].value_counts()
-colors = ['#2ecc71', '#f39c12', '#e67e22', '#e74c3c']
+def draw_risk_distribution(risk_counts, path, dpi, draft):
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    colors = ['#2ecc71', '#f39c12', '#e67e22', '#e74c3c']
 
-# Pie chart
-ax1.pie(risk_counts.values, labels=risk_counts.index, autopct='%1.1f%%',
-        colors=colors[:len(risk_counts)], startangle=90)
-ax1.set_title('Student Risk Distribution', fontsize=16, fontweight='bold')
+    # Pie chart
+    ax1.pie(risk_counts.values, labels=risk_counts.index, autopct='%1.1f%%',
+            colors=colors[:len(risk_counts)], startangle=90)
+    ax1.set_title('Student Risk Distribution', fontsize=16, fontweight='bold')
 
-# Bar chart
-risk_counts.plot(kind='bar', ax=ax2, color=colors[:len(risk_counts)])
-ax2.set_title('Risk Level Counts', fontsize=16, fontweight='bold')
-ax2.set_xlabel('Risk Level', fontsize=12)
-ax2.set_ylabel('Number of Students', fontsize=12)
-ax2.tick_params(axis='x', rotation=0)
-for i, v in enumerate(risk_counts.values):
-    ax2.text(i, v + 10, str(v), ha='center', fontweight='bold')
+    # Bar chart
+    risk_counts.plot(kind='bar', ax=ax2, color=colors[:len(risk_counts)])
+    ax2.set_title('Risk Level Counts', fontsize=16, fontweight='bold')
+    ax2.set_xlabel('Risk Level', fontsize=12)
+    ax2.set_ylabel('Number of Students', fontsize=12)
+    ax2.tick_params(axis='x', rotation=0)
+    for i, v in enumerate(risk_counts.values):
+        ax2.text(i, v + 10, str(v), ha='center', fontweight='bold')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
 
-plt.tight_layout()
-plt.savefig('visualizations/1_risk_distribution.png', dpi=300, bbox_inches='tight')
-print("   ✅ Saved: visualizations/1_risk_distribution.png")
-plt.close()
 
 # ============================================================================
 # 2. DROPOUT PROBABILITY HISTOGRAM
 # ============================================================================
-print("📊 Creating Probability Histogram...")
-
-plt.figure(figsize=(12, 6))
-plt.hist(df['dropout_probability'], bins=50, color='steelblue', 
-         edgecolor='black', alpha=0.7)
-plt.axvline(x=0.5, color='orange', linestyle='--', linewidth=2, 
-            label='High Risk (50%)')
-plt.axvline(x=0.7, color='red', linestyle='--', linewidth=2, 
-            label='Critical Risk (70%)')
-plt.xlabel('Dropout Probability', fontsize=12)
-plt.ylabel('Number of Students', fontsize=12)
-plt.title('Distribution of Dropout Probabilities', fontsize=16, fontweight='bold')
-plt.legend(fontsize=11)
-plt.grid(alpha=0.3)
-plt.tight_layout()
-plt.savefig('visualizations/2_probability_histogram.png', dpi=300, bbox_inches='tight')
-print("   ✅ Saved: visualizations/2_probability_histogram.png")
-plt.close()
+def prepare_probability_histogram(df, cutoffs=None):
+    # The dropout model's own cutoffs (MEDIUM, HIGH, CRITICAL), so the lines
+    # match the risk levels in the CSV; part of the data, hence the fingerprint
+    cutoffs = load_cutoffs(TARGETS['dropout']) if cutoffs is None else cutoffs
+    return df['dropout_probability'], [float(c) for c in cutoffs]
+
+
+def draw_probability_histogram(data, path, dpi, draft):
+    probabilities, cutoffs = data
+    plt.figure(figsize=(12, 6))
+    plt.hist(probabilities, bins=50, color='steelblue',
+             edgecolor='black', alpha=0.7)
+    colors = ['gold', 'orange', 'red']
+    for cutoff, level, color in zip(cutoffs, RISK_LEVELS[1:], colors):
+        # Drop the emoji: the default font has no glyph for it
+        plt.axvline(x=cutoff, color=color, linestyle='--', linewidth=2,
+                    label=f"{level.split(' ', 1)[1].title()} Risk ({cutoff:.0%})")
+    plt.xlabel('Dropout Probability', fontsize=12)
+    plt.ylabel('Number of Students', fontsize=12)
+    plt.title('Distribution of Dropout Probabilities', fontsize=16, fontweight='bold')
+    plt.legend(fontsize=11)
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
 
 # ============================================================================
 # 3. RISK BY SCHOOL
 # ============================================================================
-print("📊 Creating Risk by School...")
-
-school_risk = df.groupby('school_id').agg({
-    'dropout_probability': 'mean',
-    'student_id': 'count'
-}).reset_index()
-school_risk.columns = ['School', 'Avg_Risk', 'Students']
-school_risk = school_risk.sort_values('Avg_Risk', ascending=False)
-
-fig, ax = plt.subplots(figsize=(10, 6))
-bars = ax.barh(school_risk['School'], school_risk['Avg_Risk'], 
-               color='coral', edgecolor='black')
-ax.set_xlabel('Average Dropout Probability', fontsize=12)
-ax.set_title('Average Dropout Risk by School', fontsize=16, fontweight='bold')
-
-for i, (risk, count) in enumerate(zip(school_risk['Avg_Risk'], school_risk['Students'])):
-    ax.text(risk + 0.005, i, f'{risk:.1%} ({count:,} students)', 
-            va='center', fontsize=10)
-
-plt.tight_layout()
-plt.savefig('visualizations/3_risk_by_school.png', dpi=300, bbox_inches='tight')
-print("   ✅ Saved: visualizations/3_risk_by_school.png")
-plt.close()
+def prepare_risk_by_school(df):
+    # Grouped from the same CSV as every other chart (the risk rollups may
+    # come from a different scoring run)
+    school_risk = df.groupby('school_id').agg({
+        'dropout_probability': 'mean',
+        'student_id': 'count'
+    }).reset_index()
+    school_risk.columns = ['School', 'Avg_Risk', 'Students']
+    return school_risk.sort_values('Avg_Risk', ascending=False).reset_index(drop=True)
+
+
+def draw_risk_by_school(school_risk, path, dpi, draft):
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.barh(school_risk['School'], school_risk['Avg_Risk'],
+            color='coral', edgecolor='black')
+    ax.set_xlabel('Average Dropout Probability', fontsize=12)
+    ax.set_title('Average Dropout Risk by School', fontsize=16, fontweight='bold')
+
+    for i, (risk, count) in enumerate(zip(school_risk['Avg_Risk'], school_risk['Students'])):
+        ax.text(risk + 0.005, i, f'{risk:.1%} ({count:,} students)',
+                va='center', fontsize=10)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
 
 # ============================================================================
 # 4. ATTENDANCE VS GPA SCATTER (Color by Risk)
 # ============================================================================
-print("📊 Creating Attendance vs GPA Scatter...")
-
-plt.figure(figsize=(12, 8))
-scatter = plt.scatter(
-    df['physical_attendance_rate'], 
-    df['cumulative_gpa'],
-    c=df['dropout_probability'],
-    cmap='RdYlGn_r',
-    s=50,
-    alpha=0.6,
-    edgecolors='black',
-    linewidth=0.5
-)
-cbar = plt.colorbar(scatter, label='Dropout Probability')
-plt.axhline(y=2.0, color='red', linestyle='--', alpha=0.5, label='GPA 2.0')
-plt.axvline(x=0.67, color='blue', linestyle='--', alpha=0.5, label='67% Attendance')
-plt.xlabel('Attendance Rate', fontsize=12)
-plt.ylabel('Cumulative GPA', fontsize=12)
-plt.title('Student Risk: Attendance vs GPA', fontsize=16, fontweight='bold')
-plt.legend()
-plt.grid(alpha=0.3)
-plt.tight_layout()
-plt.savefig('visualizations/4_attendance_vs_gpa.png', dpi=300, bbox_inches='tight')
-print("   ✅ Saved: visualizations/4_attendance_vs_gpa.png")
-plt.close()
+def prepare_attendance_vs_gpa(df):
+    return df[['physical_attendance_rate', 'cumulative_gpa', 'dropout_probability']]
+
+
+def draw_attendance_vs_gpa(points, path, dpi, draft):
+    plt.figure(figsize=(12, 8))
+    # Draft: one raster image for all markers, no per-marker edge strokes
+    scatter = plt.scatter(
+        points['physical_attendance_rate'],
+        points['cumulative_gpa'],
+        c=points['dropout_probability'],
+        cmap='RdYlGn_r',
+        s=50,
+        alpha=0.6,
+        edgecolors='none' if draft else 'black',
+        linewidth=0.5,
+        rasterized=draft,
+    )
+    plt.colorbar(scatter, label='Dropout Probability')
+    plt.axhline(y=2.0, color='red', linestyle='--', alpha=0.5, label='GPA 2.0')
+    plt.axvline(x=0.67, color='blue', linestyle='--', alpha=0.5, label='67% Attendance')
+    plt.xlabel('Attendance Rate', fontsize=12)
+    plt.ylabel('Cumulative GPA', fontsize=12)
+    plt.title('Student Risk: Attendance vs GPA', fontsize=16, fontweight='bold')
+    plt.legend()
+    plt.grid(alpha=0.3)
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
 
 # ============================================================================
 # 5. TOP 20 HIGHEST RISK STUDENTS
 # ============================================================================
-print("📊 Creating Top 20 High Risk Chart...")
+def prepare_top_20_high_risk(df):
+    # argpartition picks the 20 riskiest without sorting every student
+    top20 = top_k(df, 'dropout_probability', 20).iloc[::-1]
+    return top20[['name', 'student_id', 'dropout_probability']].reset_index(drop=True)
+
+
+def draw_top_20_high_risk(top20, path, dpi, draft):
+    labels = top20['name'].astype(str) + ' (' + top20['student_id'].astype(str) + ')'
+
+    fig, ax = plt.subplots(figsize=(12, 9))
+    ax.barh(labels, top20['dropout_probability'], color='#e74c3c', edgecolor='black')
+    ax.set_xlabel('Dropout Probability', fontsize=12)
+    ax.set_title('Top 20 Highest Risk Students', fontsize=16, fontweight='bold')
+    ax.set_xlim(0, 1)
+
+    for i, prob in enumerate(top20['dropout_probability']):
+        ax.text(prob + 0.01, i, f'{prob:.1%}', va='center', fontsize=10)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+
+# (file name, title, prepare(df) -> chart data, draw(data, path, dpi, draft))
+CHARTS = [
+    ('1_risk_distribution.png', 'Risk Distribution', prepare_risk_distribution, draw_risk_distribution),
+    ('2_probability_histogram.png', 'Probability Histogram', prepare_probability_histogram,
+     draw_probability_histogram),
+    ('3_risk_by_school.png', 'Risk by School', prepare_risk_by_school, draw_risk_by_school),
+    ('4_attendance_vs_gpa.png', 'Attendance vs GPA Scatter', prepare_attendance_vs_gpa, draw_attendance_vs_gpa),
+    ('5_top_20_high_risk.png', 'Top 20 High Risk Chart', prepare_top_20_high_risk, draw_top_20_high_risk),
+]
+
+
+def _hash_data(digest, data):
+    if isinstance(data, tuple):
+        for item in data:
+            _hash_data(digest, item)
+        return
+    if not isinstance(data, (pd.Series, pd.DataFrame)):
+        digest.update(json.dumps(data, sort_keys=True).encode())
+        return
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    digest.update(json.dumps([list(map(str, frame.columns)), list(map(str, frame.dtypes))]).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+
+
+def fingerprint(data, draw, params):
+    """
+    sha256 of the chart data, its render parameters and its drawing code
+
+    Chart data is a Series/DataFrame, a JSON value, or a tuple of those.
+    """
+    digest = hashlib.sha256()
+    _hash_data(digest, data)
+    digest.update(json.dumps(params, sort_keys=True).encode())
+    digest.update(inspect.getsource(draw).encode())
+    return digest.hexdigest()
+
+
+def load_render_cache(path):
+    try:
+        return json.loads(Path(path).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_render_cache(path, cache):
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-', suffix='.json')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def render_chart(draw, data, path, dpi, draft):
+    """Draw one chart (runs in a pool worker)"""
+    _style()
+    draw(data, path, dpi, draft)
+    return path
+
+
+def render_charts(df, output_dir=OUTPUT_DIR, draft=False, workers=None, force=False):
+    """
+    Render every chart whose fingerprint changed since the last render
+
+    Returns {'rendered': [...], 'skipped': [...], 'failed': [...]} (file paths).
+    """
+    output_dir = Path(output_dir) / 'draft' if draft else Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    dpi = DRAFT_DPI if draft else FULL_DPI
+    cache_path = output_dir / CACHE_FILE
+    cache = {} if force else load_render_cache(cache_path)
+
+    jobs = []
+    skipped = []
+    for filename, title, prepare, draw in CHARTS:
+        data = prepare(df)
+        key = fingerprint(data, draw, {'dpi': dpi, 'draft': draft})
+        path = output_dir / filename
+        if cache.get(filename) == key and path.exists():
+            print(f"   ⏭️  {title}: unchanged, kept {path}")
+            skipped.append(str(path))
+        else:
+            jobs.append((filename, title, draw, data, key))
+
+    rendered = []
+    failed = []
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(job, pool.submit(render_chart, job[2], job[3], output_dir / job[0], dpi, draft))
+                       for job in jobs]
+            results = [(job, future.exception()) for job, future in futures]
+    else:
+        results = []
+        for job in jobs:
+            try:
+                render_chart(job[2], job[3], output_dir / job[0], dpi, draft)
+                results.append((job, None))
+            except Exception as error:
+                results.append((job, error))
+
+    for (filename, title, draw, data, key), error in results:
+        path = output_dir / filename
+        if error is not None:
+            print(f"   ❌ {title}: {error}")
+            cache.pop(filename, None)
+            failed.append(str(path))
+        else:
+            print(f"   ✅ Saved: {path}")
+            cache[filename] = key
+            rendered.append(str(path))
+
+    save_render_cache(cache_path, cache)
+    return {'rendered': rendered, 'skipped': skipped, 'failed': failed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render the prediction charts')
+    parser.add_argument('--file', type=str, default=PREDICTIONS_FILE, help='Predictions CSV')
+    parser.add_argument('--output-dir', type=str, default=OUTPUT_DIR)
+    parser.add_argument('--draft', action='store_true',
+                        help=f'Fast preview: {DRAFT_DPI} dpi, rasterized scatter, into <output-dir>/draft')
+    parser.add_argument('--workers', type=int, default=None, help='Render processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Render every chart even if unchanged')
+    args = parser.parse_args()
+
+    print("\n📊 CREATING PREDICTION VISUALIZATIONS\n")
+
+    # Load predictions
+    print("📂 Loading predictions...")
+    df = pd.read_csv(args.file)
+    print(f"   ✅ Loaded {len(df):,} students\n")
+
+    print(f"📊 Rendering charts ({'draft' if args.draft else 'full'} quality)...")
+    summary = render_charts(df, args.output_dir, draft=args.draft, workers=args.workers,
+                            force=args.force)
+    print(f"\n✅ {len(summary['rendered'])} rendered, {len(summary['skipped'])} unchanged"
+          + (f", {len(summary['failed'])} failed" if summary['failed'] else "") + "\n")
+    return 1 if summary['failed'] else 0
+
 
+if __name__ == "__main__":
+    raise SystemExit(main())